@@ -2,10 +2,23 @@ import os
 import json
 import time
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, render_template, request, jsonify, send_file, flash, redirect, url_for, stream_with_context, copy_current_request_context
 from flask_sqlalchemy import SQLAlchemy
-from models import db, CaseQuery, CaseDetail, CourtOrder, SearchLog
-from scraper import DelhiHighCourtScraper, get_mock_case_data
+from database import database_url, engine_options
+from models import db, CaseQuery, CaseDetail, CourtOrder, SearchLog, SearchLogRollup, ScrapeJob
+from http_cache import conditional_response, data_version, make_etag, latest
+from circuit_breaker import get_circuit_breaker
+from persistence import save_case_details, refresh_case_details
+from orders import count_orders, decode_cursor, fetch_order_page
+from validation import NOT_FOUND_ERROR, get_negative_cache, normalize_case_key
+from results import CaseResult, CaseDetails, Order
+from refresh import get_refresh_queue
+from progress import get_progress_bus, format_sse
+from assets import init_assets
+from compression import init_compression
+from profiling import init_profiling
+from warmup import WarmupState
 from dotenv import load_dotenv
 import logging
 
@@ -20,12 +33,13 @@ def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
     
-    # Use consistent DB path with absolute path
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(current_dir, 'database', 'court_data.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', f'sqlite:///{db_path}')
+    # DATABASE_URL, else the SQLite file under database/; PostgreSQL gets a sized pool
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    # APP_MODE=api starts a read-only node that never loads the scraping stack
+    app.config['READ_ONLY'] = os.getenv('APP_MODE', 'full') == 'api'
     
     # Only create directories if not using in-memory database
     if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite:///:memory:'):
@@ -34,18 +48,212 @@ def create_app():
         os.makedirs('static/downloads', exist_ok=True)
     
     db.init_app(app)
+    # First in, so its after_request hook runs last and the profile covers compression too
+    init_profiling(app)
+    init_assets(app)
+    init_compression(app)
+    app.extensions['warmup'] = WarmupState()
     
     # Import case types
     from config import Config
     CASE_TYPES = Config.CASE_TYPES
-    
+
+    if Config.ENABLE_SCHEDULER:
+        from scheduler import BackgroundScheduler
+        import retention
+        scheduler = BackgroundScheduler()
+        retention.register_jobs(scheduler, app)
+        app.extensions['scheduler'] = scheduler.start()
+
+    def scrape(case_type, case_number, filing_year, progress=None):
+        """Run a lookup on the configured scraping engine and normalize its result"""
+        if Config.SCRAPER_ENGINE == 'async':
+            from async_scraper import get_async_runner
+            raw = get_async_runner().search_case(case_type, case_number, filing_year, progress=progress)
+        else:
+            # Imported on first scrape so read-only nodes never load it
+            from scraper import DelhiHighCourtScraper
+            scraper = DelhiHighCourtScraper()
+            raw = scraper.search_case(case_type, case_number, filing_year, progress=progress)
+        return CaseResult.from_scraper(raw)
+
+    def mock_result(case_type, case_number, filing_year):
+        from scraper import get_mock_case_data
+        return CaseResult.from_scraper(get_mock_case_data(case_type, case_number, filing_year))
+
+    def run_scraper(case_type, case_number, filing_year, progress=None):
+        """
+        Run a lookup behind the circuit breaker; while it is open, return an error
+        without scraping. Keys the court recently reported as not found are
+        answered from the negative cache.
+        """
+        key = (case_type, case_number, filing_year)
+        negative_cache = get_negative_cache()
+        if key in negative_cache:
+            return CaseResult.failure(NOT_FOUND_ERROR, not_found=True)
+        breaker = get_circuit_breaker()
+        if not breaker.allow_request():
+            return CaseResult.failure("Court website unavailable (circuit open)", circuit_open=True)
+        try:
+            result = scrape(case_type, case_number, filing_year, progress=progress)
+        except Exception as e:
+            breaker.record_failure(str(e))
+            raise
+        if result.not_found:
+            # The site answered; only the case is missing
+            negative_cache.add(key)
+            breaker.record_success()
+        elif result.throttled:
+            # Our own rate limiter said wait; the site was never asked
+            breaker.release_probe()
+        elif result.error:
+            breaker.record_failure(result.error)
+        else:
+            breaker.record_success()
+        return result
+
+    def last_real_result(case_type, case_number, filing_year):
+        """Most recent stored lookup that came from the court site (not mock data)"""
+        return CaseQuery.query.join(CaseDetail).filter(
+            CaseQuery.case_type == case_type,
+            CaseQuery.case_number == case_number,
+            CaseQuery.filing_year == filing_year,
+            CaseQuery.status == 'success'
+        ).order_by(CaseQuery.search_timestamp.desc(), CaseQuery.id.desc()).first()
+
+    def refresh_case(query_id):
+        """Re-scrape a stored lookup and update it in place; runs on the refresh queue"""
+        with app.app_context():
+            case_query = db.session.get(CaseQuery, query_id)
+            if case_query is None:
+                return
+            result = run_scraper(case_query.case_type, case_query.case_number, case_query.filing_year)
+            if result.error:
+                logger.warning(f"Background refresh of case {query_id} failed: {result.error}")
+                return
+            refresh_case_details(case_query, result)
+            db.session.commit()
+            logger.info(f"Refreshed stored case {query_id}")
+
+    def revalidate(case_query):
+        """Freshness of a stored lookup; queues a background refresh if it is older than SWR_MAX_AGE"""
+        as_of = case_query.case_details.updated_at
+        age = (datetime.utcnow() - as_of).total_seconds()
+        queue = get_refresh_queue()
+        if age > Config.SWR_MAX_AGE:
+            queue.submit(case_query.id, refresh_case, case_query.id)
+        return {'as_of': as_of, 'age_seconds': age, 'refreshing': queue.is_pending(case_query.id)}
+
+    live_search_executor = ThreadPoolExecutor(max_workers=Config.LIVE_SEARCH_WORKERS,
+                                              thread_name_prefix='live-search')
+    app.extensions['live_search_executor'] = live_search_executor
+
+    def run_live_search(search_id, case_type, case_number, filing_year, search_log_id, mode=None):
+        """/search flow for /search/live, reporting each stage to the progress bus"""
+        publish = lambda event, **data: get_progress_bus().publish(search_id, event, **data)
+        start_time = time.time()
+
+        def progress(stage, **data):
+            """Scraper stage callback; extracted details and orders go out in the API's shape"""
+            if 'case_details' in data:
+                data['case_details'] = CaseDetails.from_raw(data['case_details']).to_dict()
+            if 'orders' in data:
+                data['orders'] = [Order.from_raw(order).to_dict() for order in data['orders']]
+            publish(stage, **data)
+
+        def publish_result(result):
+            body = result.to_dict()
+            publish('details_extracted', case_details=body['case_details'])
+            publish('orders_extracted', orders=body['orders'])
+
+        def finish(case_query, source):
+            search_log = db.session.get(SearchLog, search_log_id)
+            search_log.response_time = time.time() - start_time
+            search_log.success = True
+            db.session.commit()
+            publish('done', source=source, query_id=case_query.id,
+                    results_url=url_for('case_results', query_id=case_query.id))
+
+        try:
+            # Stale-while-revalidate: answer from the stored result now, refresh it in the background
+            if mode == 'swr':
+                stored_query = last_real_result(case_type, case_number, filing_year)
+                if stored_query:
+                    freshness = revalidate(stored_query)
+                    publish('cache_hit', query_id=stored_query.id, as_of=freshness['as_of'].isoformat(),
+                            refreshing=freshness['refreshing'])
+                    publish_result(CaseResult.from_model(stored_query))
+                    return finish(stored_query, 'swr')
+
+            existing_query = CaseQuery.query.filter_by(
+                case_type=case_type,
+                case_number=case_number,
+                filing_year=filing_year
+            ).first()
+            if existing_query and existing_query.case_details:
+                publish('cache_hit', query_id=existing_query.id)
+                publish_result(CaseResult.from_model(existing_query))
+                return finish(existing_query, 'cache')
+
+            case_query = CaseQuery(case_type=case_type, case_number=case_number, filing_year=filing_year)
+            db.session.add(case_query)
+            db.session.commit()
+
+            result = run_scraper(case_type, case_number, filing_year, progress=progress)
+            source = 'live'
+
+            if result.circuit_open:
+                stored_query = last_real_result(case_type, case_number, filing_year)
+                if stored_query:
+                    db.session.delete(case_query)
+                    db.session.commit()
+                    publish('stale', as_of=stored_query.search_timestamp.isoformat(),
+                            message='The court website is temporarily unavailable. Showing the last stored result.')
+                    publish_result(CaseResult.from_model(stored_query))
+                    return finish(stored_query, 'stale')
+
+            if result.not_found:
+                db.session.delete(case_query)
+                search_log = db.session.get(SearchLog, search_log_id)
+                search_log.response_time = time.time() - start_time
+                search_log.success = False
+                search_log.error_message = result.error
+                db.session.commit()
+                return publish('failed', error=result.error, not_found=True)
+
+            if result.error:
+                source = 'mock'
+                if result.circuit_open:
+                    message = 'The court website is temporarily unavailable. Showing mock data.'
+                elif 'CAPTCHA' in result.error:
+                    message = 'CAPTCHA detected on the court website. Showing mock data.'
+                else:
+                    message = f"Search failed: {result.error}. Showing mock data."
+                publish('fallback', message=message)
+                result = mock_result(case_type, case_number, filing_year)
+                publish_result(result)
+
+            save_case_details(case_query, result)
+            case_query.status = 'mock' if source == 'mock' else 'success'
+            db.session.commit()
+            publish('persisted', query_id=case_query.id)
+            finish(case_query, source)
+
+        except Exception as e:
+            logger.error(f"Error in live search: {str(e)}")
+            db.session.rollback()
+            publish('failed', error='An unexpected error occurred. Please try again.')
+
     @app.route('/')
     def index():
-        return render_template('index.html', case_types=CASE_TYPES)
+        return render_template('index.html', case_types=CASE_TYPES, read_only=app.config['READ_ONLY'])
 
     @app.route('/search', methods=['POST'])
     def search_case():
         start_time = time.time()
+        if app.config['READ_ONLY']:
+            flash('Search is not available on this read-only node.', 'error')
+            return redirect(url_for('index'))
         try:
             case_type = request.form.get('case_type', '').strip()
             case_number = request.form.get('case_number', '').strip()
@@ -56,12 +264,9 @@ def create_app():
                 return redirect(url_for('index'))
 
             try:
-                filing_year = int(filing_year)
-                if filing_year < 1900 or filing_year > datetime.now().year:
-                    flash('Please enter a valid filing year.', 'error')
-                    return redirect(url_for('index'))
-            except ValueError:
-                flash('Please enter a valid filing year.', 'error')
+                case_type, case_number, filing_year = normalize_case_key(case_type, case_number, filing_year)
+            except ValueError as e:
+                flash(str(e), 'error')
                 return redirect(url_for('index'))
 
             search_log = SearchLog(
@@ -76,6 +281,16 @@ def create_app():
             db.session.add(search_log)
             db.session.commit()
 
+            # Stale-while-revalidate: answer from the stored result now, refresh it in the background
+            if request.form.get('mode') == 'swr':
+                stored_query = last_real_result(case_type, case_number, filing_year)
+                if stored_query:
+                    freshness = revalidate(stored_query)
+                    search_log.response_time = time.time() - start_time
+                    search_log.success = True
+                    db.session.commit()
+                    return render_results(stored_query, freshness=freshness)
+
             existing_query = CaseQuery.query.filter_by(
                 case_type=case_type,
                 case_number=case_number,
@@ -86,103 +301,177 @@ def create_app():
                 search_log.response_time = time.time() - start_time
                 search_log.success = True
                 db.session.commit()
-                return render_template('results.html',
-                                       case_query=existing_query,
-                                       case_details=existing_query.case_details,
-                                       orders=existing_query.case_details.orders)
+                return render_results(existing_query)
 
             case_query = CaseQuery(case_type=case_type, case_number=case_number, filing_year=filing_year)
             db.session.add(case_query)
             db.session.commit()
 
-            scraper = DelhiHighCourtScraper()
-            result = scraper.search_case(case_type, case_number, filing_year)
+            result = run_scraper(case_type, case_number, filing_year)
+            used_mock = False
+
+            if result.not_found:
+                db.session.delete(case_query)
+                search_log.response_time = time.time() - start_time
+                search_log.success = False
+                search_log.error_message = result.error
+                db.session.commit()
+                flash(result.error, 'warning')
+                return redirect(url_for('index'))
 
-            if result.get('error'):
+            if result.circuit_open:
+                stored_query = last_real_result(case_type, case_number, filing_year)
+                if stored_query:
+                    db.session.delete(case_query)
+                    search_log.response_time = time.time() - start_time
+                    search_log.success = True
+                    db.session.commit()
+                    flash('The court website is temporarily unavailable. Showing the last stored result '
+                          f"from {stored_query.search_timestamp.strftime('%d/%m/%Y %H:%M')}.", 'warning')
+                    return render_results(stored_query, stale=True)
+
+            if result.error:
+                used_mock = True
+                if result.circuit_open:
+                    flash('The court website is temporarily unavailable. Showing mock data.', 'warning')
                 # ✅ Better CAPTCHA handling
-                if 'CAPTCHA' in result['error']:
+                elif 'CAPTCHA' in result.error:
                     flash('CAPTCHA detected on the court website. Showing mock data.', 'warning')
                 else:
-                    flash(f"Search failed: {result['error']}", 'error')
+                    flash(f"Search failed: {result.error}", 'error')
 
                 logger.warning("Using mock data due to scraping error or CAPTCHA.")
-                result = get_mock_case_data(case_type, case_number, filing_year)
-
-            # Handle filing_date properly
-            filing_date = result['case_details'].get('filing_date')
-            if isinstance(filing_date, str) and filing_date:
-                try:
-                    filing_date = datetime.strptime(filing_date, '%d/%m/%Y').date()
-                except ValueError:
-                    filing_date = None
-            elif not filing_date:
-                filing_date = None
-            
-            # Handle next_hearing_date properly
-            next_hearing_date = result['case_details'].get('next_hearing_date')
-            if isinstance(next_hearing_date, str) and next_hearing_date:
-                try:
-                    next_hearing_date = datetime.strptime(next_hearing_date, '%d/%m/%Y').date()
-                except ValueError:
-                    next_hearing_date = None
-            elif not next_hearing_date:
-                next_hearing_date = None
-            
-            case_details = CaseDetail(
-                query_id=case_query.id,
-                case_title=result['case_details'].get('case_title', ''),
-                petitioner=result['case_details'].get('petitioner', ''),
-                respondent=result['case_details'].get('respondent', ''),
-                filing_date=filing_date,
-                next_hearing_date=next_hearing_date,
-                case_status=result['case_details'].get('case_status', ''),
-                raw_response=result.get('raw_html', '')
-            )
-            db.session.add(case_details)
-            db.session.commit()
+                result = mock_result(case_type, case_number, filing_year)
 
-            # Save orders if available
-            for order_data in result.get('orders', []):
-                # Handle order_date properly
-                order_date = order_data.get('order_date')
-                if isinstance(order_date, str):
-                    try:
-                        order_date = datetime.strptime(order_date, '%d/%m/%Y')
-                    except ValueError:
-                        order_date = datetime.now()
-                elif not order_date:
-                    order_date = datetime.now()
-                
-                order = CourtOrder(
-                    case_detail_id=case_details.id,
-                    order_date=order_date,
-                    order_type=order_data.get('order_type', 'Order'),
-                    order_title=order_data.get('order_title', ''),
-                    order_description=order_data.get('order_description', ''),
-                    pdf_url=order_data.get('pdf_url', '')
-                )
-                db.session.add(order)
+            save_case_details(case_query, result)
 
-            case_query.status = 'success'
+            case_query.status = 'mock' if used_mock else 'success'
             db.session.commit()
 
             search_log.response_time = time.time() - start_time
             search_log.success = True
             db.session.commit()
 
-            return render_template('results.html',
-                                   case_query=case_query,
-                                   case_details=case_details,
-                                   orders=case_details.orders)
+            return render_results(case_query)
 
         except Exception as e:
             logger.error(f"Error in search_case: {str(e)}")
             flash('An unexpected error occurred. Please try again.', 'error')
             return redirect(url_for('index'))
 
+    def render_results(case_query, **context):
+        """Results page with the first page of orders; the page fetches the rest from api_case_orders as it scrolls"""
+        case_details = case_query.case_details
+        orders, next_cursor = fetch_order_page(case_details.id, Config.ORDERS_PAGE_SIZE)
+        return render_template('results.html',
+                               case_query=case_query,
+                               case_details=case_details,
+                               orders=orders,
+                               orders_total=count_orders(case_details.id),
+                               orders_next_url=url_for('api_case_orders', query_id=case_query.id,
+                                                       cursor=next_cursor) if next_cursor else None,
+                               **context)
+
+    def paginate_orders(result, orders_page, orders_per_page):
+        """API response body for a CaseResult, with one page of its orders"""
+        orders = result.orders
+        total_orders = len(orders)
+        start_idx = (orders_page - 1) * orders_per_page
+        end_idx = start_idx + orders_per_page
+        paginated_orders = [order.to_dict() for order in orders[start_idx:end_idx]]
+
+        return {
+            'success': True,
+            'case_details': result.case_details.to_dict(),
+            'orders': paginated_orders,
+            'orders_pagination': {
+                'page': orders_page,
+                'per_page': orders_per_page,
+                'total': total_orders,
+                'pages': (total_orders + orders_per_page - 1) // orders_per_page
+            }
+        }
+
+    @app.route('/search/live', methods=['POST'])
+    def start_live_search():
+        """Start a /search lookup in the background and return where to follow its progress"""
+        if app.config['READ_ONLY']:
+            return jsonify({'success': False, 'error': 'Search is not available on this read-only node'}), 503
+
+        case_type = request.form.get('case_type', '').strip()
+        case_number = request.form.get('case_number', '').strip()
+        filing_year = request.form.get('filing_year', '').strip()
+        if not all([case_type, case_number, filing_year]):
+            return jsonify({'success': False, 'error': 'Please fill in all required fields.'}), 400
+        try:
+            case_type, case_number, filing_year = normalize_case_key(case_type, case_number, filing_year)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        search_log = SearchLog(
+            ip_address=request.remote_addr,
+            user_agent=request.headers.get('User-Agent', ''),
+            search_params=json.dumps({
+                'case_type': case_type,
+                'case_number': case_number,
+                'filing_year': filing_year
+            })
+        )
+        db.session.add(search_log)
+        db.session.commit()
+
+        search_id = get_progress_bus().create(case_type=case_type, case_number=case_number, filing_year=filing_year)
+        live_search_executor.submit(copy_current_request_context(run_live_search),
+                                    search_id, case_type, case_number, filing_year, search_log.id,
+                                    request.form.get('mode'))
+        return jsonify({
+            'success': True,
+            'search_id': search_id,
+            'stream_url': url_for('search_stream', search_id=search_id),
+            'live_url': url_for('live_results', search_id=search_id)
+        }), 202
+
+    @app.route('/search/stream/<search_id>')
+    def search_stream(search_id):
+        """Server-Sent Events: one event per completed search stage, ending with done or failed"""
+        bus = get_progress_bus()
+        if bus.meta(search_id) is None:
+            return jsonify({'success': False, 'error': 'Unknown or expired search'}), 404
+        after = request.headers.get('Last-Event-ID', default=0, type=int)
+
+        def generate():
+            yield 'retry: 2000\n\n'
+            for message in bus.subscribe(search_id, after=after):
+                if message is None:
+                    yield ': keepalive\n\n'
+                else:
+                    position, event, data = message
+                    yield format_sse(event, data, position)
+
+        # The stream reads the database, so it keeps the app context while it runs
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # stop nginx buffering the stream
+        return response
+
+    @app.route('/search/live/<search_id>')
+    def live_results(search_id):
+        """Results page that fills in from the progress stream as stages complete"""
+        meta = get_progress_bus().meta(search_id)
+        if meta is None:
+            flash('This search has expired. Please search again.', 'warning')
+            return redirect(url_for('index'))
+        return render_template('results.html',
+                               case_query=meta,
+                               case_details=None,
+                               orders=[],
+                               live_stream_url=url_for('search_stream', search_id=search_id))
+
     @app.route('/api/search', methods=['POST'])
     def api_search():
         """API endpoint for case search"""
+        if app.config['READ_ONLY']:
+            return jsonify({'success': False, 'error': 'Search is not available on this read-only node'}), 503
         try:
             data = request.get_json()
             if not data:
@@ -198,119 +487,83 @@ def create_app():
                 return jsonify({'success': False, 'error': 'Missing required fields'}), 400
 
             try:
-                filing_year = int(filing_year)
-                if filing_year < 1900 or filing_year > datetime.now().year:
-                    return jsonify({'success': False, 'error': 'Invalid filing year'}), 400
-            except ValueError:
-                return jsonify({'success': False, 'error': 'Invalid filing year'}), 400
+                case_type, case_number, filing_year = normalize_case_key(case_type, case_number, filing_year)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+
+            # Stale-while-revalidate: answer from the stored result now, refresh it in the background
+            if data.get('mode') == 'swr':
+                stored_query = last_real_result(case_type, case_number, filing_year)
+                if stored_query:
+                    freshness = revalidate(stored_query)
+                    return jsonify(dict(
+                        paginate_orders(CaseResult.from_model(stored_query), orders_page, orders_per_page),
+                        query_id=stored_query.id,
+                        orders_url=url_for('api_case_orders', query_id=stored_query.id),
+                        as_of=freshness['as_of'].isoformat(),
+                        age_seconds=round(freshness['age_seconds'], 1),
+                        refreshing=freshness['refreshing']
+                    ))
 
             # Use the same search logic as the web form
+            used_mock = False
             try:
-                scraper = DelhiHighCourtScraper()
-                result = scraper.search_case(case_type, case_number, filing_year)
-
-                if result.get('error'):
+                result = run_scraper(case_type, case_number, filing_year)
+
+                if result.not_found:
+                    return jsonify(result.to_dict()), 404
+
+                if result.circuit_open:
+                    stored_query = last_real_result(case_type, case_number, filing_year)
+                    if stored_query:
+                        return jsonify(dict(
+                            paginate_orders(CaseResult.from_model(stored_query), orders_page, orders_per_page),
+                            stale=True,
+                            query_id=stored_query.id,
+                            orders_url=url_for('api_case_orders', query_id=stored_query.id),
+                            as_of=stored_query.search_timestamp.isoformat()
+                        ))
+
+                if result.error:
                     # Always fall back to mock data for any error
-                    logger.warning(f"Using mock data due to: {result['error']}")
-                    result = get_mock_case_data(case_type, case_number, filing_year)
+                    logger.warning(f"Using mock data due to: {result.error}")
+                    result = mock_result(case_type, case_number, filing_year)
+                    used_mock = True
             except Exception as e:
                 # If scraper fails, use mock data
                 logger.warning(f"Scraper failed, using mock data: {str(e)}")
-                result = get_mock_case_data(case_type, case_number, filing_year)
+                result = mock_result(case_type, case_number, filing_year)
+                used_mock = True
 
             # Save search to database
+            stored = {}
             try:
                 case_query = CaseQuery(
                     case_type=case_type,
                     case_number=case_number,
                     filing_year=filing_year,
-                    status='success' if result.get('success') else 'failed',
+                    status='mock' if used_mock else ('success' if result.success else 'failed'),
                     search_timestamp=datetime.now()
                 )
                 db.session.add(case_query)
                 db.session.commit()
 
-                # Save case details if available
-                if result.get('case_details'):
-                    # Handle filing_date properly
-                    filing_date = result['case_details'].get('filing_date', '')
-                    if isinstance(filing_date, str) and filing_date:
-                        try:
-                            filing_date = datetime.strptime(filing_date, '%d/%m/%Y').date()
-                        except ValueError:
-                            filing_date = None
-                    elif not filing_date:
-                        filing_date = None
-                    
-                    # Handle next_hearing_date properly
-                    next_hearing_date = result['case_details'].get('next_hearing', '')
-                    if isinstance(next_hearing_date, str) and next_hearing_date:
-                        try:
-                            next_hearing_date = datetime.strptime(next_hearing_date, '%d/%m/%Y').date()
-                        except ValueError:
-                            next_hearing_date = None
-                    elif not next_hearing_date:
-                        next_hearing_date = None
-                    
-                    case_details = CaseDetail(
-                        query_id=case_query.id,
-                        case_title=result['case_details'].get('case_title', ''),
-                        petitioner=result['case_details'].get('petitioner', ''),
-                        respondent=result['case_details'].get('respondent', ''),
-                        filing_date=filing_date,
-                        next_hearing_date=next_hearing_date,
-                        case_status=result['case_details'].get('case_status', '')
-                    )
-                    db.session.add(case_details)
-
-                # Save orders if available and case_details exists
-                if result.get('orders') and 'case_details' in locals() and case_details and case_details.id:
-                    for order_data in result['orders']:
-                        # Handle order_date properly
-                        order_date = order_data.get('order_date')
-                        if isinstance(order_date, str):
-                            try:
-                                order_date = datetime.strptime(order_date, '%d/%m/%Y')
-                            except ValueError:
-                                order_date = datetime.now()
-                        elif not order_date:
-                            order_date = datetime.now()
-                        
-                        order = CourtOrder(
-                            case_detail_id=case_details.id,
-                            order_date=order_date,
-                            order_type=order_data.get('order_type', 'Order'),
-                            order_title=order_data.get('order_title', ''),
-                            order_description=order_data.get('order_description', ''),
-                            pdf_url=order_data.get('pdf_url', '')
-                        )
-                        db.session.add(order)
+                # Save case details and orders if available
+                if result.case_details:
+                    save_case_details(case_query, result)
 
                 db.session.commit()
                 logger.info(f"Search saved to database: {case_type}/{case_number}/{filing_year}")
+                if result.case_details:
+                    # The full order list, page by page, without re-sending the case details
+                    stored = {'query_id': case_query.id,
+                              'orders_url': url_for('api_case_orders', query_id=case_query.id)}
 
             except Exception as e:
                 logger.error(f"Error saving search to database: {str(e)}")
                 db.session.rollback()
 
-            # Add pagination for orders
-            orders = result.get('orders', [])
-            total_orders = len(orders)
-            start_idx = (orders_page - 1) * orders_per_page
-            end_idx = start_idx + orders_per_page
-            paginated_orders = orders[start_idx:end_idx]
-
-            return jsonify({
-                'success': True,
-                'case_details': result['case_details'],
-                'orders': paginated_orders,
-                'orders_pagination': {
-                    'page': orders_page,
-                    'per_page': orders_per_page,
-                    'total': total_orders,
-                    'pages': (total_orders + orders_per_page - 1) // orders_per_page
-                }
-            })
+            return jsonify(dict(paginate_orders(result, orders_page, orders_per_page), mock=used_mock, **stored))
 
         except Exception as e:
             logger.error(f"Error in API search: {str(e)}")
@@ -322,84 +575,335 @@ def create_app():
         try:
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
-            
-            cases = CaseQuery.query.paginate(
-                page=page, 
-                per_page=per_page, 
-                error_out=False
-            )
-            
-            cases_data = []
-            for case in cases.items:
-                case_data = {
-                    'id': case.id,
-                    'case_type': case.case_type,
-                    'case_number': case.case_number,
-                    'filing_year': case.filing_year,
-                    'status': case.status,
-                    'search_timestamp': case.search_timestamp.isoformat() if case.search_timestamp else None
-                }
-                if case.case_details:
-                    case_data['case_title'] = case.case_details.case_title
-                    case_data['petitioner'] = case.case_details.petitioner
-                    case_data['respondent'] = case.case_details.respondent
-                cases_data.append(case_data)
-            
+
+            # Validators: any new query or updated detail changes the ETag
+            query_count, last_search = db.session.query(
+                db.func.count(CaseQuery.id), db.func.max(CaseQuery.search_timestamp)).one()
+            detail_count, last_update = db.session.query(
+                db.func.count(CaseDetail.id), db.func.max(CaseDetail.updated_at)).one()
+            etag = make_etag('api_cases', page, per_page, query_count, last_search, detail_count, last_update)
+
+            def render():
+                cases = CaseQuery.query.paginate(
+                    page=page, 
+                    per_page=per_page, 
+                    error_out=False
+                )
+                
+                cases_data = []
+                for case in cases.items:
+                    case_data = {
+                        'id': case.id,
+                        'case_type': case.case_type,
+                        'case_number': case.case_number,
+                        'filing_year': case.filing_year,
+                        'status': case.status,
+                        'search_timestamp': case.search_timestamp.isoformat() if case.search_timestamp else None
+                    }
+                    if case.case_details:
+                        case_data['case_title'] = case.case_details.case_title
+                        case_data['petitioner'] = case.case_details.petitioner
+                        case_data['respondent'] = case.case_details.respondent
+                    cases_data.append(case_data)
+                
+                return jsonify({
+                    'success': True,
+                    'cases': cases_data,
+                    'pagination': {
+                        'page': page,
+                        'per_page': per_page,
+                        'total': cases.total,
+                        'pages': cases.pages
+                    }
+                })
+
+            return conditional_response(('api_cases', page, per_page), etag,
+                                        latest(last_search, last_update), render)
+
+        except Exception as e:
+            logger.error(f"Error in API cases: {str(e)}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+    @app.route('/api/cases/<int:query_id>/freshness')
+    def api_case_freshness(query_id):
+        """When a stored case was last refreshed and whether a refresh is in flight"""
+        case_query = CaseQuery.query.get_or_404(query_id)
+        if not case_query.case_details:
+            return jsonify({'success': False, 'error': 'No details stored for this case'}), 404
+        return jsonify({
+            'success': True,
+            'query_id': query_id,
+            'as_of': case_query.case_details.updated_at.isoformat(),
+            'refreshing': get_refresh_queue().is_pending(query_id)
+        })
+
+    @app.route('/api/cases/<int:query_id>/orders')
+    def api_case_orders(query_id):
+        """
+        A stored case's orders, newest first, one keyset page at a time. Follow
+        next_cursor (null on the last page); filters: order_type, from/to
+        (YYYY-MM-DD, inclusive) on the order date; direction=asc for oldest first.
+        """
+        case_query = CaseQuery.query.get_or_404(query_id)
+        case_details = case_query.case_details
+        if not case_details:
+            return jsonify({'success': False, 'error': 'No details stored for this case'}), 404
+
+        limit = min(max(request.args.get('limit', Config.ORDERS_PAGE_SIZE, type=int), 1), Config.ORDERS_PAGE_MAX)
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+        direction = request.args.get('direction', 'desc').lower()
+        if direction not in ('asc', 'desc'):
+            return jsonify({'success': False, 'error': 'direction must be asc or desc'}), 400
+        try:
+            date_from = request.args.get('from')
+            date_to = request.args.get('to')
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Dates must be YYYY-MM-DD'}), 400
+        order_type = request.args.get('order_type', '').strip() or None
+
+        # Orders only change when the details are saved or refreshed, which bumps updated_at
+        params = (limit, cursor, direction, date_from, date_to, order_type)
+        etag = make_etag('api_case_orders', query_id, case_details.updated_at, *params)
+
+        def render():
+            orders, next_cursor = fetch_order_page(
+                case_details.id, limit, cursor, order_type=order_type, date_from=date_from,
+                date_to=date_to, descending=direction == 'desc')
             return jsonify({
                 'success': True,
-                'cases': cases_data,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': cases.total,
-                    'pages': cases.pages
-                }
+                'query_id': query_id,
+                'orders': [
+                    dict(Order.from_model(order).to_dict(), id=order.id,
+                         download_url=url_for('download_pdf', order_id=order.id) if order.pdf_url else None)
+                    for order in orders
+                ],
+                'next_cursor': next_cursor,
+                'next_url': url_for('api_case_orders', query_id=query_id, limit=limit, cursor=next_cursor,
+                                    direction=direction, order_type=order_type,
+                                    **{'from': request.args.get('from'), 'to': request.args.get('to')})
+                            if next_cursor else None
             })
 
+        return conditional_response(('api_case_orders', query_id) + params, etag,
+                                    case_details.updated_at, render)
+
+    @app.route('/api/changes')
+    def api_changes():
+        """
+        CaseQuery, CaseDetail and CourtOrder records written after ?since=<cursor>,
+        oldest first. Start without since, then pass back next_cursor (also
+        when has_more is false: it is where the next sync resumes).
+        """
+        from changes import decode_cursor, encode_cursor, read_changes
+
+        since = request.args.get('since')
+        try:
+            sequence = decode_cursor(since) if since else 0
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        limit = min(max(request.args.get('limit', Config.CHANGES_PAGE_SIZE, type=int), 1), Config.CHANGES_PAGE_MAX)
+
+        changes, last_sequence, has_more = read_changes(sequence, limit)
+        response = jsonify({
+            'success': True,
+            'changes': changes,
+            'next_cursor': encode_cursor(last_sequence),
+            'has_more': has_more
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/api/jobs', methods=['POST'])
+    def api_enqueue_job():
+        """Queue a lookup for the standalone scraper workers (worker.py)"""
+        if app.config['READ_ONLY']:
+            return jsonify({'success': False, 'error': 'Search is not available on this read-only node'}), 503
+        from worker import enqueue_job
+
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({'success': False, 'error': 'No JSON data provided'}), 400
+        case_type = str(data.get('case_type', '')).strip()
+        case_number = str(data.get('case_number', '')).strip()
+        filing_year = str(data.get('filing_year', '')).strip()
+        if not all([case_type, case_number, filing_year]):
+            return jsonify({'success': False, 'error': 'Missing required fields'}), 400
+        try:
+            case_type, case_number, filing_year = normalize_case_key(case_type, case_number, filing_year)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        if (case_type, case_number, filing_year) in get_negative_cache():
+            return jsonify({'success': False, 'error': NOT_FOUND_ERROR, 'not_found': True}), 404
+
+        job = enqueue_job(case_type, case_number, filing_year)
+        db.session.commit()
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('api_job_status', job_id=job.id)
+        }), 202
+
+    @app.route('/api/jobs/<int:job_id>')
+    def api_job_status(job_id):
+        """Progress of a queued lookup; query_id is set once results are stored"""
+        job = db.session.get(ScrapeJob, job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'attempts': job.attempts,
+            'worker': job.lease_owner,
+            'query_id': job.query_id,
+            'error': job.error_message,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None
+        })
+
+    @app.route('/api/export')
+    def api_export():
+        """Stream cases joined with details and orders as CSV, NDJSON or Parquet"""
+        from export import EXPORT_FORMATS, STREAMERS, build_export_query, iter_export_batches
+
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'success': False, 'error': f'Unsupported format: {export_format}'}), 400
+        if export_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                return jsonify({'success': False, 'error': 'Parquet export requires pyarrow'}), 501
+
+        try:
+            date_from = request.args.get('from')
+            date_to = request.args.get('to')
+            date_from = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Dates must be YYYY-MM-DD'}), 400
+
+        filing_year = request.args.get('year', '').strip()
+        try:
+            filing_year = int(filing_year) if filing_year else None
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Year must be a number'}), 400
+
+        stmt = build_export_query(
+            case_type=request.args.get('case_type', '').strip() or None,
+            filing_year=filing_year,
+            date_from=date_from,
+            date_to=date_to
+        )
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        batches = iter_export_batches(stmt)
+
+        return Response(
+            stream_with_context(STREAMERS[export_format](batches)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=court_cases.{extension}'}
+        )
+
+    @app.route('/ready')
+    def ready():
+        """Readiness probe: 200 once this worker is warmed up and the database answers, else 503"""
+        state = app.extensions['warmup'].snapshot()
+        try:
+            db.session.execute(db.text('SELECT 1'))
+            database_ok = True
         except Exception as e:
-            logger.error(f"Error in API cases: {str(e)}")
-            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+            logger.warning(f"Readiness check failed: {str(e)}")
+            database_ok = False
+        is_ready = state['ready'] and database_ok
+        response = jsonify({'ready': is_ready, 'database': database_ok, 'warmup': state})
+        response.status_code = 200 if is_ready else 503
+        response.headers['Cache-Control'] = 'no-store'
+        return response
 
     @app.route('/stats')
     def stats():
         """Statistics page"""
         try:
-            # Get basic statistics
-            total_searches = SearchLog.query.count()
-            successful_searches = SearchLog.query.filter_by(success=True).count()
-            failed_searches = total_searches - successful_searches
-            
-            # Get recent searches
-            recent_searches = SearchLog.query.order_by(SearchLog.timestamp.desc()).limit(10).all()
-            
-            # Get case type distribution
-            case_types = db.session.query(CaseQuery.case_type, db.func.count(CaseQuery.id)).group_by(CaseQuery.case_type).all()
-            
-            stats_data = {
-                'total_searches': total_searches,
-                'successful_searches': successful_searches,
-                'failed_searches': failed_searches,
-                'success_rate': (successful_searches / total_searches * 100) if total_searches > 0 else 0,
-                'recent_searches': [
-                    {
-                        'timestamp': search.timestamp.isoformat(),
-                        'ip_address': search.ip_address,
-                        'success': search.success,
-                        'response_time': search.response_time
-                    } for search in recent_searches
-                ],
-                'case_type_distribution': [
-                    {'case_type': case_type, 'count': count} for case_type, count in case_types
-                ]
-            }
-            
-            return render_template('stats.html', stats=stats_data)
+            # Validators: the write version (bumped on every commit) and the breaker's own version,
+            # so a 304 costs no queries; both are read before rendering so a racing write only misses
+            breaker = get_circuit_breaker()
+            data_token, data_changed_at = data_version.current()
+            breaker_version, breaker_changed_at = breaker.validators()
+            etag = make_etag('stats', data_token, breaker_version)
+
+            def render():
+                rollup_total, rollup_successful = db.session.query(
+                    db.func.coalesce(db.func.sum(SearchLogRollup.total), 0),
+                    db.func.coalesce(db.func.sum(SearchLogRollup.successful), 0)).one()
+
+                # Get basic statistics (live rows plus rolled-up history)
+                total_searches = SearchLog.query.count() + rollup_total
+                successful_searches = SearchLog.query.filter_by(success=True).count() + rollup_successful
+                failed_searches = total_searches - successful_searches
+                
+                # Get recent searches
+                recent_searches = SearchLog.query.order_by(SearchLog.timestamp.desc()).limit(10).all()
+                
+                # Get case type distribution
+                case_types = db.session.query(CaseQuery.case_type, db.func.count(CaseQuery.id)).group_by(CaseQuery.case_type).all()
+                
+                stats_data = {
+                    'total_searches': total_searches,
+                    'successful_searches': successful_searches,
+                    'failed_searches': failed_searches,
+                    'success_rate': (successful_searches / total_searches * 100) if total_searches > 0 else 0,
+                    'recent_searches': [
+                        {
+                            'timestamp': search.timestamp.isoformat(),
+                            'ip_address': search.ip_address,
+                            'success': search.success,
+                            'response_time': search.response_time
+                        } for search in recent_searches
+                    ],
+                    'case_type_distribution': [
+                        {'case_type': case_type, 'count': count} for case_type, count in case_types
+                    ],
+                    'circuit_breaker': breaker.snapshot()
+                }
+                
+                return render_template('stats.html', stats=stats_data)
+
+            return conditional_response('stats', etag, latest(data_changed_at, breaker_changed_at), render)
             
         except Exception as e:
             logger.error(f"Error in stats: {str(e)}")
             flash('Error loading statistics', 'error')
             return redirect(url_for('index'))
 
+    @app.route('/cases/<int:query_id>')
+    def case_results(query_id):
+        """Results page for a stored case, served with ETag/Last-Modified"""
+        case_query = CaseQuery.query.get_or_404(query_id)
+        case_details = case_query.case_details
+        if not case_details:
+            flash('No details are stored for this case yet.', 'warning')
+            return redirect(url_for('index'))
+
+        order_count, last_order_id = db.session.query(
+            db.func.count(CourtOrder.id), db.func.max(CourtOrder.id)
+        ).filter(CourtOrder.case_detail_id == case_details.id).one()
+        etag = make_etag('case_results', query_id, case_query.status, case_query.search_timestamp,
+                         case_details.updated_at, order_count, last_order_id)
+
+        def render():
+            return render_results(case_query)
+
+        return conditional_response(('case_results', query_id), etag,
+                                    latest(case_query.search_timestamp, case_details.updated_at), render)
+
     @app.route('/download_pdf/<int:order_id>')
     def download_pdf(order_id):
         """Download PDF for a specific order"""
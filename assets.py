@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Static asset pipeline for Court Data Fetcher.
+
+    python assets.py fetch    # download pinned Bootstrap / Font Awesome into static/vendor
+    python assets.py build    # minify, content-hash and precompress into static/dist
+
+`build` writes each file from static/src (minified) and static/vendor to
+static/dist as <name>.<hash>.<ext>, plus .gz (and .br when brotli is
+installed) variants, and records the mapping in static/dist/manifest.json.
+Templates link assets through asset_url(); hashed files are served from
+/assets/ with immutable cache headers. Assets missing from the manifest fall
+back to the CDN (vendor) or static/src (first-party).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import shutil
+import urllib.request
+
+from flask import abort, request, send_from_directory, url_for
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+SOURCE_DIR = os.path.join(STATIC_DIR, 'src')
+VENDOR_DIR = os.path.join(STATIC_DIR, 'vendor')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+
+BOOTSTRAP_CDN = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist'
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0'
+
+# Logical name (under static/vendor) -> pinned upstream URL
+VENDOR_ASSETS = {
+    'css/bootstrap.min.css': f'{BOOTSTRAP_CDN}/css/bootstrap.min.css',
+    'js/bootstrap.bundle.min.js': f'{BOOTSTRAP_CDN}/js/bootstrap.bundle.min.js',
+    'fontawesome/css/all.min.css': f'{FONT_AWESOME_CDN}/css/all.min.css',
+}
+for _font in ('fa-solid-900', 'fa-regular-400', 'fa-brands-400', 'fa-v4compatibility'):
+    for _ext in ('woff2', 'ttf'):
+        VENDOR_ASSETS[f'fontawesome/webfonts/{_font}.{_ext}'] = f'{FONT_AWESOME_CDN}/webfonts/{_font}.{_ext}'
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+def minify_css(text):
+    """Conservative minifier for first-party CSS: comments and redundant whitespace"""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r'\s*:\s*(?=[^{}]*;|[^{}]*})', ':', text)
+    return text.replace(';}', '}').strip()
+
+def minify_js(text):
+    """Conservative minifier for first-party JS: indentation, blank lines and whole-line comments"""
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def _hashed_name(name, content):
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    stem, ext = posixpath.splitext(name)
+    return f'{stem}.{digest}{ext}'
+
+def _rewrite_css_urls(name, text, manifest):
+    """Point url() references at the hashed names of files already in the manifest"""
+    base = posixpath.dirname(name)
+    hashed_base = posixpath.dirname(manifest.get(name, name))
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '#')):
+            return match.group(0)
+        path, suffix = re.match(r'([^?#]*)(.*)', ref).groups()
+        target = posixpath.normpath(posixpath.join(base, path))
+        if target not in manifest:
+            return match.group(0)
+        return f'url({quote}{posixpath.relpath(manifest[target], hashed_base)}{suffix}{quote})'
+
+    return CSS_URL_PATTERN.sub(replace, text)
+
+def _collect(source_dir, vendor_dir):
+    """(logical name, path, first-party) for every asset; non-CSS first so CSS can reference them"""
+    files = []
+    for root, prefix, first_party in ((vendor_dir, 'vendor', False), (source_dir, '', True)):
+        if not os.path.isdir(root):
+            continue
+        for directory, _, names in os.walk(root):
+            for filename in names:
+                path = os.path.join(directory, filename)
+                name = posixpath.join(prefix, os.path.relpath(path, root).replace(os.sep, '/'))
+                files.append((name.lstrip('/'), path, first_party))
+    return sorted(files, key=lambda item: (item[0].endswith('.css'), item[0]))
+
+def build(source_dir=SOURCE_DIR, vendor_dir=VENDOR_DIR, dist_dir=DIST_DIR, clean=False):
+    """Build hashed, minified, precompressed assets and return the manifest"""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    if clean and os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    manifest = {}
+    for name, path, first_party in _collect(source_dir, vendor_dir):
+        with open(path, 'rb') as source:
+            content = source.read()
+        if name.endswith('.css'):
+            text = content.decode('utf-8')
+            if first_party:
+                text = minify_css(text)
+            # Hash after rewriting so the name changes when a referenced file does
+            manifest[name] = _hashed_name(name, text.encode('utf-8'))
+            content = _rewrite_css_urls(name, text, manifest).encode('utf-8')
+            manifest[name] = _hashed_name(name, content)
+        else:
+            if first_party and name.endswith('.js'):
+                content = minify_js(content.decode('utf-8')).encode('utf-8')
+            manifest[name] = _hashed_name(name, content)
+
+        output = os.path.join(dist_dir, *manifest[name].split('/'))
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'wb') as target:
+            target.write(content)
+        if name.endswith(COMPRESSIBLE_EXTENSIONS):
+            with open(output + '.gz', 'wb') as target:
+                target.write(gzip.compress(content, 9, mtime=0))
+            if brotli is not None:
+                with open(output + '.br', 'wb') as target:
+                    target.write(brotli.compress(content, quality=11))
+
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w', encoding='utf-8') as target:
+        json.dump(manifest, target, indent=2, sort_keys=True)
+    return manifest
+
+def fetch(vendor_dir=VENDOR_DIR):
+    """Download the pinned third-party assets into vendor_dir"""
+    for name, url in VENDOR_ASSETS.items():
+        path = os.path.join(vendor_dir, *name.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response, open(path, 'wb') as target:
+            shutil.copyfileobj(response, target)
+        logger.info(f"Fetched {url} -> {path}")
+
+def load_manifest(dist_dir=DIST_DIR):
+    try:
+        with open(os.path.join(dist_dir, MANIFEST_NAME), encoding='utf-8') as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return {}
+
+def init_assets(app, dist_dir=None):
+    """Register asset_url() for templates and the /assets/ route for hashed files"""
+    dist_dir = dist_dir or DIST_DIR
+    manifest = load_manifest(dist_dir)
+    if not manifest:
+        logger.info("No asset manifest; serving static/src and CDN assets (run `python assets.py build`)")
+
+    def asset_url(name, fallback=None):
+        """URL of the built asset, else `fallback`, else the unbuilt source file"""
+        if name in manifest:
+            return url_for('asset_file', filename=manifest[name])
+        return fallback or url_for('static', filename='src/' + name)
+
+    app.jinja_env.globals['asset_url'] = asset_url
+
+    @app.route('/assets/<path:filename>')
+    def asset_file(filename):
+        """Hashed build output; the name changes with the content, so it never needs revalidating"""
+        path = os.path.join(dist_dir, *filename.split('/'))
+        if not os.path.isfile(path):
+            abort(404)
+        encoding = None
+        accepted = request.accept_encodings
+        for candidate, extension in (('br', '.br'), ('gzip', '.gz')):
+            if accepted[candidate] and os.path.isfile(path + extension):
+                encoding = candidate
+                break
+        if encoding:
+            import mimetypes
+            response = send_from_directory(dist_dir, filename + {'br': '.br', 'gzip': '.gz'}[encoding],
+                                           mimetype=mimetypes.guess_type(filename)[0], max_age=IMMUTABLE_MAX_AGE)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_from_directory(dist_dir, filename, max_age=IMMUTABLE_MAX_AGE)
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or fetch static assets')
+    parser.add_argument('command', choices=['build', 'fetch'])
+    parser.add_argument('--clean', action='store_true', help='remove previous build output first')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == 'fetch':
+        fetch()
+    else:
+        manifest = build(clean=args.clean)
+        print(json.dumps(manifest, indent=2, sort_keys=True))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import Config
+from rate_limiter import THROTTLED_ERROR, get_rate_limiter
+from results import snapshot_html
+from scraper import BROWSER_HEADERS, get_parsing_service
+from validation import NOT_FOUND_ERROR
+
+logger = logging.getLogger(__name__)
+
+def _no_progress(stage, **data):
+    pass
+
+class AsyncDelhiHighCourtScraper:
+    """
+    Asyncio counterpart of DelhiHighCourtScraper's requests-based path.
+
+    Runs the same GET-token / POST-form / parse flow on aiohttp so a single
+    event loop can keep many lookups in flight:
+    - One ClientSession (and connection pool) is shared by every lookup.
+    - A bounded semaphore per host caps concurrent requests to the court site.
+    - Each lookup runs under a deadline and is cancelled when it expires; one
+      that expires while waiting for the rate limiter is reported as throttled.
+    """
+
+    def __init__(self, max_per_host=None, max_connections=None, deadline=None):
+        self.base_url = "https://delhihighcourt.nic.in/"
+        self.search_url = "https://delhihighcourt.nic.in/case-status"
+        self.max_per_host = max_per_host or Config.ASYNC_MAX_PER_HOST
+        self.max_connections = max_connections or Config.ASYNC_MAX_CONNECTIONS
+        self.deadline = deadline or Config.SEARCH_TIMEOUT
+        self._session = None
+        self._semaphores = {}
+        self.rate_limiter = get_rate_limiter()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self):
+        """Create the shared ClientSession lazily, on the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=BROWSER_HEADERS)
+        return self._session
+
+    def _host_semaphore(self, url):
+        """Return the bounded semaphore guarding requests to url's host"""
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.BoundedSemaphore(self.max_per_host)
+        return self._semaphores[host]
+
+    async def preconnect(self, timeout=5):
+        """Open a keep-alive connection to the court site (DNS, TCP, TLS) before the first lookup"""
+        session = await self._get_session()
+        await self.rate_limiter.acquire_async()
+        async with session.head(self.base_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            return response.status
+
+    async def close(self):
+        """Close the shared session and its connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def search_case(self, case_type, case_number, filing_year, deadline=None, progress=None):
+        """
+        Search for a case on Delhi High Court website
+        progress: optional callback(stage, **data), called from the event loop thread
+        Returns: dict with case details and orders, or an 'error' key
+        """
+        deadline = deadline or self.deadline
+        lookup = {'throttling': False}
+        try:
+            return await asyncio.wait_for(
+                self._search(case_type, case_number, filing_year, progress or _no_progress, lookup),
+                timeout=deadline
+            )
+        except asyncio.TimeoutError:
+            if lookup['throttling']:
+                # Never reached the site: neither the limiter nor the circuit breaker should count it
+                logger.warning(f"Async search gave up waiting for the rate limiter after {deadline}s")
+                return {"error": THROTTLED_ERROR, "throttled": True}
+            logger.warning(f"Async search timed out after {deadline}s: {case_type}/{case_number}/{filing_year}")
+            self.rate_limiter.record_error()
+            return {"error": f"Search timed out after {deadline} seconds"}
+        except Exception as e:
+            logger.error(f"Async search failed: {str(e)}")
+            self.rate_limiter.record_error()
+            return {"error": f"Async search failed: {str(e)}"}
+
+    async def search_many(self, case_keys, deadline=None):
+        """Run several (case_type, case_number, filing_year) lookups concurrently"""
+        return await asyncio.gather(*[
+            self.search_case(case_type, case_number, filing_year, deadline=deadline)
+            for case_type, case_number, filing_year in case_keys
+        ])
+
+    async def _throttle(self, lookup):
+        """Wait for a rate limiter token, flagging the lookup as throttling meanwhile"""
+        lookup['throttling'] = True
+        await self.rate_limiter.acquire_async()
+        lookup['throttling'] = False
+
+    async def _search(self, case_type, case_number, filing_year, progress, lookup):
+        session = await self._get_session()
+        progress('driver_acquired', engine='async')
+
+        async with self._host_semaphore(self.search_url):
+            # Get the search page first for any required tokens
+            await self._throttle(lookup)
+            async with session.get(self.search_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                page_html = await response.text()
+            progress('page_loaded')
+
+            parser = get_parsing_service()
+            form_page = await parser.parse_async(page_html, kind='form')
+            csrf_token = form_page.get('csrf_token', '')
+
+            form_data = {
+                'case_type': case_type,
+                'case_number': case_number,
+                'filing_year': str(filing_year),
+                'csrf_token': csrf_token
+            }
+
+            # Submit the search form
+            await self._throttle(lookup)
+            async with session.post(self.search_url, data=form_data,
+                                    timeout=aiohttp.ClientTimeout(total=15)) as search_response:
+                search_response.raise_for_status()
+                result_html = await search_response.text()
+            progress('form_submitted')
+
+        # Parse off the event loop so other lookups keep moving
+        parsed = await parser.parse_async(result_html, kind='results')
+        if parsed.get('error'):
+            return {"error": parsed['error']}
+        if parsed['captcha']:
+            self.rate_limiter.record_captcha()
+            return {"error": "CAPTCHA detected in response"}
+        if parsed.get('not_found'):
+            self.rate_limiter.record_success()
+            return {"error": NOT_FOUND_ERROR, "not_found": True}
+
+        progress('details_extracted', case_details=parsed['case_details'])
+        progress('orders_extracted', orders=parsed['orders'])
+
+        self.rate_limiter.record_success()
+        return {
+            "success": True,
+            "case_details": parsed['case_details'],
+            "orders": parsed['orders'],
+            "raw_html": snapshot_html(result_html)
+        }
+
+class AsyncScraperRunner:
+    """
+    Owns a dedicated event-loop thread so synchronous callers (Flask views,
+    batch jobs, background schedulers) can drive AsyncDelhiHighCourtScraper.
+    """
+
+    def __init__(self, scraper=None):
+        self.scraper = scraper or AsyncDelhiHighCourtScraper()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='async-scraper-loop', daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop thread and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def search_case(self, case_type, case_number, filing_year, deadline=None, progress=None):
+        """Blocking search; cancels the in-flight lookup if the caller's deadline passes"""
+        deadline = deadline or self.scraper.deadline
+        future = self.submit(self.scraper.search_case(case_type, case_number, filing_year,
+                                                      deadline=deadline, progress=progress))
+        try:
+            # The coroutine enforces the deadline itself; allow a little slack for scheduling
+            return future.result(timeout=deadline + 1)
+        except Exception as e:
+            future.cancel()
+            return {"error": f"Async search failed: {str(e) or type(e).__name__}"}
+
+    def search_many(self, case_keys, deadline=None):
+        """Blocking batch search returning results in input order"""
+        return self.submit(self.scraper.search_many(case_keys, deadline=deadline)).result()
+
+    def shutdown(self):
+        """Close the shared session and stop the loop thread"""
+        if self.loop.is_running():
+            self.submit(self.scraper.close()).result(timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=5)
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_async_runner():
+    """Return the process-wide AsyncScraperRunner, starting it on first use"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncScraperRunner()
+        return _runner
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Browser-profile benchmark: the legacy full page load vs the lean profile.
+
+Each run starts a fresh local Chrome through DelhiHighCourtScraper.setup_driver()
+and loads the court site's case-status page:
+
+- load:  seconds spent in driver.get() (returns at the load event for the legacy
+         profile, at DOMContentLoaded for the lean one)
+- bytes: transferSize of the navigation plus every resource the page fetched,
+         from the Resource Timing API (blocked requests transfer nothing)
+- reqs:  number of resource entries
+
+The lean runs after the first start from a warm disk-cache slot, like
+production sessions do. Needs Chrome, ChromeDriver and network access.
+
+Usage: python benchmarks/bench_browser_profile.py [--runs 5] [--url URL]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import browser_profile  # noqa: E402
+from browser_profile import LeanProfile  # noqa: E402
+from scraper import DelhiHighCourtScraper  # noqa: E402
+
+TRANSFER_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return [entries.reduce((total, entry) => total + (entry.transferSize || 0), 0), entries.length - 1];
+"""
+
+def measure(url, lean):
+    browser_profile._profile = LeanProfile(enabled=lean)
+    scraper = DelhiHighCourtScraper()
+    if not scraper.setup_driver():
+        raise SystemExit("Could not start Chrome")
+    try:
+        started = time.perf_counter()
+        scraper.driver.get(url)
+        elapsed = time.perf_counter() - started
+        transferred, requests = scraper.driver.execute_script(TRANSFER_SCRIPT)
+        return elapsed, transferred, requests
+    finally:
+        scraper.close_driver()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--url', default=DelhiHighCourtScraper().search_url)
+    args = parser.parse_args()
+
+    print(f"{args.runs} runs against {args.url}")
+    print(f"{'profile':<9}{'load s':>10}{'KB':>10}{'reqs':>7}")
+    for name, lean in (('legacy', False), ('lean', True)):
+        runs = [measure(args.url, lean) for _ in range(args.runs)]
+        load = statistics.median(run[0] for run in runs)
+        transferred = statistics.median(run[1] for run in runs) / 1024
+        requests = statistics.median(run[2] for run in runs)
+        print(f"{name:<9}{load:>10.2f}{transferred:>10.1f}{requests:>7.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Browser memory benchmark: one browser per search vs tabs in shared browsers.
+
+Opens --searches pages at once, each loading --url, and measures the memory
+of every Chrome/ChromeDriver process started for them (proportional set size
+from /proc/<pid>/smaps_rollup, so pages shared between processes are split
+rather than counted once per process):
+
+- browsers: one local Chrome per search (BROWSER_TABS_PER_BROWSER=1)
+- tabs:     BrowserPool with --tabs tabs per browser
+
+Linux only; needs Chrome, ChromeDriver and network access.
+
+Usage: python benchmarks/bench_browser_tabs.py [--searches 8] [--tabs 8] [--url URL]
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserPool, _start_browser  # noqa: E402
+from scraper import DelhiHighCourtScraper  # noqa: E402
+
+def _children():
+    """Map of pid -> child pids for every process"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    return children
+
+def tree_pss_mb(root_pids):
+    """Summed PSS of root_pids and all their descendants, in MB"""
+    children, total = _children(), 0
+    pending = list(root_pids)
+    while pending:
+        pid = pending.pop()
+        pending += children.get(pid, [])
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as rollup:
+                total += sum(int(line.split()[1]) for line in rollup if line.startswith('Pss:'))
+        except OSError:
+            continue
+    return total / 1024
+
+def service_pid(driver):
+    return driver.service.process.pid
+
+def run_browsers(url, searches):
+    scrapers = [DelhiHighCourtScraper() for _ in range(searches)]
+    threads = [threading.Thread(target=lambda s=s: s.start_browser() and s.driver.get(url)) for s in scrapers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        return tree_pss_mb([service_pid(s.driver) for s in scrapers if s.driver])
+    finally:
+        for scraper in scrapers:
+            scraper.close_driver()
+
+def run_tabs(url, searches, tabs):
+    pool = BrowserPool(_start_browser, max_browsers=-(-searches // tabs), tabs_per_browser=tabs)
+    leased = []
+
+    def lookup():
+        tab = pool.acquire(timeout=60)
+        leased.append(tab)
+        tab.get(url)
+
+    threads = [threading.Thread(target=lookup) for _ in range(searches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        browsers = {tab.browser for tab in leased}
+        return tree_pss_mb([service_pid(browser.driver) for browser in browsers])
+    finally:
+        for tab in leased:
+            pool.release(tab)
+        pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--searches', type=int, default=8)
+    parser.add_argument('--tabs', type=int, default=8)
+    parser.add_argument('--url', default=DelhiHighCourtScraper().search_url)
+    args = parser.parse_args()
+
+    print(f"{args.searches} concurrent pages of {args.url}")
+    print(f"{'mode':<10}{'MB':>10}{'MB/search':>11}{'searches/GB':>13}")
+    for name, measure in (('browsers', lambda: run_browsers(args.url, args.searches)),
+                          ('tabs', lambda: run_tabs(args.url, args.searches, args.tabs))):
+        total = measure()
+        per_search = total / args.searches
+        print(f"{name:<10}{total:>10.0f}{per_search:>11.1f}{1024 / per_search:>13.1f}")
+
+if __name__ == '__main__':
+    main()
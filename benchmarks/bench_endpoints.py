@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Endpoint latency at production data volumes.
+
+Fill a database with generate_data.py first, then point this at it:
+
+    DATABASE_URL=sqlite:////tmp/scale.db python generate_data.py --cases 1000000
+    DATABASE_URL=sqlite:////tmp/scale.db python benchmarks/bench_endpoints.py
+
+Each endpoint is requested --requests times in-process (Flask test client,
+no network or browser), against keys sampled from the stored cases:
+
+- /api/cases first page and a deep page
+- /stats
+- /api/search with mode=swr (answered from the stored result)
+- /api/cases/<id>/orders first page
+
+Usage: python benchmarks/bench_endpoints.py [--requests 50] [--seed 1]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Stored results must never look stale here, or mode=swr would start scraping them
+os.environ.setdefault('SWR_MAX_AGE', str(10 ** 9))
+os.environ.setdefault('ENABLE_SCHEDULER', '0')
+
+from app import create_app  # noqa: E402
+from models import db, CaseQuery, CaseDetail  # noqa: E402
+
+def sample_cases(count, seed):
+    """count random (id, case_type, case_number, filing_year) tuples of cases with details"""
+    max_id = db.session.scalar(db.select(db.func.max(CaseQuery.id))) or 0
+    rng = random.Random(seed)
+    cases = []
+    while max_id and len(cases) < count:
+        row = db.session.execute(
+            db.select(CaseQuery.id, CaseQuery.case_type, CaseQuery.case_number, CaseQuery.filing_year)
+            .join(CaseDetail, CaseDetail.query_id == CaseQuery.id)
+            .where(CaseQuery.id >= rng.randint(1, max_id)).order_by(CaseQuery.id).limit(1)
+        ).first()
+        if row:
+            cases.append(tuple(row))
+    return cases
+
+def measure(request, repeat):
+    """Latencies in ms of repeat calls of request(n); every response must be a 200"""
+    timings = []
+    for n in range(repeat):
+        started = time.perf_counter()
+        response = request(n)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise SystemExit(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        total = db.session.scalar(db.select(db.func.count(CaseQuery.id)))
+        cases = sample_cases(args.requests, args.seed)
+    if not cases:
+        raise SystemExit("No stored cases; run generate_data.py first")
+
+    deep_page = max(total // 10 // 2, 1)
+    endpoints = (
+        ('/api/cases page 1', lambda n: client.get('/api/cases?page=1')),
+        (f'/api/cases page {deep_page}', lambda n: client.get(f'/api/cases?page={deep_page}')),
+        ('/stats', lambda n: client.get('/stats')),
+        ('/api/search swr', lambda n: client.post('/api/search', json={
+            'case_type': cases[n][1], 'case_number': cases[n][2], 'filing_year': str(cases[n][3]), 'mode': 'swr'})),
+        ('/api/cases/<id>/orders', lambda n: client.get(f'/api/cases/{cases[n][0]}/orders')),
+    )
+
+    print(f"{total} stored cases, {args.requests} requests per endpoint")
+    print(f"{'endpoint':<28}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, request in endpoints:
+        timings = sorted(measure(lambda n: request(n % len(cases)), args.requests))
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{name:<28}{statistics.median(timings):>10.1f}{p95:>10.1f}{timings[-1]:>10.1f}")
+
+if __name__ == '__main__':
+    main()
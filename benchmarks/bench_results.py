@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Result-model benchmark: ad-hoc scraper dicts vs the typed CaseResult.
+
+- memory:  tracemalloc bytes held per result once built (raw dict as the
+           scrapers return it, vs the normalized __slots__ objects)
+- request: cost of one /api/search response: normalize the scraper dict,
+           derive the persisted fields and serialize one page of orders.
+           "dict" replays the pre-CaseResult path (per-field date parsing in
+           persistence plus jsonify-style serialization of the raw dict).
+
+Usage: python benchmarks/bench_results.py [--results 1000] [--orders 20] [--repeat 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results import CaseResult  # noqa: E402
+
+def make_raw(index, orders):
+    """A live-scraper-shaped result; strings are built fresh so nothing is shared between results"""
+    return {
+        "success": True,
+        "case_details": {
+            "case_title": f"Sample Case {index} vs State",
+            "petitioner": f"Petitioner {index}",
+            "respondent": "State of Delhi",
+            "filing_date": "15/01/2023",
+            "next_hearing": f"{(index % 28) + 1:02d}/02/2024",
+            "case_status": "Pending",
+        },
+        "orders": [
+            {
+                "order_title": f"Order {n} in case {index}",
+                "order_date": f"{(n % 28) + 1:02d}/06/2023",
+                "order_type": "Order",
+                "pdf_url": f"https://delhihighcourt.nic.in/orders/{index}/{n}.pdf",
+                "order_description": f"Order dated {(n % 28) + 1:02d}/06/2023",
+            } for n in range(orders)
+        ],
+        "raw_html": "<html>" + "x" * 2000 + f"{index}</html>",
+    }
+
+def legacy_parse(value):
+    if isinstance(value, str) and value:
+        try:
+            return datetime.strptime(value, '%d/%m/%Y').date()
+        except ValueError:
+            return None
+    return value if isinstance(value, date) else None
+
+def legacy_request(raw, per_page):
+    """The dict path: persistence parsed each field itself; the API serialized the raw dict"""
+    details = raw['case_details']
+    fields = {
+        'case_title': details.get('case_title', ''),
+        'petitioner': details.get('petitioner', ''),
+        'respondent': details.get('respondent', ''),
+        'filing_date': legacy_parse(details.get('filing_date')),
+        'next_hearing_date': legacy_parse(details.get('next_hearing_date') or details.get('next_hearing')),
+        'case_status': details.get('case_status', ''),
+        'raw_response': raw.get('raw_html', ''),
+    }
+    order_dates = [legacy_parse(order.get('order_date')) for order in raw.get('orders', [])]
+    body = {'success': True, 'case_details': details, 'orders': raw.get('orders', [])[:per_page]}
+    return fields, order_dates, json.dumps(body, default=str)
+
+def typed_request(raw, per_page):
+    result = CaseResult.from_scraper(raw)
+    body = {'success': True, 'case_details': result.case_details.to_dict(),
+            'orders': [order.to_dict() for order in result.orders[:per_page]]}
+    return result, json.dumps(body)
+
+def held_bytes(build, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [build(index) for index in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--results', type=int, default=1000)
+    parser.add_argument('--orders', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--per-page', type=int, default=10)
+    args = parser.parse_args()
+
+    dict_bytes = held_bytes(lambda index: make_raw(index, args.orders), args.results)
+    typed_bytes = held_bytes(lambda index: CaseResult.from_scraper(make_raw(index, args.orders)), args.results)
+
+    raw = make_raw(0, args.orders)
+    dict_us = min(timeit.repeat(lambda: legacy_request(raw, args.per_page), number=args.repeat, repeat=3))
+    typed_us = min(timeit.repeat(lambda: typed_request(raw, args.per_page), number=args.repeat, repeat=3))
+    dict_us, typed_us = dict_us / args.repeat * 1e6, typed_us / args.repeat * 1e6
+
+    print(f"{args.results} results x {args.orders} orders, {args.per_page} orders per page")
+    print(f"{'model':<8}{'bytes/result':>14}{'us/request':>12}")
+    print(f"{'dict':<8}{dict_bytes:>14.0f}{dict_us:>12.1f}")
+    print(f"{'typed':<8}{typed_bytes:>14.0f}{typed_us:>12.1f}")
+
+if __name__ == '__main__':
+    main()
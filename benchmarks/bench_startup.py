@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Flask app.
+
+Each scenario runs in a fresh interpreter so nothing is cached between runs:
+- eager: imports Selenium, webdriver-manager and bs4 up front (the old import graph)
+- full:  default mode, browser dependencies load on first scrape
+- api:   APP_MODE=api read-only node
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+if sys.argv[1] == 'eager':
+    import selenium.webdriver, webdriver_manager.chrome, bs4  # noqa: F401
+from app import create_app
+create_app()
+elapsed = time.perf_counter() - t0
+try:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss_kb //= 1024
+except ImportError:
+    rss_kb = None
+print(json.dumps({
+    'seconds': elapsed,
+    'rss_kb': rss_kb,
+    'browser_modules': sorted(m for m in ('selenium', 'webdriver_manager', 'bs4') if m in sys.modules),
+}))
+"""
+
+def run_scenario(name, runs):
+    env = dict(os.environ, DATABASE_URL='sqlite:///:memory:')
+    if name == 'api':
+        env['APP_MODE'] = 'api'
+    else:
+        env.pop('APP_MODE', None)
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, name],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<10}{'median ms':>12}{'max RSS MB':>12}  browser modules loaded")
+    for name in ('eager', 'full', 'api'):
+        samples = run_scenario(name, args.runs)
+        median_ms = statistics.median(s['seconds'] for s in samples) * 1000
+        rss = samples[-1]['rss_kb']
+        rss_mb = f"{statistics.median(s['rss_kb'] for s in samples) / 1024:.1f}" if rss is not None else 'n/a'
+        modules = ', '.join(samples[-1]['browser_modules']) or '-'
+        print(f"{name:<10}{median_ms:>12.1f}{rss_mb:>12}  {modules}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import logging
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RemoteEndpointPool:
+    """
+    Remote WebDriver endpoints (Selenium Grid nodes or chromedriver servers)
+    with least-sessions load balancing and per-endpoint health.
+
+    An endpoint that fails failure_threshold session starts in a row is
+    skipped for cooldown seconds, then tried again; one success makes it
+    healthy. When every endpoint is cooling down, the one due back soonest is
+    still tried rather than failing outright.
+    """
+
+    def __init__(self, urls, failure_threshold=None, cooldown=None):
+        self.failure_threshold = failure_threshold or Config.SELENIUM_REMOTE_FAILURE_THRESHOLD
+        self.cooldown = Config.SELENIUM_REMOTE_COOLDOWN if cooldown is None else cooldown
+        self._endpoints = {
+            url: {'active': 0, 'failures': 0, 'down_until': 0.0, 'sessions': 0, 'last_error': None}
+            for url in urls
+        }
+        self._order = list(self._endpoints)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._order)
+
+    def candidates(self):
+        """Endpoints in the order to try them: healthy by fewest active sessions, then cooling down"""
+        with self._lock:
+            now = time.monotonic()
+            # Rotate the starting point so ties spread across endpoints
+            rotated = self._order[self._next:] + self._order[:self._next]
+            self._next = (self._next + 1) % max(1, len(self._order))
+            healthy = [url for url in rotated if self._endpoints[url]['down_until'] <= now]
+            cooling = [url for url in rotated if self._endpoints[url]['down_until'] > now]
+            healthy.sort(key=lambda url: self._endpoints[url]['active'])
+            cooling.sort(key=lambda url: self._endpoints[url]['down_until'])
+            return healthy + cooling
+
+    def connect(self, factory):
+        """
+        Start a session with factory(url) on the best endpoint, failing over to
+        the next on error. Returns (url, driver); raises if every endpoint failed.
+        """
+        errors = []
+        for url in self.candidates():
+            try:
+                driver = factory(url)
+            except Exception as e:
+                self.record_failure(url, str(e))
+                errors.append(f"{url}: {str(e)}")
+                continue
+            self.record_success(url)
+            return url, driver
+        raise RuntimeError("No remote WebDriver endpoint available: " + "; ".join(errors))
+
+    def record_success(self, url):
+        with self._lock:
+            endpoint = self._endpoints[url]
+            endpoint['failures'] = 0
+            endpoint['down_until'] = 0.0
+            endpoint['active'] += 1
+            endpoint['sessions'] += 1
+
+    def record_failure(self, url, error=None):
+        with self._lock:
+            endpoint = self._endpoints[url]
+            endpoint['failures'] += 1
+            endpoint['last_error'] = error
+            if endpoint['failures'] >= self.failure_threshold:
+                endpoint['down_until'] = time.monotonic() + self.cooldown
+                logger.warning(f"Remote WebDriver {url} marked down for {self.cooldown}s: {error}")
+
+    def release(self, url):
+        """A session started by connect() has ended"""
+        with self._lock:
+            endpoint = self._endpoints[url]
+            endpoint['active'] = max(0, endpoint['active'] - 1)
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    'url': url,
+                    'healthy': endpoint['down_until'] <= now,
+                    'active_sessions': endpoint['active'],
+                    'sessions_started': endpoint['sessions'],
+                    'consecutive_failures': endpoint['failures'],
+                    'last_error': endpoint['last_error'],
+                } for url, endpoint in self._endpoints.items()
+            ]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_endpoint_pool():
+    """Return the process-wide pool for SELENIUM_REMOTE_URLS, or None in local-browser mode"""
+    global _pool
+    if not Config.SELENIUM_REMOTE_URLS:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = RemoteEndpointPool(Config.SELENIUM_REMOTE_URLS)
+        return _pool
@@ -0,0 +1,305 @@
+"""
+Shared Chrome instances serving several lookups at once, one tab each.
+
+A browser process costs hundreds of MB while a tab in it costs tens, so with
+BROWSER_TABS_PER_BROWSER > 1 searches lease a tab (BrowserTab) from a
+process-wide pool instead of starting a browser of their own.
+
+A WebDriver session only drives one window at a time, so each browser has a
+lock: every command a tab sends takes it, switches the session to the tab's
+window handle if another tab was last active, and runs. Everything a lookup
+does between commands (waiting for the site, rate-limit waits, parsing
+snapshots) runs without the lock, which is where concurrent tabs overlap.
+
+Page loads are the longest wait of all, so shared browsers run with
+pageLoadStrategy none: get() and a navigating click return as soon as the
+navigation starts, and BrowserTab.navigate() then polls document.readyState
+(one short command per poll) until the page reaches the readiness the
+profile's strategy stands for. Other tabs run their commands in between.
+
+Each tab lives in its own CDP browser context (cookies, storage and cache
+separate from the other tabs, like an incognito window) that is disposed when
+the lease ends. Sessions without CDP fall back to plain tabs, which share
+cookies.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from browser_profile import execute_cdp, get_lean_profile
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Results passed back from the browser as-is; anything else (elements, switch_to) is proxied
+_PLAIN_TYPES = (str, bytes, int, float, bool, dict, type(None))
+
+# document.readyState values that end a navigation, per the profile's page load strategy (none: no wait)
+READY_STATES = {'normal': ('complete',), 'eager': ('interactive', 'complete'), 'none': None}
+READY_POLL_INTERVAL = 0.1
+# Set on the old document before navigating; the new document starts without it
+MARK_SCRIPT = 'window.__tabNavigation = true;'
+READY_SCRIPT = "return window.__tabNavigation ? 'unloaded' : document.readyState;"
+
+class _TabProxy:
+    """Forwards attribute access to a driver or element after switching the session to its tab"""
+    __slots__ = ('_browser', '_handle', '_target')
+
+    def __init__(self, browser, handle, target):
+        self._browser = browser
+        self._handle = handle
+        self._target = target
+
+    def _wrap(self, value):
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if isinstance(value, _PLAIN_TYPES):
+            return value
+        return _TabProxy(self._browser, self._handle, value)
+
+    def __getattr__(self, name):
+        with self._browser.lock:
+            self._browser.activate(self._handle)
+            value = getattr(self._target, name)  # properties like page_source run here
+        if not callable(value):
+            return self._wrap(value)
+
+        def call(*args, **kwargs):
+            with self._browser.lock:
+                self._browser.activate(self._handle)
+                return self._wrap(value(*args, **kwargs))
+        return call
+
+class BrowserTab(_TabProxy):
+    """One lookup's page: used exactly like a WebDriver; return it to the pool when done"""
+    __slots__ = ('context', 'ready_states')
+
+    def __init__(self, browser, handle, context, ready_states=READY_STATES['normal']):
+        super().__init__(browser, handle, browser.driver)
+        self.context = context
+        self.ready_states = ready_states
+
+    def get(self, url):
+        """Load url, holding the browser lock only to start the navigation; raises TimeoutError"""
+        if not self.navigate(lambda: self._target.get(url)):
+            raise TimeoutError(f"Page did not load within {Config.SEARCH_TIMEOUT}s: {url}")
+
+    def navigate(self, start, timeout=None):
+        """
+        Call start() (a get or a click that leaves the page) under the lock, then
+        wait outside it for the next page. False if none was ready within timeout.
+        """
+        with self._browser.lock:
+            self._browser.activate(self._handle)
+            if self.ready_states is not None:
+                self._target.execute_script(MARK_SCRIPT)
+            start()
+        if self.ready_states is None:
+            return True
+        deadline = time.monotonic() + (timeout or Config.SEARCH_TIMEOUT)
+        while time.monotonic() < deadline:
+            time.sleep(READY_POLL_INTERVAL)
+            with self._browser.lock:
+                self._browser.activate(self._handle)
+                try:
+                    state = self._target.execute_script(READY_SCRIPT)
+                except Exception:
+                    state = None  # the old document went away mid-script; ask the new one next time
+            if state in self.ready_states:
+                return True
+        return False
+
+    @property
+    def browser(self):
+        return self._browser
+
+    @property
+    def handle(self):
+        return self._handle
+
+class SharedBrowser:
+    """A started browser and the tabs open in it"""
+
+    def __init__(self, owner):
+        # owner started the browser (DelhiHighCourtScraper.start_browser) and knows how to quit it
+        self.owner = owner
+        self.driver = owner.driver
+        self.lock = threading.RLock()
+        # The first window is never leased: it keeps the session alive while tabs open and close
+        self.current = self.driver.current_window_handle
+        self.active = 0
+        self.served = 0
+        self.broken = False
+
+    def activate(self, handle):
+        """Point the session at handle (caller holds the lock)"""
+        if self.current != handle:
+            self.driver.switch_to.window(handle)
+            self.current = handle
+
+    def open_tab(self):
+        """Open a tab in a fresh browser context; returns (handle, context id or None)"""
+        with self.lock:
+            before = set(self.driver.window_handles)
+            context = None
+            try:
+                context = execute_cdp(self.driver, 'Target.createBrowserContext', {})['browserContextId']
+                target = execute_cdp(self.driver, 'Target.createTarget',
+                                     {'url': 'about:blank', 'browserContextId': context})['targetId']
+            except Exception as e:
+                if context is not None:
+                    raise
+                logger.warning(f"No CDP browser contexts ({str(e)}); tabs will share cookies")
+                target = None
+                self.driver.switch_to.new_window('tab')
+            handles = set(self.driver.window_handles) - before
+            # chromedriver names windows by target id; the diff covers servers that do not
+            handle = target if target in handles or not handles else handles.pop()
+            if target is None:
+                self.current = handle  # new_window() switched the session to it
+            self.served += 1
+            return handle, context
+
+    def close_tab(self, handle, context):
+        with self.lock:
+            try:
+                if context is not None:
+                    execute_cdp(self.driver, 'Target.disposeBrowserContext', {'browserContextId': context})
+                else:
+                    self.activate(handle)
+                    self.driver.close()
+            finally:
+                if self.current == handle:
+                    self.current = None  # the next command must switch to a live window
+
+    def quit(self):
+        try:
+            self.owner.close_driver()
+        except Exception as e:
+            logger.warning(f"Error quitting shared browser: {str(e)}")
+
+class BrowserPool:
+    """
+    Up to max_browsers browsers with up to tabs_per_browser leased tabs each.
+    New tabs go to the busiest browser that still has room, so load packs
+    into as few browsers as possible; another browser starts only when every
+    running one is full.
+    """
+
+    def __init__(self, start_browser, max_browsers=None, tabs_per_browser=None, profile=None):
+        self.start_browser = start_browser
+        self.max_browsers = max_browsers or Config.BROWSER_POOL_SIZE
+        self.tabs_per_browser = tabs_per_browser or Config.BROWSER_TABS_PER_BROWSER
+        self.profile = profile or get_lean_profile()
+        # start_browser must start browsers with pageLoadStrategy none; tabs wait as the profile says
+        self.ready_states = READY_STATES[self.profile.page_load_strategy if self.profile.enabled else 'normal']
+        self._browsers = []
+        self._starting = 0
+        self._condition = threading.Condition()
+
+    def _reserve(self, timeout):
+        """A browser with a tab reserved for the caller, or None if the caller should start one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                open_browsers = [browser for browser in self._browsers
+                                 if not browser.broken and browser.active < self.tabs_per_browser]
+                if open_browsers:
+                    browser = max(open_browsers, key=lambda candidate: candidate.active)
+                    browser.active += 1
+                    return browser
+                if len(self._browsers) + self._starting < self.max_browsers:
+                    self._starting += 1
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"All {self.max_browsers * self.tabs_per_browser} browser tabs are busy")
+                self._condition.wait(remaining)
+
+    def _start(self):
+        try:
+            browser = SharedBrowser(self.start_browser())
+        except Exception:
+            with self._condition:
+                self._starting -= 1
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            self._starting -= 1
+            browser.active = 1
+            self._browsers.append(browser)
+        logger.info(f"Started shared browser {len(self._browsers)}/{self.max_browsers}")
+        return browser
+
+    def acquire(self, timeout=None):
+        """Lease a tab, waiting up to timeout seconds for one to free up; raises TimeoutError"""
+        browser = self._reserve(timeout) or self._start()
+        try:
+            handle, context = browser.open_tab()
+        except Exception:
+            browser.broken = True
+            self._finish(browser)
+            raise
+        tab = BrowserTab(browser, handle, context, self.ready_states)
+        try:
+            # Request blocking is per page target, so each new tab needs it installed
+            self.profile.apply_session(tab)
+        except Exception:
+            self.release(tab)
+            raise
+        return tab
+
+    def release(self, tab):
+        """Close a leased tab and its browser context"""
+        browser = tab.browser
+        try:
+            browser.close_tab(tab.handle, tab.context)
+        except Exception as e:
+            logger.warning(f"Could not close tab, retiring its browser: {str(e)}")
+            browser.broken = True
+        self._finish(browser)
+
+    def _finish(self, browser):
+        with self._condition:
+            browser.active -= 1
+            retire = browser.broken and browser.active == 0
+            if retire:
+                self._browsers.remove(browser)
+            self._condition.notify_all()
+        if retire:
+            browser.quit()
+
+    def snapshot(self):
+        with self._condition:
+            return [
+                {'active_tabs': browser.active, 'tabs_served': browser.served, 'broken': browser.broken}
+                for browser in self._browsers
+            ]
+
+    def close(self):
+        """Quit every browser (tabs still leased fail on their next command)"""
+        with self._condition:
+            browsers, self._browsers = self._browsers, []
+        for browser in browsers:
+            browser.quit()
+
+def _start_browser():
+    from scraper import DelhiHighCourtScraper
+    owner = DelhiHighCourtScraper()
+    if not owner.start_browser(shared=True):
+        raise RuntimeError("Could not start a shared browser")
+    return owner
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Return the process-wide tab pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(_start_browser)
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,163 @@
+"""
+Lean Chrome profile for scraping sessions.
+
+Only the HTML and the court site's scripts matter to a search, so the lean
+profile:
+- returns from driver.get() at DOMContentLoaded (pageLoadStrategy eager) or
+  immediately (none) instead of waiting for the load event;
+- blocks resource types (images, stylesheets, fonts, media) and deny-listed
+  URL patterns at the network layer via CDP Network.setBlockedURLs;
+- optionally lets only allow-listed hosts resolve, which cuts off every
+  third-party script, font and tracker;
+- points local browsers at a disk cache that persists across sessions.
+
+Chrome's disk cache must not be shared by two live browsers, so the cache
+directory is split into slots; a session holds one slot (an exclusive file
+lock) until its driver quits, and the next session reuses the warm slot.
+"""
+
+import logging
+import os
+import threading
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows: slots are only exclusive within this process
+    fcntl = None
+
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# CDP blocks by URL pattern, so resource types map to the extensions that carry them
+RESOURCE_TYPE_PATTERNS = {
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp'),
+    'stylesheet': ('css',),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'ogg', 'mp3', 'wav'),
+    'script': ('js',),
+}
+
+def execute_cdp(driver, cmd, params):
+    """Run a CDP command on a local (execute_cdp_cmd) or remote chromedriver session"""
+    if hasattr(driver, 'execute_cdp_cmd'):
+        return driver.execute_cdp_cmd(cmd, params)
+    # webdriver.Remote does not know chromedriver's vendor endpoint; register it first
+    driver.command_executor._commands['executeCdpCommand'] = ('POST', '/session/$sessionId/goog/cdp/execute')
+    return driver.execute('executeCdpCommand', {'cmd': cmd, 'params': params})['value']
+
+class CacheSlots:
+    """Directories under root handed to one browser at a time and reused across sessions"""
+
+    def __init__(self, root, max_slots=64):
+        self.root = root
+        self.max_slots = max_slots
+        self._held = {}
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Path of a free slot (locked until release), or None if all are busy"""
+        with self._lock:
+            for index in range(self.max_slots):
+                path = os.path.join(self.root, f'slot-{index}')
+                if path in self._held:
+                    continue
+                os.makedirs(path, exist_ok=True)
+                handle = open(os.path.join(path, '.lock'), 'a')
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:  # another process's browser is using it
+                        handle.close()
+                        continue
+                self._held[path] = handle
+                return path
+        logger.warning(f"All {self.max_slots} browser cache slots are busy; starting without a disk cache")
+        return None
+
+    def release(self, path):
+        with self._lock:
+            handle = self._held.pop(path, None)
+        if handle is not None:
+            handle.close()  # closing drops the flock
+
+class LeanProfile:
+    """Builds the lean Chrome options and session settings from Config (see module docstring)"""
+
+    def __init__(self, enabled=None, page_load_strategy=None, block_resource_types=None, blocked_urls=None,
+                 allowed_hosts=None, cache_dir=None, cache_size=None):
+        self.enabled = Config.BROWSER_LEAN_PROFILE if enabled is None else enabled
+        self.page_load_strategy = page_load_strategy or Config.BROWSER_PAGE_LOAD_STRATEGY
+        if self.page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            raise ValueError(f"pageLoadStrategy must be one of {', '.join(PAGE_LOAD_STRATEGIES)}")
+        self.block_resource_types = (Config.BROWSER_BLOCK_RESOURCE_TYPES if block_resource_types is None
+                                     else block_resource_types)
+        unknown = set(self.block_resource_types) - set(RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown resource types to block: {', '.join(sorted(unknown))}")
+        self.blocked_urls = Config.BROWSER_BLOCKED_URLS if blocked_urls is None else blocked_urls
+        self.allowed_hosts = Config.BROWSER_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+        cache_dir = Config.BROWSER_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache_size = cache_size or Config.BROWSER_CACHE_SIZE
+        self.cache_slots = CacheSlots(os.path.abspath(cache_dir)) if cache_dir else None
+
+    def blocked_url_patterns(self):
+        patterns = []
+        for resource_type in self.block_resource_types:
+            for extension in RESOURCE_TYPE_PATTERNS[resource_type]:
+                # With and without a query string; a pattern must match the whole URL
+                patterns += [f'*.{extension}', f'*.{extension}?*']
+        return patterns + list(self.blocked_urls)
+
+    def apply_options(self, chrome_options, local=True):
+        """
+        Configure chrome_options before the session starts. Returns the cache
+        slot taken for a local browser (pass it to release()), else None.
+        """
+        if not self.enabled:
+            return None
+        chrome_options.page_load_strategy = self.page_load_strategy
+        if 'image' in self.block_resource_types:
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        if self.allowed_hosts:
+            rules = ', '.join(['MAP * ~NOTFOUND'] + [f'EXCLUDE {host}' for host in self.allowed_hosts])
+            chrome_options.add_argument(f'--host-resolver-rules={rules}')
+
+        # A remote browser's cache directory would live on the remote host
+        slot = self.cache_slots.acquire() if local and self.cache_slots else None
+        if slot:
+            chrome_options.add_argument(f'--disk-cache-dir={slot}')
+            chrome_options.add_argument(f'--disk-cache-size={self.cache_size}')
+        return slot
+
+    def apply_session(self, driver):
+        """Install network blocking on a started session; True if it took effect"""
+        if not self.enabled:
+            return False
+        patterns = self.blocked_url_patterns()
+        if not patterns:
+            return True
+        try:
+            execute_cdp(driver, 'Network.enable', {})
+            execute_cdp(driver, 'Network.setBlockedURLs', {'urls': patterns})
+            return True
+        except Exception as e:
+            logger.warning(f"Could not install request blocking: {str(e)}")
+            return False
+
+    def release(self, slot):
+        if slot and self.cache_slots:
+            self.cache_slots.release(slot)
+
+_profile = None
+_profile_lock = threading.Lock()
+
+def get_lean_profile():
+    """Return the process-wide browser profile"""
+    global _profile
+    with _profile_lock:
+        if _profile is None:
+            _profile = LeanProfile()
+        return _profile
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Resumable bulk lookup of many cases.
+
+Reads case keys (case_type, case_number, filing_year) from a CSV file with a
+header row or from JSON lines, looks them up --concurrency at a time through
+the configured scraping engine, and stores each result like a live search
+(a case already stored from the court site is refreshed in place).
+
+Every finished key is appended to a checkpoint file (JSON lines, flushed per
+key), so a rerun with the same --state skips what is already done. Keys
+that are invalid or that the court reports as not found count as finished;
+transient failures (CAPTCHA, timeouts, an open circuit) are retried by the
+next run. Throughput, ETA and a failure breakdown are logged every
+--report-interval seconds.
+
+Usage: python bulk_lookup.py cases.csv [--state cases.csv.state.jsonl] [--concurrency 4]
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from circuit_breaker import get_circuit_breaker
+from config import Config
+from models import db, CaseQuery, CaseDetail
+from persistence import save_case_details, refresh_case_details
+from rate_limiter import THROTTLED_ERROR
+from results import CaseResult
+from validation import NOT_FOUND_ERROR, get_negative_cache, normalize_case_key
+
+logger = logging.getLogger(__name__)
+
+# Outcomes that finish a key; anything else is a failure retried on the next run
+FINISHED = ('done', 'not_found', 'invalid')
+
+def read_keys(path, input_format=None):
+    """Yield (line number, dict) per case key in a CSV (with header) or JSON lines file"""
+    input_format = input_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as f:
+        if input_format == 'csv':
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield line_no, row
+            return
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line)
+                except ValueError:
+                    yield line_no, {}
+
+class Checkpoint:
+    """Append-only record of finished keys; survives crashes up to the last flushed line"""
+
+    def __init__(self, path):
+        self.path = path
+        self.finished = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.finished[tuple(entry['key'])] = entry['status']
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self.finished
+
+    def record(self, key, status, **extra):
+        with self._lock:
+            self.finished[key] = status
+            self._file.write(json.dumps(dict(key=list(key), status=status, **extra)) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+class Progress:
+    """Counts outcomes and logs throughput, ETA and failures"""
+
+    def __init__(self, total, interval=10):
+        self.total = total
+        self.interval = interval
+        self.outcomes = Counter()
+        self.failures = Counter()
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+
+    @property
+    def processed(self):
+        return sum(self.outcomes.values())
+
+    def record(self, outcome, error=None):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            if outcome not in FINISHED:
+                self.failures[error or outcome] += 1
+            if time.monotonic() - self._last_report >= self.interval:
+                self._last_report = time.monotonic()
+                self.report()
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.processed / elapsed if elapsed else 0.0
+        remaining = self.total - self.processed
+        eta = f"{remaining / rate / 60:.1f} min" if rate else 'unknown'
+        logger.info(f"{self.processed}/{self.total} keys, {rate * 60:.1f}/min, ETA {eta}; "
+                    + ', '.join(f'{outcome} {count}' for outcome, count in sorted(self.outcomes.items())))
+        if self.failures:
+            logger.info('Failures: ' + ', '.join(f'{error} x{count}' for error, count in self.failures.most_common(5)))
+
+def _failure_kind(error):
+    """Short failure category for the breakdown"""
+    if error == THROTTLED_ERROR:
+        return 'throttled'
+    if 'CAPTCHA' in error:
+        return 'captcha'
+    if 'circuit open' in error:
+        return 'circuit_open'
+    return error[:60]
+
+def _default_scrape():
+    """One scraper per thread, on the configured engine"""
+    local = threading.local()
+
+    def scrape(case_type, case_number, filing_year):
+        if Config.SCRAPER_ENGINE == 'async':
+            from async_scraper import get_async_runner
+            return get_async_runner().search_case(case_type, case_number, filing_year)
+        if not hasattr(local, 'scraper'):
+            from scraper import DelhiHighCourtScraper
+            local.scraper = DelhiHighCourtScraper()
+        return local.scraper.search_case(case_type, case_number, filing_year)
+    return scrape
+
+def store_result(case_type, case_number, filing_year, result):
+    """Refresh the stored court-site result for this key, or store a new one; returns the CaseQuery id"""
+    case_query = CaseQuery.query.join(CaseDetail).filter(
+        CaseQuery.case_type == case_type,
+        CaseQuery.case_number == case_number,
+        CaseQuery.filing_year == filing_year,
+        CaseQuery.status == 'success'
+    ).order_by(CaseQuery.search_timestamp.desc(), CaseQuery.id.desc()).first()
+    if case_query is None:
+        case_query = CaseQuery(case_type=case_type, case_number=case_number, filing_year=filing_year,
+                               status='success')
+        db.session.add(case_query)
+        db.session.flush()
+        save_case_details(case_query, result)
+    else:
+        refresh_case_details(case_query, result)
+    db.session.commit()
+    return case_query.id
+
+def lookup_case(app, key, scrape, stop=None):
+    """
+    Scrape and store one key behind the negative cache and circuit breaker;
+    returns (outcome, detail). While the circuit is open it waits rather than
+    failing every remaining key, until stop is set.
+    """
+    negative_cache = get_negative_cache()
+    if key in negative_cache:
+        return 'not_found', NOT_FOUND_ERROR
+    breaker = get_circuit_breaker()
+    stop = stop or threading.Event()
+    while not breaker.allow_request():
+        if stop.wait(1):
+            return 'failed', 'Court website unavailable (circuit open)'
+    try:
+        result = CaseResult.from_scraper(scrape(*key))
+    except Exception as e:
+        breaker.record_failure(str(e))
+        return 'failed', str(e)
+    if result.not_found:
+        negative_cache.add(key)
+        breaker.record_success()
+        return 'not_found', result.error
+    if result.throttled:
+        # Local backpressure: the breaker only tracks the court site, but a half-open probe slot is returned
+        breaker.release_probe()
+        return 'failed', result.error
+    if result.error:
+        breaker.record_failure(result.error)
+        return 'failed', result.error
+    breaker.record_success()
+    with app.app_context():
+        try:
+            return 'done', store_result(*key, result)
+        finally:
+            db.session.remove()
+
+def run_bulk(app, rows, checkpoint, concurrency=4, scrape=None, report_interval=10):
+    """
+    Look up every key in rows ((line number, dict) pairs) not yet in checkpoint.
+    Returns the Progress with the run's outcome counts.
+    """
+    scrape = scrape or _default_scrape()
+    pending, seen = [], set()
+    progress = Progress(0, report_interval)
+    for line_no, row in rows:
+        try:
+            key = normalize_case_key(row.get('case_type', ''), row.get('case_number', ''),
+                                     row.get('filing_year', ''))
+        except (AttributeError, ValueError) as e:
+            logger.warning(f"Line {line_no}: {e}")
+            progress.record('invalid')
+            continue
+        if key in seen or key in checkpoint:
+            continue
+        seen.add(key)
+        pending.append(key)
+    progress.total = progress.processed + len(pending)
+    skipped = len(checkpoint.finished)
+    logger.info(f"{len(pending)} keys to look up ({skipped} already finished in {checkpoint.path})")
+
+    stop = threading.Event()
+
+    def run(key):
+        outcome, detail = lookup_case(app, key, scrape, stop)
+        if outcome == 'done':
+            checkpoint.record(key, outcome, query_id=detail)
+            progress.record(outcome)
+        elif outcome in FINISHED:
+            checkpoint.record(key, outcome, error=detail)
+            progress.record(outcome)
+        else:
+            progress.record(outcome, _failure_kind(detail))
+
+    # At most concurrency lookups in flight; keys are submitted as slots free up
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-lookup') as executor:
+        in_flight = set()
+        keys = iter(pending)
+        try:
+            for key in keys:
+                if len(in_flight) >= concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                in_flight.add(executor.submit(run, key))
+            for future in wait(in_flight).done:
+                future.result()
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; finishing lookups in flight (rerun to resume)")
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+    progress.report()
+    return progress
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='CSV (case_type,case_number,filing_year header) or JSON lines file')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help='input format (default: from the extension)')
+    parser.add_argument('--state', help='checkpoint file (default: <input>.state.jsonl)')
+    parser.add_argument('--concurrency', type=int, default=4, help='lookups in flight at once')
+    parser.add_argument('--report-interval', type=float, default=10, help='seconds between progress lines')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+    checkpoint = Checkpoint(args.state or args.input + '.state.jsonl')
+    try:
+        progress = run_bulk(app, read_keys(args.input, args.format), checkpoint, args.concurrency,
+                            report_interval=args.report_interval)
+    finally:
+        checkpoint.close()
+    failed = progress.processed - sum(progress.outcomes[outcome] for outcome in FINISHED)
+    if failed:
+        logger.warning(f"{failed} keys failed; rerun the same command to retry them")
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Change feed for downstream mirrors.
+
+Every flush that inserts, updates or deletes a CaseQuery, CaseDetail or
+CourtOrder appends ChangeLog rows in the same transaction, so a change and
+its sequence number commit (or roll back) together. /api/changes reads the
+log by primary key after a client's cursor: each sync costs the number of
+changes since the last one, not the size of the tables.
+
+Bulk query.update()/delete() calls bypass the ORM flush; callers that use
+them on tracked tables report the affected ids with log_changes().
+
+Sequence numbers are assigned at insert time, so readers only stay correct
+if commits land in sequence order: otherwise a transaction holding a lower
+number could commit after a reader has passed it. SQLite serializes writers.
+On PostgreSQL each transaction takes a transaction-scoped advisory lock
+before its first ChangeLog insert and keeps it until it commits or rolls
+back, so writers of the log take their numbers one transaction at a time.
+"""
+
+import base64
+from datetime import date, datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import db, CaseQuery, CaseDetail, CourtOrder, ChangeLog
+
+TRACKED = {
+    CaseQuery: 'case_query',
+    CaseDetail: 'case_detail',
+    CourtOrder: 'court_order',
+}
+MODELS = {entity: model for model, entity in TRACKED.items()}
+
+# Columns left out of feed records (the raw court-site HTML is large and only kept for debugging)
+EXCLUDED_COLUMNS = {'raw_response'}
+
+# pg_advisory_xact_lock key of the change log's writers
+CHANGE_LOG_LOCK_KEY = 0x63686c67
+
+def _serialize_writers(connection):
+    """On PostgreSQL, wait until no other open transaction has written the change log"""
+    if connection.dialect.name == 'postgresql':
+        connection.execute(db.text('SELECT pg_advisory_xact_lock(:key)'), {'key': CHANGE_LOG_LOCK_KEY})
+
+def _entry(obj, operation):
+    return {'entity': TRACKED[type(obj)], 'entity_id': obj.id, 'operation': operation,
+            'changed_at': datetime.utcnow()}
+
+@event.listens_for(Session, 'after_flush')
+def _record_changes(db_session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here, and every new object has its id
+    entries = [_entry(obj, 'upsert') for obj in db_session.new if type(obj) in TRACKED]
+    entries += [_entry(obj, 'upsert') for obj in db_session.dirty
+                if type(obj) in TRACKED and db_session.is_modified(obj, include_collections=False)]
+    entries += [_entry(obj, 'delete') for obj in db_session.deleted if type(obj) in TRACKED]
+    if entries:
+        connection = db_session.connection()
+        _serialize_writers(connection)
+        connection.execute(ChangeLog.__table__.insert(), entries)
+
+def log_changes(model, ids, operation='upsert'):
+    """Record writes made with bulk update()/delete(), which skip the flush listener"""
+    if not ids:
+        return
+    now = datetime.utcnow()
+    _serialize_writers(db.session.connection())
+    db.session.execute(ChangeLog.__table__.insert(), [
+        {'entity': TRACKED[model], 'entity_id': entity_id, 'operation': operation, 'changed_at': now}
+        for entity_id in ids
+    ])
+
+def encode_cursor(sequence):
+    return base64.urlsafe_b64encode(f'seq:{sequence}'.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Sequence number from encode_cursor(); raises ValueError for anything else"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        prefix, sequence = base64.urlsafe_b64decode(padded.encode()).decode().split(':')
+        if prefix != 'seq':
+            raise ValueError(prefix)
+        return int(sequence)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def serialize(obj):
+    return {column.key: _plain(getattr(obj, column.key))
+            for column in type(obj).__table__.columns if column.key not in EXCLUDED_COLUMNS}
+
+def read_changes(since=0, limit=500):
+    """
+    Up to limit log entries after sequence number since. Returns (changes,
+    last sequence number read, whether more follow); changes holds one dict
+    per record, at its latest sequence number in this page, with the record's
+    current state. Records deleted by the time they are read come back as deletes.
+    """
+    log = db.session.execute(
+        db.select(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.operation)
+        .where(ChangeLog.id > since).order_by(ChangeLog.id).limit(limit + 1)
+    ).all()
+    has_more = len(log) > limit
+    log = log[:limit]
+    if not log:
+        return [], since, False
+
+    latest = {}
+    for sequence, entity, entity_id, operation in log:
+        latest[(entity, entity_id)] = (sequence, operation)
+
+    # One IN query per entity type for the current state of every upserted record
+    records = {}
+    for entity, model in MODELS.items():
+        ids = [entity_id for (kind, entity_id), (_, operation) in latest.items()
+               if kind == entity and operation == 'upsert']
+        if ids:
+            for obj in db.session.execute(db.select(model).where(model.id.in_(ids))).scalars():
+                records[(entity, obj.id)] = serialize(obj)
+
+    changes = []
+    for key, (sequence, operation) in sorted(latest.items(), key=lambda item: item[1][0]):
+        record = records.get(key) if operation == 'upsert' else None
+        changes.append({
+            'seq': sequence,
+            'entity': key[0],
+            'id': key[1],
+            'operation': 'upsert' if record is not None else 'delete',
+            'record': record,
+        })
+    return changes, log[-1][0], has_more
+
+def backfill():
+    """Log every existing record once (for databases created before the change log); returns the count"""
+    if db.session.scalar(db.select(ChangeLog.id).limit(1)) is not None:
+        return 0
+    total = 0
+    for model in TRACKED:
+        ids = db.session.execute(db.select(model.id).order_by(model.id)).scalars().all()
+        log_changes(model, ids)
+        total += len(ids)
+    return total
@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Circuit breaker around court-site lookups.
+
+    - closed: lookups run; failure_threshold consecutive failures open it.
+    - open: lookups are refused for recovery_timeout seconds.
+    - half_open: up to half_open_max_calls probe lookups run; a successful
+      probe closes the circuit, a failed one re-opens it. A probe that never
+      reached the site (release_probe) gives its slot back without either.
+    State is per process.
+    """
+
+    def __init__(self, failure_threshold=None, recovery_timeout=None, half_open_max_calls=None):
+        self.failure_threshold = failure_threshold or Config.BREAKER_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout or Config.BREAKER_RECOVERY_TIMEOUT
+        self.half_open_max_calls = half_open_max_calls or Config.BREAKER_HALF_OPEN_MAX_CALLS
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._last_error = None
+        self._last_change = datetime.utcnow()
+        # Moves with anything snapshot() reports; /stats uses it as its breaker validator
+        self._version = 0
+        self._updated_at = self._last_change
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """True if a lookup may run now (in half-open, this claims a probe slot)"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._transition(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._failures:
+                self._failures = 0
+                self._touch()
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._transition(CLOSED)
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = error
+            self._touch()
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._transition(OPEN)
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def release_probe(self):
+        """A lookup allowed by allow_request() ended without a verdict on the site (e.g. throttled locally)"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _touch(self):
+        self._version += 1
+        self._updated_at = datetime.utcnow()
+
+    def _transition(self, state):
+        logger.warning(f"Circuit breaker {self._state} -> {state}")
+        self._state = state
+        self._last_change = datetime.utcnow()
+        self._touch()
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._opened_at = None
+            self._probes_in_flight = 0
+
+    def validators(self):
+        """(version, updated_at) of the state snapshot() reports"""
+        with self._lock:
+            return self._version, self._updated_at
+
+    @property
+    def state(self):
+        return self._state
+
+    def snapshot(self):
+        """Plain-dict view for /stats (no time-varying fields, so it can sit in a cached page)"""
+        with self._lock:
+            retry_at = None
+            if self._state == OPEN:
+                retry_at = (self._last_change + timedelta(seconds=self.recovery_timeout)).strftime('%d/%m/%Y %H:%M:%S')
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'retry_at': retry_at,
+                'last_error': self._last_error,
+                'last_change': self._last_change.strftime('%d/%m/%Y %H:%M:%S'),
+            }
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+def get_circuit_breaker():
+    """Return the process-wide breaker guarding court-site lookups"""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
@@ -0,0 +1,84 @@
+import gzip
+import logging
+import zlib
+
+from flask import request
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'application/x-ndjson', 'image/svg+xml',
+)
+
+# Brotli's speed/size sweet spot for per-request compression; static builds use 11
+BROTLI_DYNAMIC_QUALITY = 5
+
+def _choose_encoding(allow_brotli=True):
+    accepted = request.accept_encodings
+    if allow_brotli and brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def _gzip_stream(chunks, level):
+    """Compress a streamed body chunk by chunk, flushing so each batch reaches the client"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+def init_compression(app):
+    """Compress text responses (HTML, JSON, CSV, NDJSON, ...) for clients that accept it"""
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype not in COMPRESSIBLE_MIMETYPES or response.status_code != 200
+                or request.method == 'HEAD' or response.direct_passthrough
+                or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        if response.is_streamed:
+            # Exports stream from the database; gzip incrementally rather than buffering them
+            if _choose_encoding(allow_brotli=False) is None:
+                return response
+            response.response = _gzip_stream(response.response, Config.COMPRESS_LEVEL)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            body = response.get_data()
+            if len(body) < Config.COMPRESS_MIN_SIZE:
+                return response
+            encoding = _choose_encoding()
+            if encoding is None:
+                return response
+            if encoding == 'br':
+                body = brotli.compress(body, quality=BROTLI_DYNAMIC_QUALITY)
+            else:
+                body = gzip.compress(body, Config.COMPRESS_LEVEL, mtime=0)
+            response.set_data(body)
+            response.headers['Content-Encoding'] = encoding
+
+        # The encoded bytes differ from what the strong validator described
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -12,6 +12,29 @@ class Config:
     
     # Selenium configuration
     SELENIUM_DRIVER_PATH = os.getenv('SELENIUM_DRIVER_PATH', 'chromedriver')
+    # Remote WebDriver endpoints (comma-separated); when set, no local browser is launched
+    SELENIUM_REMOTE_URLS = [url.strip() for url in os.getenv('SELENIUM_REMOTE_URLS', '').split(',') if url.strip()]
+    SELENIUM_REMOTE_FAILURE_THRESHOLD = int(os.getenv('SELENIUM_REMOTE_FAILURE_THRESHOLD', '2'))
+    SELENIUM_REMOTE_COOLDOWN = float(os.getenv('SELENIUM_REMOTE_COOLDOWN', '60'))  # seconds an endpoint is skipped
+
+    # Lean browser profile (browser_profile.py)
+    BROWSER_LEAN_PROFILE = os.getenv('BROWSER_LEAN_PROFILE', '1') == '1'
+    BROWSER_PAGE_LOAD_STRATEGY = os.getenv('BROWSER_PAGE_LOAD_STRATEGY', 'eager')  # normal, eager or none
+    BROWSER_BLOCK_RESOURCE_TYPES = [value.strip() for value in os.getenv(
+        'BROWSER_BLOCK_RESOURCE_TYPES', 'image,stylesheet,font,media').split(',') if value.strip()]
+    # Extra URL patterns to block (* wildcards); the defaults cover common analytics and ad hosts
+    BROWSER_BLOCKED_URLS = [value.strip() for value in os.getenv(
+        'BROWSER_BLOCKED_URLS',
+        '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,*hotjar.com*'
+    ).split(',') if value.strip()]
+    # When set, only these hosts resolve; every other (third-party) host is unreachable
+    BROWSER_ALLOWED_HOSTS = [value.strip() for value in os.getenv('BROWSER_ALLOWED_HOSTS', '').split(',') if value.strip()]
+    BROWSER_CACHE_DIR = os.getenv('BROWSER_CACHE_DIR', 'database/browser_cache')  # empty disables the shared cache
+    BROWSER_CACHE_SIZE = int(os.getenv('BROWSER_CACHE_SIZE', str(100 * 1024 * 1024)))  # bytes per cache slot
+
+    # Shared browsers (browser_pool.py): above 1, searches lease a tab instead of starting a browser each
+    BROWSER_TABS_PER_BROWSER = int(os.getenv('BROWSER_TABS_PER_BROWSER', '1'))
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))  # browsers per process in tab mode
     
     # File upload configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
@@ -19,8 +42,94 @@ class Config:
     
     # Application settings
     CASES_PER_PAGE = 10
+    ORDERS_PAGE_SIZE = int(os.getenv('ORDERS_PAGE_SIZE', '20'))  # orders per page on /api/cases/<id>/orders
+    ORDERS_PAGE_MAX = int(os.getenv('ORDERS_PAGE_MAX', '100'))  # largest limit a client may ask for
+    CHANGES_PAGE_SIZE = int(os.getenv('CHANGES_PAGE_SIZE', '500'))  # change-log entries per /api/changes page
+    CHANGES_PAGE_MAX = int(os.getenv('CHANGES_PAGE_MAX', '1000'))
     SEARCH_TIMEOUT = 30  # seconds
-    
+
+    # Scraping engine: 'webdriver' (Selenium with requests fallback) or 'async' (asyncio HTTP client)
+    SCRAPER_ENGINE = os.getenv('SCRAPER_ENGINE', 'webdriver')
+    ASYNC_MAX_PER_HOST = int(os.getenv('ASYNC_MAX_PER_HOST', '8'))
+    ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', '100'))
+
+    # HTML parsing process pool (0 workers = parse inline in the calling thread)
+    PARSE_POOL_WORKERS = int(os.getenv('PARSE_POOL_WORKERS', str(os.cpu_count() or 1)))
+    PARSE_MAX_HTML_BYTES = int(os.getenv('PARSE_MAX_HTML_BYTES', str(5 * 1024 * 1024)))
+    PARSE_TIMEOUT = float(os.getenv('PARSE_TIMEOUT', '10'))  # seconds
+
+    # SearchLog retention: aged rows are rolled up, archived and deleted
+    SEARCHLOG_RETENTION_DAYS = int(os.getenv('SEARCHLOG_RETENTION_DAYS', '90'))
+    SEARCHLOG_ARCHIVE_DIR = os.getenv('SEARCHLOG_ARCHIVE_DIR', 'database/archive')
+    RETENTION_CHUNK_SIZE = int(os.getenv('RETENTION_CHUNK_SIZE', '5000'))
+    RETENTION_INTERVAL_HOURS = float(os.getenv('RETENTION_INTERVAL_HOURS', '24'))
+    VACUUM_INTERVAL_MINUTES = float(os.getenv('VACUUM_INTERVAL_MINUTES', '60'))
+    VACUUM_PAGES = int(os.getenv('VACUUM_PAGES', '1000'))  # pages freed per incremental vacuum
+
+    # Outbound rate limiting shared by all processes using the same state file (requests/second)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMIT_STATE_PATH = os.getenv('RATE_LIMIT_STATE_PATH', 'database/rate_limit.db')
+    RATE_LIMIT_INITIAL_RATE = float(os.getenv('RATE_LIMIT_INITIAL_RATE', '0.5'))
+    RATE_LIMIT_MIN_RATE = float(os.getenv('RATE_LIMIT_MIN_RATE', '0.05'))
+    RATE_LIMIT_MAX_RATE = float(os.getenv('RATE_LIMIT_MAX_RATE', '2.0'))
+    RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', '3'))
+    RATE_LIMIT_INCREASE_STEP = float(os.getenv('RATE_LIMIT_INCREASE_STEP', '0.05'))
+    RATE_LIMIT_CAPTCHA_BACKOFF = float(os.getenv('RATE_LIMIT_CAPTCHA_BACKOFF', '0.5'))
+    RATE_LIMIT_ERROR_BACKOFF = float(os.getenv('RATE_LIMIT_ERROR_BACKOFF', '0.8'))
+    RATE_LIMIT_BACKOFF_COOLDOWN = float(os.getenv('RATE_LIMIT_BACKOFF_COOLDOWN', '5'))  # seconds
+
+    # Stale-while-revalidate (mode=swr on /search and /api/search)
+    SWR_MAX_AGE = int(os.getenv('SWR_MAX_AGE', '3600'))  # seconds before a stored result is refreshed
+    SWR_REFRESH_WORKERS = int(os.getenv('SWR_REFRESH_WORKERS', '2'))
+
+    # Standalone scraper workers (worker.py)
+    WORKER_LEASE_SECONDS = int(os.getenv('WORKER_LEASE_SECONDS', '120'))
+    WORKER_HEARTBEAT_SECONDS = int(os.getenv('WORKER_HEARTBEAT_SECONDS', '30'))
+    WORKER_POLL_INTERVAL = float(os.getenv('WORKER_POLL_INTERVAL', '2'))
+    WORKER_MAX_ATTEMPTS = int(os.getenv('WORKER_MAX_ATTEMPTS', '3'))
+
+    # Live search progress (/search/live and its Server-Sent Events stream)
+    LIVE_SEARCH_WORKERS = int(os.getenv('LIVE_SEARCH_WORKERS', '4'))
+    PROGRESS_CHANNEL_TTL = int(os.getenv('PROGRESS_CHANNEL_TTL', '600'))  # seconds a search's events are kept
+    PROGRESS_POLL_INTERVAL = float(os.getenv('PROGRESS_POLL_INTERVAL', '0.5'))  # seconds between stream checks for new events
+
+    # Production warm-up (wsgi.py / gunicorn.conf.py)
+    WARMUP_HOT_CASES = int(os.getenv('WARMUP_HOT_CASES', '50'))  # most-searched cases pre-rendered before forking
+    WARMUP_DB_CONNECTIONS = int(os.getenv('WARMUP_DB_CONNECTIONS', '5'))  # connections opened per worker
+    WARMUP_PRECONNECT = os.getenv('WARMUP_PRECONNECT', '1') == '1'  # async engine: connect to the court site at start
+
+    # Response compression (compression.py)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '500'))  # bytes; smaller bodies go out as-is
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))  # gzip level 1-9
+
+    # Pre-scrape validation (validation.py): keys the court reported as not found are answered from memory
+    NEGATIVE_CACHE_TTL = int(os.getenv('NEGATIVE_CACHE_TTL', '600'))  # seconds; 0 disables the cache
+    NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv('NEGATIVE_CACHE_MAX_ENTRIES', '10000'))
+
+    # Opt-in request profiling (profiling.py); off while both the token and the sample rate are unset
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')  # X-Profile-Token value that profiles a request and opens /profiles
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # fraction of requests profiled at random
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'database/profiles')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '200'))  # most recent profiles kept on disk
+    PROFILE_INDEX_SIZE = int(os.getenv('PROFILE_INDEX_SIZE', '50'))  # slowest profiles listed on /profiles
+
+    # Database connection pool (PostgreSQL; see database.py). 0 sizes the pool to the threads per process
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '0'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '5'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # seconds before a connection is replaced
+
+    # Circuit breaker around court-site lookups
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+    BREAKER_RECOVERY_TIMEOUT = float(os.getenv('BREAKER_RECOVERY_TIMEOUT', '120'))  # seconds open before probing
+    BREAKER_HALF_OPEN_MAX_CALLS = int(os.getenv('BREAKER_HALF_OPEN_MAX_CALLS', '1'))
+
+    # Result page kept with stored case details (results.py); only its head is kept, 0 keeps none
+    RAW_SNAPSHOT_MAX_CHARS = int(os.getenv('RAW_SNAPSHOT_MAX_CHARS', '16384'))
+
+    # Background scheduler (retention, vacuum); enable on one process per deployment
+    ENABLE_SCHEDULER = os.getenv('ENABLE_SCHEDULER', '0') == '1'
+
     # Target court information
     TARGET_COURT = "Delhi High Court"
     COURT_URL = "https://delhihighcourt.nic.in/"
@@ -30,8 +139,7 @@ class Config:
         'W.P.(C)', 'W.P.(CRL)', 'CRL.A.', 'CRL.M.C.', 'CRL.REV.P.',
         'LPA', 'FAO', 'CM(M)', 'CM(Main)', 'RFA', 'CS(OS)', 'CS(COMM)',
         'ARB.P.', 'O.M.P.', 'EX.P.', 'CONT.CAS(C)', 'CONT.CAS(CRL)',
-        'BAIL APPLN.', 'CRL.M.A.', 'CRL.M.B.', 'CRL.REV.P.', 'CRL.W.P.',
-        'W.P.(C) 1234/2023', 'W.P.(C) 5678/2022'
+        'BAIL APPLN.', 'CRL.M.A.', 'CRL.M.B.', 'CRL.W.P.'
     ]
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,134 @@
+"""
+Database profile: SQLite by default, PostgreSQL when DATABASE_URL points at one.
+
+- database_url() / engine_options(): the URL and the SQLAlchemy engine
+  options for it. On PostgreSQL the pool is sized to the threads a process
+  can run queries on at once (gunicorn threads plus the live-search and
+  refresh pools) unless DB_POOL_SIZE says otherwise; SQLite keeps
+  Flask-SQLAlchemy's defaults.
+- insert_ignore() / upsert(): INSERT ... ON CONFLICT through the dialect's
+  own insert, so concurrent writers of the same key never race a
+  select-then-insert. SQLite (3.24+) and PostgreSQL share the syntax.
+- bulk_insert(): COPY FROM STDIN on PostgreSQL, executemany elsewhere.
+  reset_sequences() moves PostgreSQL id sequences past explicitly inserted ids.
+"""
+
+import io
+import os
+from datetime import date, datetime
+
+from config import Config
+from http_cache import mark_dirty
+from models import db
+
+POSTGRES_SCHEMES = ('postgresql', 'postgres')
+
+def database_url():
+    """DATABASE_URL, or the SQLite file under database/ next to the code"""
+    url = os.getenv('DATABASE_URL')
+    if not url:
+        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'court_data.db')
+        return f'sqlite:///{db_path}'
+    # Hosted Postgres often hands out postgres://, which SQLAlchemy 1.4+ no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def is_postgres_url(url):
+    return url.split(':', 1)[0].split('+', 1)[0] in POSTGRES_SCHEMES
+
+def is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+def pool_size():
+    """Connections one process can use at once: DB_POOL_SIZE, else one per query-running thread"""
+    if Config.DB_POOL_SIZE > 0:
+        return Config.DB_POOL_SIZE
+    threads = int(os.getenv('GUNICORN_THREADS', '8'))
+    return threads + Config.LIVE_SEARCH_WORKERS + Config.SWR_REFRESH_WORKERS
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS for url"""
+    if not is_postgres_url(url):
+        return {}
+    return {
+        'pool_size': pool_size(),
+        'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_timeout': Config.DB_POOL_TIMEOUT,
+        'pool_recycle': Config.DB_POOL_RECYCLE,
+        # Drop connections the server (or a pooler in front of it) closed while idle
+        'pool_pre_ping': True,
+        'connect_args': {'application_name': 'court-data-fetcher'},
+    }
+
+def _insert(table):
+    if is_postgres():
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def insert_ignore(table, values, index_elements, index_where=None):
+    """INSERT ... ON CONFLICT DO NOTHING for one row; True if it was inserted"""
+    stmt = _insert(table).values(**values).on_conflict_do_nothing(
+        index_elements=index_elements, index_where=index_where)
+    return db.session.execute(stmt).rowcount == 1
+
+def upsert(table, values, index_elements, increments=()):
+    """
+    INSERT values; on a key conflict, add the increments columns onto the
+    existing row and overwrite its other non-key columns
+    """
+    stmt = _insert(table).values(**values)
+    updates = {column: stmt.excluded[column] for column in values if column not in index_elements}
+    updates.update({column: table.c[column] + stmt.excluded[column] for column in increments})
+    stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=updates)
+    db.session.execute(stmt)
+
+def _copy_value(value):
+    # COPY's CSV format reads an unquoted empty field as NULL and a quoted one as ''
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+    return '"' + text.replace('"', '""') + '"'
+
+def _copy_rows(rows, columns):
+    """Rows as COPY ... WITH (FORMAT csv) input"""
+    return ''.join(','.join(_copy_value(row[column]) for column in columns) + '\n' for row in rows)
+
+def bulk_insert(table, rows):
+    """
+    Insert a list of row dicts (same keys in each) in the current transaction:
+    COPY on PostgreSQL, executemany elsewhere. Skips ORM events, like any Core insert.
+    """
+    if not rows:
+        return
+    if not is_postgres():
+        db.session.execute(table.insert(), rows)
+        return
+    columns = [column.name for column in table.columns if column.name in rows[0]]
+    sql = f'COPY {table.name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+    data = _copy_rows(rows, columns)
+    mark_dirty(db.session)  # COPY goes around the session
+    cursor = db.session.connection().connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            cursor.copy_expert(sql, io.StringIO(data))
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(data)
+    finally:
+        cursor.close()
+
+def reset_sequences(tables):
+    """Point each table's id sequence past its highest id (PostgreSQL; rows inserted with explicit ids)"""
+    if not is_postgres():
+        return
+    for table in tables:
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"))
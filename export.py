@@ -0,0 +1,172 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from models import db, CaseQuery, CaseDetail, CourtOrder
+
+# Output column order; one row per (case, order), cases without orders get one row with empty order columns
+EXPORT_COLUMNS = [
+    ('query_id', CaseQuery.id),
+    ('case_type', CaseQuery.case_type),
+    ('case_number', CaseQuery.case_number),
+    ('filing_year', CaseQuery.filing_year),
+    ('status', CaseQuery.status),
+    ('search_timestamp', CaseQuery.search_timestamp),
+    ('case_detail_id', CaseDetail.id),
+    ('case_title', CaseDetail.case_title),
+    ('petitioner', CaseDetail.petitioner),
+    ('respondent', CaseDetail.respondent),
+    ('filing_date', CaseDetail.filing_date),
+    ('next_hearing_date', CaseDetail.next_hearing_date),
+    ('case_status', CaseDetail.case_status),
+    ('updated_at', CaseDetail.updated_at),
+    ('order_id', CourtOrder.id),
+    ('order_date', CourtOrder.order_date),
+    ('order_type', CourtOrder.order_type),
+    ('order_title', CourtOrder.order_title),
+    ('order_description', CourtOrder.order_description),
+    ('pdf_url', CourtOrder.pdf_url),
+]
+COLUMN_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+def build_export_query(case_type=None, filing_year=None, date_from=None, date_to=None):
+    """Select statement for the export; date_from/date_to bound CaseQuery.search_timestamp (inclusive days)"""
+    stmt = (
+        db.select(*[column.label(name) for name, column in EXPORT_COLUMNS])
+        .select_from(CaseQuery)
+        .outerjoin(CaseDetail, CaseDetail.query_id == CaseQuery.id)
+        .outerjoin(CourtOrder, CourtOrder.case_detail_id == CaseDetail.id)
+        .order_by(CaseQuery.id, CourtOrder.id)
+    )
+    if case_type:
+        stmt = stmt.where(CaseQuery.case_type == case_type)
+    if filing_year:
+        stmt = stmt.where(CaseQuery.filing_year == filing_year)
+    if date_from:
+        stmt = stmt.where(CaseQuery.search_timestamp >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        stmt = stmt.where(CaseQuery.search_timestamp <= datetime.combine(date_to, datetime.max.time()))
+    return stmt
+
+# Positions of date/datetime columns; only these need converting for text formats
+TEMPORAL_INDEXES = [index for index, (_, column) in enumerate(EXPORT_COLUMNS)
+                    if isinstance(column.type, (db.Date, db.DateTime))]
+
+def iter_export_batches(stmt, batch_size=1000):
+    """Yield lists of result tuples through a server-side cursor, batch_size rows at a time"""
+    # Core connection: rows come straight from the cursor without ORM loading overhead
+    connection = db.session.connection()
+    result = connection.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    for partition in result.partitions(batch_size):
+        yield partition
+
+def _plain_rows(batch):
+    """Rows as lists with dates/datetimes rendered in ISO 8601"""
+    rows = []
+    for row in batch:
+        row = list(row)
+        for index in TEMPORAL_INDEXES:
+            value = row[index]
+            if value is not None:
+                row[index] = value.isoformat()
+        rows.append(row)
+    return rows
+
+class _LineBuffer:
+    """Write target for csv.writer that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, text):
+        self._chunks.append(text)
+
+    def drain(self):
+        data = ''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_csv(batches):
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMN_NAMES)
+    for batch in batches:
+        writer.writerows(_plain_rows(batch))
+        yield buffer.drain()
+    yield buffer.drain()
+
+def stream_ndjson(batches):
+    encode = json.JSONEncoder().encode
+    for batch in batches:
+        yield ''.join(encode(dict(zip(COLUMN_NAMES, row))) + '\n' for row in _plain_rows(batch))
+
+class _ParquetSink(io.RawIOBase):
+    """Append-only sink that keeps a true write offset while its bytes are drained to the client"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_parquet(batches, row_group_size=50000):
+    """Emit one Parquet row group per row_group_size rows; requires pyarrow"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    column_types = {
+        'query_id': pa.int64(), 'filing_year': pa.int64(), 'case_detail_id': pa.int64(), 'order_id': pa.int64(),
+        'search_timestamp': pa.timestamp('us'), 'updated_at': pa.timestamp('us'),
+        'filing_date': pa.date32(), 'next_hearing_date': pa.date32(), 'order_date': pa.date32(),
+    }
+    schema = pa.schema([(name, column_types.get(name, pa.string())) for name in COLUMN_NAMES])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    def flush(rows):
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema
+        ))
+
+    pending = []
+    for batch in batches:
+        pending.extend(batch)
+        if len(pending) >= row_group_size:
+            flush(pending)
+            pending = []
+            yield sink.drain()
+    if pending:
+        flush(pending)
+    writer.close()
+    yield sink.drain()
+
+STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
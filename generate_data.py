@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for scale testing.
+
+Fills CaseQuery, CaseDetail, CourtOrder and SearchLog with realistic rows:
+
+- case types follow a long-tailed mix (writ petitions dominate, rare types
+  stay rare) and filing years skew recent
+- orders per case are log-normal (most cases have a handful, a few have
+  hundreds), dated between filing and the as-of date; older cases are more
+  often disposed and end in a judgment
+- searches concentrate on a small set of hot cases, with success rates and
+  response times resembling live scraping
+
+The same --seed and --as-of produce the same rows. Rows go in through
+database.bulk_insert() (COPY on PostgreSQL, executemany on SQLite) in
+--batch-size chunks with explicit ids, so the generator appends to an
+existing database and reports every new record to the change feed
+(changes.log_changes) unless --no-change-log is given.
+
+Usage: python generate_data.py --cases 1000000 [--searches 3000000] [--seed 42]
+Then: python benchmarks/bench_endpoints.py
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from config import Config
+from database import bulk_insert, reset_sequences
+from models import db, CaseQuery, CaseDetail, CourtOrder, SearchLog
+
+logger = logging.getLogger(__name__)
+
+# Relative frequency of case types: Config.CASE_TYPES rank r gets weight 1 / (r + 1)
+CASE_TYPE_WEIGHTS = [1 / (rank + 1) for rank in range(len(Config.CASE_TYPES))]
+ORDER_KINDS = (
+    ('Order', 'Order', 'Listed; arguments heard in part'),
+    ('Order', 'Interim Order', 'Interim relief granted till the next date of hearing'),
+    ('Order', 'Notice', 'Notice issued to the respondent, returnable on the next date'),
+    ('Order', 'Adjournment', 'Adjourned at the request of counsel'),
+)
+ORDER_KIND_WEIGHTS = (50, 15, 20, 15)
+PARTIES = (
+    'State of NCT of Delhi', 'Union of India', 'Delhi Development Authority', 'Municipal Corporation of Delhi',
+    'Reserve Bank of India', 'Delhi Transport Corporation', 'M/s Sharma Traders', 'M/s Gupta Builders Pvt Ltd',
+    'Rajesh Kumar', 'Sunita Devi', 'Anil Mehta', 'Priya Singh', 'Mohd. Irfan', 'Kavita Arora', 'Harish Chand',
+)
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+    'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Mobile Safari/537.36',
+    'python-requests/2.31.0',
+)
+
+class DatasetGenerator:
+    """Builds reproducible batches of synthetic rows; ids continue from first_ids"""
+
+    def __init__(self, seed=42, as_of=None, max_orders=500, history_days=365, first_ids=None):
+        self.random = random.Random(seed)
+        self.as_of = as_of or date.today()
+        self.max_orders = max_orders
+        self.history_days = history_days
+        self.next_ids = dict(first_ids or {})
+        self.case_numbers = {}  # (case_type, year) -> last number issued
+        self.cases = []  # (case_type, case_number, filing_year) in id order, for searches
+
+    def _id(self, model):
+        value = self.next_ids.get(model, 1)
+        self.next_ids[model] = value + 1
+        return value
+
+    def _day_between(self, start, end):
+        return start + timedelta(days=self.random.randint(0, max((end - start).days, 0)))
+
+    def _moment_between(self, start, end):
+        start = datetime.combine(start, datetime.min.time())
+        span = (datetime.combine(end, datetime.min.time()) - start).total_seconds() + 86399
+        return start + timedelta(seconds=self.random.uniform(0, max(span, 0)))
+
+    def _case_key(self):
+        case_type = self.random.choices(Config.CASE_TYPES, CASE_TYPE_WEIGHTS)[0]
+        filing_year = self.as_of.year - min(int(self.random.expovariate(1 / 4)), self.as_of.year - 2000)
+        number = self.case_numbers.get((case_type, filing_year), self.random.randint(0, 50))
+        number += self.random.randint(1, 9)
+        self.case_numbers[(case_type, filing_year)] = number
+        return case_type, str(number), filing_year
+
+    def _orders(self, case_detail_id, filing_date, disposed):
+        count = min(int(self.random.lognormvariate(1.2, 1.0)), self.max_orders)
+        if disposed:
+            count = max(count, 1)
+        dates = sorted(self._day_between(filing_date, self.as_of) for _ in range(count))
+        orders = []
+        for n, order_date in enumerate(dates, 1):
+            if disposed and n == count:
+                order_type, title, description = 'Judgment', 'Final Judgment', 'Petition disposed of'
+            else:
+                order_type, title, description = self.random.choices(ORDER_KINDS, ORDER_KIND_WEIGHTS)[0]
+            order_id = self._id(CourtOrder)
+            orders.append({
+                'id': order_id,
+                'case_detail_id': case_detail_id,
+                'order_date': order_date,
+                'order_type': order_type,
+                'order_title': f'{title} dated {order_date:%d/%m/%Y}',
+                'order_description': description,
+                'pdf_url': f'{Config.COURT_URL}app/showFileJudgment/{order_id}.pdf',
+                'pdf_filename': f'{order_id}.pdf',
+                'pdf_downloaded': False,
+                'created_at': self._moment_between(order_date, self.as_of),
+            })
+        return orders
+
+    def case_batch(self, size):
+        """Rows for size cases: (case_queries, case_details, court_orders)"""
+        queries, details, orders = [], [], []
+        for _ in range(size):
+            case_type, case_number, filing_year = self._case_key()
+            query_id = self._id(CaseQuery)
+            self.cases.append((case_type, case_number, filing_year))
+            filing_date = self._day_between(date(filing_year, 1, 1), min(date(filing_year, 12, 31), self.as_of))
+            searched_at = self._moment_between(
+                max(filing_date, self.as_of - timedelta(days=self.history_days)), self.as_of)
+
+            if self.random.random() < 0.05:
+                queries.append({'id': query_id, 'case_type': case_type, 'case_number': case_number,
+                                'filing_year': filing_year, 'search_timestamp': searched_at, 'status': 'error',
+                                'error_message': 'CAPTCHA detected in response'})
+                continue
+            queries.append({'id': query_id, 'case_type': case_type, 'case_number': case_number,
+                            'filing_year': filing_year, 'search_timestamp': searched_at, 'status': 'success'})
+
+            age_years = (self.as_of - filing_date).days / 365
+            disposed = self.random.random() < min(0.9, age_years * 0.15)
+            petitioner, respondent = self.random.sample(PARTIES, 2)
+            detail_id = self._id(CaseDetail)
+            details.append({
+                'id': detail_id,
+                'query_id': query_id,
+                'case_title': f'{petitioner} vs {respondent}',
+                'petitioner': petitioner,
+                'respondent': respondent,
+                'filing_date': filing_date,
+                'next_hearing_date': None if disposed else self.as_of + timedelta(days=self.random.randint(1, 120)),
+                'case_status': 'Disposed' if disposed else 'Pending',
+                'raw_response': None,
+                'created_at': searched_at,
+                'updated_at': searched_at,
+            })
+            orders += self._orders(detail_id, filing_date, disposed)
+        return queries, details, orders
+
+    def search_batch(self, size):
+        """Rows for size SearchLog entries, most of them for the hottest cases"""
+        logs = []
+        since = self.as_of - timedelta(days=self.history_days)
+        for _ in range(size):
+            # Cubing a uniform draw sends most searches to the first (hot) cases
+            case_type, case_number, filing_year = self.cases[int(len(self.cases) * self.random.random() ** 3)]
+            success = self.random.random() < 0.9
+            logs.append({
+                'id': self._id(SearchLog),
+                'timestamp': self._moment_between(since, self.as_of),
+                'ip_address': f'10.{self.random.randint(0, 255)}.{self.random.randint(0, 255)}.{self.random.randint(1, 254)}',
+                'user_agent': self.random.choice(USER_AGENTS),
+                'search_params': json.dumps({
+                    'case_type': case_type,
+                    'case_number': case_number,
+                    'filing_year': filing_year
+                }),
+                'response_time': round(self.random.lognormvariate(math.log(3.0), 0.6), 3),
+                'success': success,
+                'error_message': None if success else 'Court website unavailable',
+            })
+        return logs
+
+def _first_ids():
+    return {model: (db.session.scalar(db.select(db.func.max(model.id))) or 0) + 1
+            for model in (CaseQuery, CaseDetail, CourtOrder, SearchLog)}
+
+def _insert(model, rows, change_log):
+    if not rows:
+        return
+    bulk_insert(model.__table__, rows)
+    if change_log and model is not SearchLog:
+        import changes
+        changes.log_changes(model, [row['id'] for row in rows])
+
+def generate(cases, searches=None, seed=42, as_of=None, batch_size=5000, max_orders=500,
+             history_days=365, change_log=True, progress=None):
+    """
+    Insert cases synthetic cases (with details and orders) and searches SearchLog
+    rows (default 3 per case), committing every batch_size cases. Call inside an
+    app context; returns the number of rows written per table.
+    """
+    searches = cases * 3 if searches is None else searches
+    generator = DatasetGenerator(seed, as_of, max_orders, history_days, _first_ids())
+    counts = {'case_query': 0, 'case_detail': 0, 'court_order': 0, 'search_log': 0}
+
+    for start in range(0, cases, batch_size):
+        queries, details, orders = generator.case_batch(min(batch_size, cases - start))
+        _insert(CaseQuery, queries, change_log)
+        _insert(CaseDetail, details, change_log)
+        _insert(CourtOrder, orders, change_log)
+        db.session.commit()
+        counts['case_query'] += len(queries)
+        counts['case_detail'] += len(details)
+        counts['court_order'] += len(orders)
+        if progress:
+            progress(counts)
+
+    if generator.cases:
+        for start in range(0, searches, batch_size):
+            logs = generator.search_batch(min(batch_size, searches - start))
+            _insert(SearchLog, logs, change_log)
+            db.session.commit()
+            counts['search_log'] += len(logs)
+            if progress:
+                progress(counts)
+
+    reset_sequences([CaseQuery.__table__, CaseDetail.__table__, CourtOrder.__table__, SearchLog.__table__])
+    db.session.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', type=int, default=100000)
+    parser.add_argument('--searches', type=int, help='SearchLog rows (default: 3 per case)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--as-of', type=date.fromisoformat, help='latest date in the data, YYYY-MM-DD (default: today)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--max-orders', type=int, default=500, help='orders per case cap')
+    parser.add_argument('--history-days', type=int, default=365, help='span of search timestamps')
+    parser.add_argument('--no-change-log', action='store_true', help='skip change feed entries for the new rows')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app import create_app
+    app = create_app()
+    started = time.perf_counter()
+
+    def report(counts):
+        rows = sum(counts.values())
+        logger.info(f"{rows} rows ({rows / (time.perf_counter() - started):.0f}/s): "
+                    + ', '.join(f'{table} {count}' for table, count in counts.items()))
+
+    with app.app_context():
+        db.create_all()
+        counts = generate(args.cases, args.searches, seed=args.seed, as_of=args.as_of,
+                          batch_size=args.batch_size, max_orders=args.max_orders,
+                          history_days=args.history_days, change_log=not args.no_change_log, progress=report)
+    report(counts)
+
+if __name__ == '__main__':
+    main()
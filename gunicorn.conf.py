@@ -0,0 +1,24 @@
+"""Gunicorn settings for Court Data Fetcher: gunicorn -c gunicorn.conf.py wsgi:application"""
+
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+# Threads keep long-lived requests (SSE progress streams, scrapes) from blocking a whole worker
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+# Covers a full court-site lookup plus each worker's warm-up
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Import and warm the app once in the master, then fork
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+def post_fork(server, worker):
+    from wsgi import application
+    from warmup import warm_worker
+    warm_worker(application)
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import request, session, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+class ResponseCache:
+    """
+    Small in-process LRU of rendered response bodies.
+
+    Entries are keyed by (cache key, ETag) so a body is only reused while the
+    validator derived from the database still matches. The whole cache is
+    dropped whenever this process commits a write.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, etag):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, etag, value):
+        with self._lock:
+            self._entries[key] = (etag, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+response_cache = ResponseCache()
+
+class DataVersion:
+    """
+    Counter bumped whenever this process commits a write, alongside the
+    response cache invalidation. Pages whose validators would otherwise need
+    whole-table aggregates derive their ETag and Last-Modified from it.
+
+    Per process like the response cache; the boot token keeps a restarted
+    process from reusing ETags issued against different data.
+    """
+
+    def __init__(self):
+        self._boot = uuid.uuid4().hex
+        self._value = 0
+        self._changed_at = datetime.utcnow()
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self._value += 1
+            self._changed_at = datetime.utcnow()
+
+    def current(self):
+        """(token, changed_at): the token goes into an ETag, changed_at is the Last-Modified"""
+        with self._lock:
+            return (self._boot, self._value), self._changed_at
+
+data_version = DataVersion()
+
+def mark_dirty(db_session):
+    """Invalidate cached responses when db_session commits (for writes no session event sees)"""
+    db_session.info['response_cache_dirty'] = True
+
+@event.listens_for(Session, 'after_flush')
+def _mark_session_dirty(db_session, flush_context):
+    mark_dirty(db_session)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _mark_dirty_on_bulk_write(orm_execute_state):
+    # Bulk query.delete()/update() and Core upserts never flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_dirty(orm_execute_state.session)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(db_session):
+    if db_session.info.pop('response_cache_dirty', False):
+        data_version.bump()
+        response_cache.invalidate()
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_dirty_on_rollback(db_session):
+    db_session.info.pop('response_cache_dirty', None)
+
+def make_etag(*parts):
+    """Build a strong ETag from the validator parts (counts, max ids, timestamps)"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+def latest(*values):
+    """Most recent of the given datetimes, ignoring None"""
+    present = [value for value in values if value is not None]
+    return max(present) if present else None
+
+def _as_http_date(value):
+    """Naive UTC datetimes from the models -> aware, second precision"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+def conditional_response(cache_key, etag, last_modified, render):
+    """
+    Answer a GET with 304 when the client's validators match, otherwise serve
+    the cached body for this ETag or call render() and cache its result.
+    """
+    last_modified = _as_http_date(last_modified)
+
+    # Pending flash messages belong to this user's next page; never cache around them
+    if session.get('_flashes'):
+        response = make_response(render())
+    else:
+        if request.if_none_match:
+            # Weak comparison: compression turns the ETag weak on the way out
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = bool(since and last_modified and last_modified <= since)
+
+        if not_modified:
+            response = make_response('', 304)
+        else:
+            cached = response_cache.get(cache_key, etag)
+            if cached is not None:
+                body, mimetype = cached
+                response = make_response(body)
+                response.mimetype = mimetype
+            else:
+                response = make_response(render())
+                if response.status_code == 200:
+                    response_cache.set(cache_key, etag, (response.get_data(), response.mimetype))
+
+    if response.status_code in (200, 304):
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        # Let clients keep the body but revalidate on every use
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -1,5 +1,6 @@
 import os
 from flask import Flask
+from database import database_url, engine_options
 from models import db
 from dotenv import load_dotenv
 
@@ -10,10 +11,9 @@ def create_app():
     """Create and configure Flask app for database initialization"""
     app = Flask(__name__)
     
-    # Configure database with absolute path
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    db_path = os.path.join(current_dir, 'database', 'court_data.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    # Same database as the app: DATABASE_URL, else the SQLite file under database/
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     
@@ -37,6 +37,28 @@ def init_database():
         # Create all tables
         db.create_all()
         print("Database tables created successfully!")
+
+        # create_all() skips tables that already exist; add indexes introduced since
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=db.engine, checkfirst=True)
+
+        # Seed the change feed with records written before it existed
+        import changes
+        logged = changes.backfill()
+        if logged:
+            print(f"Added {logged} existing records to the change log")
+
+        # Order pagination keys on order_date; older rows may have none
+        from models import CourtOrder
+        undated = db.session.execute(
+            db.select(CourtOrder.id).where(CourtOrder.order_date.is_(None))).scalars().all()
+        if undated:
+            CourtOrder.query.filter(CourtOrder.id.in_(undated)).update(
+                {CourtOrder.order_date: db.func.date(CourtOrder.created_at)}, synchronize_session=False)
+            changes.log_changes(CourtOrder, undated)
+            print(f"Backfilled order_date on {len(undated)} orders")
+        db.session.commit()
         
         # Verify tables were created
         try:
@@ -48,6 +48,9 @@ class CaseDetail(db.Model):
 
 class CourtOrder(db.Model):
     """Model for storing court orders and judgments"""
+    # Keyset pagination of a case's orders by (order_date, id), see orders.py
+    __table_args__ = (db.Index('ix_court_order_case_date_id', 'case_detail_id', 'order_date', 'id'),)
+
     id = db.Column(db.Integer, primary_key=True)
     case_detail_id = db.Column(db.Integer, db.ForeignKey('case_detail.id'), nullable=False)
     
@@ -81,4 +84,90 @@ class SearchLog(db.Model):
     error_message = db.Column(db.Text, nullable=True)
     
     def __repr__(self):
-        return f'<SearchLog {self.timestamp}>' 
\ No newline at end of file
+        return f'<SearchLog {self.timestamp}>'
+
+class SearchLogRollup(db.Model):
+    """Daily search counts per case type, rolled up from aged SearchLog rows"""
+    __table_args__ = (db.UniqueConstraint('day', 'case_type', name='uq_search_log_rollup_day_type'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    case_type = db.Column(db.String(100), nullable=False, default='')
+    total = db.Column(db.Integer, nullable=False, default=0)
+    successful = db.Column(db.Integer, nullable=False, default=0)
+    response_time_sum = db.Column(db.Float, nullable=False, default=0.0)
+    response_time_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SearchLogRollup {self.day} {self.case_type}>'
+
+# Predicate of the one-active-job-per-case index; enqueue_job()'s ON CONFLICT repeats it
+ACTIVE_JOB_WHERE = db.text("status IN ('pending', 'running')")
+
+class ScrapeJob(db.Model):
+    """Lookup queued for a standalone scraper worker (see worker.py)"""
+    __table_args__ = (
+        db.Index('ix_scrape_job_status_lease', 'status', 'lease_expires_at'),
+        db.Index('uq_scrape_job_active_case', 'case_type', 'case_number', 'filing_year', unique=True,
+                 sqlite_where=ACTIVE_JOB_WHERE, postgresql_where=ACTIVE_JOB_WHERE),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    case_type = db.Column(db.String(100), nullable=False)
+    case_number = db.Column(db.String(50), nullable=False)
+    filing_year = db.Column(db.Integer, nullable=False)
+    query_id = db.Column(db.Integer, db.ForeignKey('case_query.id'), nullable=True)  # set once results are stored
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error_message = db.Column(db.Text, nullable=True)
+
+    # Lease held by the worker processing the job; expired leases are requeued
+    lease_owner = db.Column(db.String(100), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ScrapeJob {self.id} {self.status}>'
+
+class ChangeLog(db.Model):
+    """Change sequence behind /api/changes: one row per write to a CaseQuery, CaseDetail or CourtOrder (see changes.py)"""
+    # AUTOINCREMENT: ids are never reused, so the sequence only moves forward even after old rows are pruned
+    __table_args__ = ({'sqlite_autoincrement': True},)
+
+    id = db.Column(db.Integer, primary_key=True)  # the sequence number
+    entity = db.Column(db.String(20), nullable=False)  # case_query, case_detail, court_order
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # upsert, delete
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ChangeLog {self.id} {self.operation} {self.entity}/{self.entity_id}>'
+
+class ProgressChannel(db.Model):
+    """One live search's progress channel (see progress.py); shared by every app process"""
+    id = db.Column(db.String(32), primary_key=True)  # the search id
+    meta = db.Column(db.Text, nullable=False)  # JSON: the case key, for the live results page
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<ProgressChannel {self.id}>'
+
+class ProgressEvent(db.Model):
+    """One progress event of a live search, numbered from 1 within its channel"""
+    __table_args__ = (
+        db.UniqueConstraint('search_id', 'position', name='uq_progress_event_position'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    search_id = db.Column(db.String(32), db.ForeignKey('progress_channel.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    event = db.Column(db.String(40), nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ProgressEvent {self.search_id}#{self.position} {self.event}>'
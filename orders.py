@@ -0,0 +1,66 @@
+"""
+Keyset pagination over a case's stored orders.
+
+Pages are ordered by (order_date, id), newest first by default, and a page
+continues from the last row of the previous one through an opaque cursor
+instead of an OFFSET. Every page is then a range scan of
+ix_court_order_case_date_id that stops after limit + 1 rows, however deep
+into a case with hundreds of orders it is.
+
+order_date is never NULL (persistence falls back to the storing date and
+init_db.py backfills older rows), so the (order_date, id) comparison needs no
+NULL handling.
+"""
+
+import base64
+import json
+from datetime import date
+
+from models import db, CourtOrder
+
+def encode_cursor(order):
+    """Opaque cursor pointing just past order"""
+    key = json.dumps([order.order_date.isoformat() if order.order_date else None, order.id])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """(order_date, id) from encode_cursor(); raises ValueError for anything else"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        order_date, order_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(order_date), int(order_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def build_orders_query(case_detail_id, order_type=None, date_from=None, date_to=None, descending=True, after=None):
+    """Select statement for a case's orders; after is an (order_date, id) key to continue from"""
+    key = db.tuple_(CourtOrder.order_date, CourtOrder.id)
+    stmt = db.select(CourtOrder).where(CourtOrder.case_detail_id == case_detail_id)
+    if order_type:
+        stmt = stmt.where(CourtOrder.order_type == order_type)
+    if date_from:
+        stmt = stmt.where(CourtOrder.order_date >= date_from)
+    if date_to:
+        stmt = stmt.where(CourtOrder.order_date <= date_to)
+    if after is not None:
+        stmt = stmt.where(key < after if descending else key > after)
+    if descending:
+        return stmt.order_by(CourtOrder.order_date.desc(), CourtOrder.id.desc())
+    return stmt.order_by(CourtOrder.order_date, CourtOrder.id)
+
+def fetch_order_page(case_detail_id, limit, cursor=None, **filters):
+    """
+    One page of orders (CourtOrder rows) and the cursor for the next page, or
+    None on the last page. filters are build_orders_query()'s keyword arguments.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    stmt = build_orders_query(case_detail_id, after=after, **filters).limit(limit + 1)
+    orders = db.session.execute(stmt).scalars().all()
+    if len(orders) > limit:
+        orders = orders[:limit]
+        return orders, encode_cursor(orders[-1])
+    return orders, None
+
+def count_orders(case_detail_id):
+    return db.session.scalar(
+        db.select(db.func.count(CourtOrder.id)).where(CourtOrder.case_detail_id == case_detail_id))
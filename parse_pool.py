@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from scraper import parse_form_page, parse_search_results
+
+logger = logging.getLogger(__name__)
+
+# Parsers that can be shipped to worker processes; each takes raw HTML and returns a plain dict
+PARSERS = {
+    'form': parse_form_page,
+    'results': parse_search_results,
+}
+
+def _warm_worker():
+    """Import the parsing stack in a worker so the first real parse is not cold"""
+    import bs4  # noqa: F401
+    return multiprocessing.current_process().pid
+
+class ParsingService:
+    """
+    Offloads BeautifulSoup parsing to a warm ProcessPoolExecutor.
+
+    - Pages larger than max_html_bytes (UTF-8 encoded) are rejected before any parsing.
+    - Each pooled parse is bounded by timeout seconds. A worker process cannot
+      be interrupted mid-parse, so a timeout recycles the pool: its processes
+      are terminated and the next parse starts a fresh one. Parses that were
+      running on the old pool fall back to parsing inline.
+    - When max_pending parses are already queued, the caller parses inline
+      instead of waiting behind a saturated pool.
+    """
+
+    def __init__(self, max_workers=None, max_html_bytes=None, timeout=None, max_pending=None):
+        self.max_workers = Config.PARSE_POOL_WORKERS if max_workers is None else max_workers
+        self.max_html_bytes = max_html_bytes or Config.PARSE_MAX_HTML_BYTES
+        self.timeout = timeout or Config.PARSE_TIMEOUT
+        self.max_pending = max_pending or self.max_workers * 2
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.stats = {'pooled': 0, 'inline': 0, 'rejected': 0, 'timeouts': 0, 'recycled': 0}
+
+    def start(self):
+        """Start the worker processes and wait until each has imported its parser"""
+        with self._lock:
+            if self._executor is None and self.max_workers > 0:
+                # spawn keeps workers free of the web process's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                warmups = [self._executor.submit(_warm_worker) for _ in range(self.max_workers)]
+                for future in warmups:
+                    future.result()
+                logger.info(f"HTML parsing pool started with {self.max_workers} workers")
+        return self
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def recycle(self, executor):
+        """Terminate executor's worker processes (a parse overran); the next parse starts a new pool"""
+        with self._lock:
+            if self._executor is not executor:
+                return  # already recycled by another timed-out parse
+            self._executor = None
+            self.stats['recycled'] += 1
+        # ProcessPoolExecutor has no public way to stop a running task
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("HTML parsing pool recycled after a timeout")
+
+    def _check_size(self, html):
+        # Characters are at most 4 UTF-8 bytes, so only pages near the limit need encoding
+        size = len(html)
+        if size * 4 > self.max_html_bytes:
+            size = len(html.encode('utf-8'))
+        if size > self.max_html_bytes:
+            self.stats['rejected'] += 1
+            return {"error": f"Result page too large to parse ({size} bytes)"}
+        return None
+
+    def _reserve(self):
+        """Claim a pool slot, or return None when the caller should parse inline"""
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            self.start()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return None
+            self._pending += 1
+            return self._executor
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, executor, parser, html):
+        """Submit to a reserved pool; None if it was recycled or shut down since"""
+        try:
+            future = executor.submit(parser, html)
+        except RuntimeError:  # BrokenProcessPool included
+            self._release(None)
+            return None
+        future.add_done_callback(self._release)
+        return future
+
+    def parse(self, html, kind='results'):
+        """Parse html with the named parser and return its plain-dict result"""
+        parser = PARSERS[kind]
+        rejected = self._check_size(html)
+        if rejected:
+            return rejected
+
+        executor = self._reserve()
+        if executor is None:
+            self.stats['inline'] += 1
+            return parser(html)
+
+        future = self._submit(executor, parser, html)
+        if future is None:
+            self.stats['inline'] += 1
+            return parser(html)
+        try:
+            result = future.result(timeout=self.timeout)
+            self.stats['pooled'] += 1
+            return result
+        except FutureTimeoutError:
+            self.stats['timeouts'] += 1
+            logger.warning(f"HTML parse timed out after {self.timeout}s")
+            self.recycle(executor)
+            return {"error": f"Parsing timed out after {self.timeout} seconds"}
+        except BrokenProcessPool:
+            # Another parse's timeout recycled the pool under this one
+            self.stats['inline'] += 1
+            return parser(html)
+
+    async def parse_async(self, html, kind='results'):
+        """Awaitable variant of parse for the asyncio scraping engine"""
+        parser = PARSERS[kind]
+        rejected = self._check_size(html)
+        if rejected:
+            return rejected
+
+        loop = asyncio.get_running_loop()
+        executor = self._reserve()
+        if executor is None:
+            # Inline parses still must not block the event loop
+            self.stats['inline'] += 1
+            return await loop.run_in_executor(None, parser, html)
+
+        future = self._submit(executor, parser, html)
+        if future is None:
+            self.stats['inline'] += 1
+            return await loop.run_in_executor(None, parser, html)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+            self.stats['pooled'] += 1
+            return result
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            logger.warning(f"HTML parse timed out after {self.timeout}s")
+            self.recycle(executor)
+            return {"error": f"Parsing timed out after {self.timeout} seconds"}
+        except BrokenProcessPool:
+            # Another parse's timeout recycled the pool under this one
+            self.stats['inline'] += 1
+            return await loop.run_in_executor(None, parser, html)
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_parsing_service():
+    """Return the process-wide ParsingService; workers start on first pooled parse"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ParsingService()
+        return _service
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from changes import log_changes
+from models import db, CaseDetail, CourtOrder
+
+def _add_orders(case_details, orders):
+    today = datetime.now().date()
+    db.session.add_all([
+        CourtOrder(
+            case_detail_id=case_details.id,
+            order_date=order.order_date or today,
+            order_type=order.order_type,
+            order_title=order.order_title,
+            order_description=order.order_description,
+            pdf_url=order.pdf_url
+        ) for order in orders
+    ])
+
+def _detail_fields(result):
+    details = result.case_details
+    return {
+        'case_title': details.case_title,
+        'petitioner': details.petitioner,
+        'respondent': details.respondent,
+        'filing_date': details.filing_date,
+        'next_hearing_date': details.next_hearing_date,
+        'case_status': details.case_status,
+        'raw_response': result.raw_snapshot,
+    }
+
+def save_case_details(case_query, result):
+    """Store a CaseResult's details and orders under case_query (caller commits)"""
+    case_details = CaseDetail(query_id=case_query.id, **_detail_fields(result))
+    db.session.add(case_details)
+    db.session.flush()  # assigns case_details.id for the orders
+    _add_orders(case_details, result.orders)
+    return case_details
+
+def refresh_case_details(case_query, result):
+    """Overwrite case_query's stored details and orders with a fresh CaseResult (caller commits)"""
+    case_details = case_query.case_details
+    if case_details is None:
+        return save_case_details(case_query, result)
+    for field, value in _detail_fields(result).items():
+        setattr(case_details, field, value)
+    # Bump even when nothing changed: updated_at is the freshness timestamp
+    case_details.updated_at = datetime.utcnow()
+    stale_ids = db.session.execute(
+        db.select(CourtOrder.id).where(CourtOrder.case_detail_id == case_details.id)).scalars().all()
+    CourtOrder.query.filter(CourtOrder.id.in_(stale_ids)).delete(synchronize_session=False)
+    log_changes(CourtOrder, stale_ids, 'delete')  # bulk deletes skip the change-log flush hook
+    db.session.expire(case_details, ['orders'])
+    _add_orders(case_details, result.orders)
+    return case_details
@@ -0,0 +1,254 @@
+"""
+Opt-in request profiling.
+
+Off unless PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set, and then
+init_profiling() registers no hooks or routes at all: an unprofiled
+deployment runs exactly the code it ran before. When on, a request is
+profiled if its X-Profile-Token header matches PROFILE_TOKEN, or at random
+for a PROFILE_SAMPLE_RATE fraction of requests. A profiled request runs under
+cProfile and records:
+
+- wall time, and the CPU time of the thread serving it
+- SQL statement count and time (SQLAlchemy cursor events)
+- WebDriver command count (each one a chromedriver round-trip)
+
+Each profile is saved under PROFILE_DIR as <id>.json (the summary) and
+<id>.prof (pstats data, for python -m pstats or snakeviz); the PROFILE_KEEP
+most recent are kept. /profiles lists the slowest of them and needs the token.
+
+Counters are per thread, so work a request hands to another thread (live
+searches, the async engine's event loop, the parse pool) only shows in its
+wall time.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import secrets
+import threading
+import time
+from datetime import datetime
+
+from flask import abort, render_template, request, send_from_directory
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_PATTERN = re.compile(r'^\d{8}T\d{12}-[0-9a-f]{8}$')
+# Never profiled: the profile pages themselves and static files
+SKIPPED_PREFIXES = ('/profiles', '/static/')
+
+_local = threading.local()
+_enabled = False
+_instrument_lock = threading.Lock()
+
+def profiling_enabled():
+    return bool(Config.PROFILE_TOKEN) or Config.PROFILE_SAMPLE_RATE > 0
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+class RequestProfile:
+    """Timings and counters of one profiled request"""
+
+    def __init__(self, method, path):
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{secrets.token_hex(4)}"
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.webdriver_count = 0
+        self.wall_time = None
+        self.cpu_time = None
+        self.profiler = cProfile.Profile()
+        self._wall_start = None
+        self._cpu_start = None
+
+    def start(self):
+        _local.profile = self
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; keep the counters
+            logger.warning(f"Profiler busy; {self.path} profiled without call stats")
+            self.profiler = None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def stop(self):
+        self.wall_time = time.perf_counter() - self._wall_start
+        self.cpu_time = time.thread_time() - self._cpu_start
+        if self.profiler is not None:
+            self.profiler.disable()
+        _local.profile = None
+
+    def summary(self, status_code):
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'status': status_code,
+            'started_at': self.started_at.isoformat(),
+            'wall_ms': round(self.wall_time * 1000, 1),
+            'cpu_ms': round(self.cpu_time * 1000, 1),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_time * 1000, 1),
+            'webdriver_count': self.webdriver_count,
+            'has_stats': self.profiler is not None,
+        }
+
+def save_profile(profile, status_code, directory=None, keep=None):
+    """Write a stopped profile to disk and prune the oldest beyond keep; returns its summary"""
+    directory = directory or Config.PROFILE_DIR
+    keep = keep or Config.PROFILE_KEEP
+    os.makedirs(directory, exist_ok=True)
+    summary = profile.summary(status_code)
+    if profile.profiler is not None:
+        profile.profiler.dump_stats(os.path.join(directory, f'{profile.id}.prof'))
+    with open(os.path.join(directory, f'{profile.id}.json'), 'w') as f:
+        json.dump(summary, f)
+
+    # Ids start with their timestamp, so name order is age order
+    stale = sorted(name[:-5] for name in os.listdir(directory) if name.endswith('.json'))[:-keep]
+    for profile_id in stale:
+        for ext in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, profile_id + ext))
+            except FileNotFoundError:
+                pass
+    return summary
+
+def load_profiles(directory=None):
+    """Summaries of the stored profiles, slowest first"""
+    directory = directory or Config.PROFILE_DIR
+    summaries = []
+    if not os.path.isdir(directory):
+        return summaries
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # pruned or still being written
+    return sorted(summaries, key=lambda summary: summary['wall_ms'], reverse=True)
+
+def format_stats(profile_id, directory=None, limit=60):
+    """Text report of a stored profile's slowest calls by cumulative time"""
+    out = io.StringIO()
+    stats = pstats.Stats(os.path.join(directory or Config.PROFILE_DIR, f'{profile_id}.prof'), stream=out)
+    stats.sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile() is not None:
+        context._profile_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile()
+    started = getattr(context, '_profile_started', None)
+    if profile is not None and started is not None:
+        profile.sql_count += 1
+        profile.sql_time += time.perf_counter() - started
+
+def instrument_webdriver(driver_class=None):
+    """
+    Count WebDriver commands issued by profiled requests. Every command, element
+    methods included, goes through the driver's execute(); wrapped once per
+    class, and only when profiling is on.
+    """
+    if not _enabled:
+        return
+    if driver_class is None:
+        from selenium.webdriver.remote.webdriver import WebDriver as driver_class
+    with _instrument_lock:
+        execute = driver_class.execute
+        if getattr(execute, '_profiled', False):
+            return
+
+        def counted_execute(self, *args, **kwargs):
+            profile = current_profile()
+            if profile is not None:
+                profile.webdriver_count += 1
+            return execute(self, *args, **kwargs)
+
+        counted_execute._profiled = True
+        driver_class.execute = counted_execute
+
+def _authorized():
+    token = request.headers.get(PROFILE_HEADER) or request.args.get('token', '')
+    return bool(Config.PROFILE_TOKEN) and secrets.compare_digest(token, Config.PROFILE_TOKEN)
+
+def init_profiling(app):
+    """Profile requests asked for with X-Profile-Token or picked by PROFILE_SAMPLE_RATE; no-op when both are unset"""
+    global _enabled
+    if not profiling_enabled():
+        return
+    _enabled = True
+
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        if request.path.startswith(SKIPPED_PREFIXES):
+            return
+        if not (PROFILE_HEADER in request.headers and _authorized()
+                or random.random() < Config.PROFILE_SAMPLE_RATE):
+            return
+        RequestProfile(request.method, request.full_path.rstrip('?')).start()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = current_profile()
+        if profile is None:
+            return response
+        profile.stop()
+        try:
+            summary = save_profile(profile, response.status_code)
+        except OSError as e:
+            logger.error(f"Could not save profile {profile.id}: {str(e)}")
+            return response
+        response.headers['X-Profile-Id'] = profile.id
+        logger.info(f"Profiled {profile.method} {profile.path}: {summary['wall_ms']} ms wall, "
+                    f"{summary['sql_count']} SQL, {summary['webdriver_count']} WebDriver")
+        return response
+
+    @app.teardown_request
+    def discard_profile(exc):
+        # Requests that ended in an unhandled error never reach after_request
+        profile = current_profile()
+        if profile is not None:
+            profile.stop()
+
+    @app.route('/profiles')
+    def profiles():
+        """Slowest recently profiled requests"""
+        if not _authorized():
+            abort(404)
+        return render_template('profiles.html', profiles=load_profiles()[:Config.PROFILE_INDEX_SIZE],
+                               token=request.args.get('token', ''))
+
+    @app.route('/profiles/<profile_id>')
+    def profile_stats(profile_id):
+        """cProfile report of one stored profile; ?download=1 for the raw pstats file"""
+        if not _authorized() or not PROFILE_ID_PATTERN.match(profile_id):
+            abort(404)
+        if not os.path.exists(os.path.join(Config.PROFILE_DIR, f'{profile_id}.prof')):
+            abort(404)
+        if request.args.get('download'):
+            return send_from_directory(os.path.abspath(Config.PROFILE_DIR), f'{profile_id}.prof',
+                                       as_attachment=True)
+        return format_stats(profile_id), 200, {'Content-Type': 'text/plain; charset=utf-8'}
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from config import Config
+from models import db, ProgressChannel, ProgressEvent
+
+TERMINAL_EVENTS = ('done', 'failed')
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    return str(value)
+
+class ProgressBus:
+    """
+    Search progress events, one channel per search, stored in the database so
+    that every app process sees them: the POST that starts a search, its event
+    stream and its live results page can each reach a different worker.
+
+    Channels keep their full event history so a subscriber that connects late
+    (or reconnects with Last-Event-ID) replays what it missed. Subscribers
+    poll every poll_interval seconds; a publish in the same process wakes them
+    at once. Channels are dropped channel_ttl seconds after they were created.
+    Call inside an app context.
+    """
+
+    def __init__(self, channel_ttl=None, poll_interval=None):
+        self.channel_ttl = channel_ttl or Config.PROGRESS_CHANNEL_TTL
+        self.poll_interval = poll_interval or Config.PROGRESS_POLL_INTERVAL
+        self._changed = threading.Condition()
+
+    def create(self, **meta):
+        """Open a channel and return its id; meta is kept for the live results page"""
+        search_id = uuid.uuid4().hex
+        # Own transaction, so the caller's session is neither committed nor blocked
+        with db.engine.begin() as connection:
+            self._expire(connection)
+            connection.execute(ProgressChannel.__table__.insert().values(
+                id=search_id, meta=json.dumps(meta, default=_json_default), created_at=datetime.utcnow()))
+        return search_id
+
+    def meta(self, search_id):
+        with db.engine.connect() as connection:
+            meta = connection.scalar(db.select(ProgressChannel.meta).where(ProgressChannel.id == search_id))
+        return json.loads(meta) if meta is not None else None
+
+    def publish(self, search_id, event, **data):
+        # One publisher per channel (the search itself), so the next position is count + 1
+        with db.engine.begin() as connection:
+            if connection.scalar(db.select(ProgressChannel.id).where(ProgressChannel.id == search_id)) is None:
+                return
+            position = connection.scalar(
+                db.select(db.func.count(ProgressEvent.id)).where(ProgressEvent.search_id == search_id)) + 1
+            connection.execute(ProgressEvent.__table__.insert().values(
+                search_id=search_id, position=position, event=event,
+                data=json.dumps(data, default=_json_default), created_at=datetime.utcnow()))
+        with self._changed:
+            self._changed.notify_all()
+
+    def subscribe(self, search_id, after=0, keepalive=15):
+        """
+        Yield (position, event, json data) for events after position `after`
+        until a terminal event; yields None every keepalive seconds while
+        nothing happens.
+        """
+        position = after
+        idle_since = time.monotonic()
+        while True:
+            with db.engine.connect() as connection:
+                pending = connection.execute(
+                    db.select(ProgressEvent.position, ProgressEvent.event, ProgressEvent.data)
+                    .where(ProgressEvent.search_id == search_id, ProgressEvent.position > position)
+                    .order_by(ProgressEvent.position)
+                ).all()
+                if not pending and connection.scalar(
+                        db.select(ProgressChannel.id).where(ProgressChannel.id == search_id)) is None:
+                    return
+            if not pending:
+                if time.monotonic() - idle_since >= keepalive:
+                    idle_since = time.monotonic()
+                    yield None
+                    continue
+                with self._changed:
+                    self._changed.wait(timeout=self.poll_interval)
+                continue
+            idle_since = time.monotonic()
+            for position, event, data in pending:
+                yield position, event, data
+                if event in TERMINAL_EVENTS:
+                    return
+
+    def _expire(self, connection):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.channel_ttl)
+        expired = db.select(ProgressChannel.id).where(ProgressChannel.created_at < cutoff)
+        connection.execute(ProgressEvent.__table__.delete().where(ProgressEvent.search_id.in_(expired)))
+        connection.execute(ProgressChannel.__table__.delete().where(ProgressChannel.created_at < cutoff))
+
+def format_sse(event, data, event_id=None):
+    """One Server-Sent Events message"""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {data}']
+    return '\n'.join(lines) + '\n\n'
+
+_bus = None
+_bus_lock = threading.Lock()
+
+def get_progress_bus():
+    """Return the process-wide progress bus (its events live in the database)"""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = ProgressBus()
+        return _bus
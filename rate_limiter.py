@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# A lookup that gave up waiting for a token: local backpressure, not a court site failure
+THROTTLED_ERROR = 'Rate limit wait exceeded. Please try again later.'
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket for outbound requests to the court site, shared by every
+    process that points at the same SQLite state file.
+
+    The refill rate adapts AIMD-style: each clean response adds
+    increase_step requests/second (up to max_rate); a CAPTCHA or error
+    multiplies the rate by its backoff factor (down to min_rate), at most
+    once per backoff_cooldown seconds so one burst of failures counts once.
+    """
+
+    def __init__(self, name='delhihighcourt', path=None, initial_rate=None, min_rate=None, max_rate=None,
+                 burst=None, increase_step=None, captcha_backoff=None, error_backoff=None, backoff_cooldown=None):
+        self.name = name
+        self.path = path or Config.RATE_LIMIT_STATE_PATH
+        self.initial_rate = initial_rate or Config.RATE_LIMIT_INITIAL_RATE
+        self.min_rate = min_rate or Config.RATE_LIMIT_MIN_RATE
+        self.max_rate = max_rate or Config.RATE_LIMIT_MAX_RATE
+        self.burst = burst or Config.RATE_LIMIT_BURST
+        self.increase_step = increase_step or Config.RATE_LIMIT_INCREASE_STEP
+        self.captcha_backoff = captcha_backoff or Config.RATE_LIMIT_CAPTCHA_BACKOFF
+        self.error_backoff = error_backoff or Config.RATE_LIMIT_ERROR_BACKOFF
+        self.backoff_cooldown = Config.RATE_LIMIT_BACKOFF_COOLDOWN if backoff_cooldown is None else backoff_cooldown
+        self._local = threading.local()
+        self._init_schema()
+
+    def _connect(self):
+        """One connection per thread; sqlite3 connections must not cross threads"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    def _init_schema(self):
+        connection = self._connect()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_bucket ('
+            'name TEXT PRIMARY KEY, tokens REAL NOT NULL, rate REAL NOT NULL, updated REAL NOT NULL, '
+            'last_backoff REAL NOT NULL DEFAULT 0, successes INTEGER NOT NULL DEFAULT 0, '
+            'captchas INTEGER NOT NULL DEFAULT 0, errors INTEGER NOT NULL DEFAULT 0)'
+        )
+        connection.execute(
+            'INSERT OR IGNORE INTO rate_limit_bucket (name, tokens, rate, updated) VALUES (?, ?, ?, ?)',
+            (self.name, float(self.burst), float(self.initial_rate), time.time())
+        )
+
+    def _transaction(self, update):
+        """Run update(row) -> (new values dict, result) under an exclusive write lock"""
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, rate, updated, last_backoff FROM rate_limit_bucket WHERE name = ?', (self.name,)
+            ).fetchone()
+            values, result = update(*row, now=time.time())
+            if values:
+                assignments = ', '.join(f'{column} = ?' for column in values)
+                connection.execute(f'UPDATE rate_limit_bucket SET {assignments} WHERE name = ?',
+                                   (*values.values(), self.name))
+            connection.execute('COMMIT')
+            return result
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def try_acquire(self):
+        """Take one token if available. Returns (acquired, seconds until a token is due)"""
+        def update(tokens, rate, updated, last_backoff, now):
+            tokens = min(float(self.burst), tokens + max(0.0, now - updated) * rate)
+            if tokens >= 1.0:
+                return {'tokens': tokens - 1.0, 'updated': now}, (True, 0.0)
+            return {'tokens': tokens, 'updated': now}, (False, (1.0 - tokens) / rate)
+        return self._transaction(update)
+
+    def acquire(self, timeout=None):
+        """Block until a token is taken; False if timeout seconds pass first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            acquired, wait = self.try_acquire()
+            if acquired:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout=None):
+        """acquire() for the asyncio engine; waits with asyncio.sleep"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            acquired, wait = await loop.run_in_executor(None, self.try_acquire)
+            if acquired:
+                return True
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    def record_success(self):
+        """Additive increase after a clean response"""
+        def update(tokens, rate, updated, last_backoff, now):
+            return {'rate': min(self.max_rate, rate + self.increase_step)}, None
+        self._transaction(update)
+        self._count('successes')
+
+    def record_captcha(self):
+        """Multiplicative decrease after the site served a CAPTCHA"""
+        self._backoff(self.captcha_backoff)
+        self._count('captchas')
+
+    def record_error(self):
+        """Multiplicative decrease after a failed or timed-out request"""
+        self._backoff(self.error_backoff)
+        self._count('errors')
+
+    def _backoff(self, factor):
+        def update(tokens, rate, updated, last_backoff, now):
+            if now - last_backoff < self.backoff_cooldown:
+                return {}, None
+            new_rate = max(self.min_rate, rate * factor)
+            logger.info(f"Rate limiter backing off: {rate:.3f} -> {new_rate:.3f} req/s")
+            return {'rate': new_rate, 'last_backoff': now}, None
+        self._transaction(update)
+
+    def _count(self, column):
+        self._connect().execute(f'UPDATE rate_limit_bucket SET {column} = {column} + 1 WHERE name = ?', (self.name,))
+
+    def state(self):
+        row = self._connect().execute(
+            'SELECT tokens, rate, successes, captchas, errors FROM rate_limit_bucket WHERE name = ?', (self.name,)
+        ).fetchone()
+        return dict(zip(('tokens', 'rate', 'successes', 'captchas', 'errors'), row))
+
+class _NullRateLimiter:
+    """Stand-in used when RATE_LIMIT_ENABLED is off"""
+
+    def acquire(self, timeout=None):
+        return True
+
+    async def acquire_async(self, timeout=None):
+        return True
+
+    def record_success(self):
+        pass
+
+    def record_captcha(self):
+        pass
+
+    def record_error(self):
+        pass
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Return this process's handle on the shared rate limiter"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter() if Config.RATE_LIMIT_ENABLED else _NullRateLimiter()
+        return _limiter
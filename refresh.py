@@ -0,0 +1,62 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class RefreshQueue:
+    """
+    Background executor for stale-while-revalidate refreshes.
+
+    Submissions are deduplicated by key: while a refresh for a key is queued
+    or running, further submissions for it are dropped.
+    """
+
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or Config.SWR_REFRESH_WORKERS,
+                                            thread_name_prefix='swr-refresh')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        """Queue func(*args) unless key is already pending; True if queued"""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        try:
+            self._executor.submit(self._run, key, func, args)
+        except RuntimeError:
+            with self._lock:
+                self._pending.discard(key)
+            raise
+        return True
+
+    def _run(self, key, func, args):
+        try:
+            func(*args)
+        except Exception as e:
+            logger.error(f"Background refresh {key} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def is_pending(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_refresh_queue():
+    """Return the process-wide refresh queue"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = RefreshQueue()
+        return _queue
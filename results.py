@@ -0,0 +1,177 @@
+"""
+Typed scrape results.
+
+Scrapers return loosely shaped dicts: the live paths report next_hearing while
+mock data uses next_hearing_date, and dates arrive as DD/MM/YYYY strings or
+date objects. CaseResult.from_scraper() is the one place those are
+normalized; persistence, the API and progress events all work on the typed
+objects, and to_dict() gives the API shape with dates as DD/MM/YYYY.
+
+The scraped page is only needed as the stored raw_response, so results carry
+its head (snapshot_html), never the whole page.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional
+
+from config import Config
+
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')
+
+def parse_date(value):
+    """Date from a result field (DD/MM/YYYY or ISO string, date or datetime); None if missing or unparseable"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value.strip():
+        value = value.strip()
+        # Fast path for the court site's DD/MM/YYYY; strptime is several times slower
+        if len(value) == 10 and value[2] == '/' and value[5] == '/':
+            try:
+                return date(int(value[6:]), int(value[3:5]), int(value[:2]))
+            except ValueError:
+                return None
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+    return None
+
+def snapshot_html(html):
+    """The part of a scraped page worth storing: its first RAW_SNAPSHOT_MAX_CHARS characters"""
+    return (html or '')[:max(0, Config.RAW_SNAPSHOT_MAX_CHARS)]
+
+def format_date(value):
+    return f'{value.day:02d}/{value.month:02d}/{value.year:04d}' if value else ''
+
+def _text(value):
+    if value is None:
+        return ''
+    return value.strip() if isinstance(value, str) else str(value)
+
+@dataclass
+class Order:
+    __slots__ = ('order_title', 'order_date', 'order_type', 'pdf_url', 'order_description')
+    order_title: str
+    order_date: Optional[date]
+    order_type: str
+    pdf_url: str
+    order_description: str
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            _text(raw.get('order_title')),
+            parse_date(raw.get('order_date')),
+            _text(raw.get('order_type')) or 'Order',
+            _text(raw.get('pdf_url')),
+            _text(raw.get('order_description')),
+        )
+
+    @classmethod
+    def from_model(cls, order):
+        return cls(order.order_title or '', order.order_date, order.order_type or 'Order',
+                   order.pdf_url or '', order.order_description or '')
+
+    def to_dict(self):
+        return {
+            'order_title': self.order_title,
+            'order_date': format_date(self.order_date),
+            'order_type': self.order_type,
+            'pdf_url': self.pdf_url,
+            'order_description': self.order_description,
+        }
+
+@dataclass
+class CaseDetails:
+    __slots__ = ('case_title', 'petitioner', 'respondent', 'filing_date', 'next_hearing_date', 'case_status')
+    case_title: str
+    petitioner: str
+    respondent: str
+    filing_date: Optional[date]
+    next_hearing_date: Optional[date]
+    case_status: str
+
+    @classmethod
+    def from_raw(cls, raw):
+        return cls(
+            _text(raw.get('case_title')),
+            _text(raw.get('petitioner')),
+            _text(raw.get('respondent')),
+            parse_date(raw.get('filing_date')),
+            # The live scrapers report next_hearing; mock data uses next_hearing_date
+            parse_date(raw.get('next_hearing_date') or raw.get('next_hearing')),
+            _text(raw.get('case_status')),
+        )
+
+    @classmethod
+    def from_model(cls, details):
+        return cls(details.case_title or '', details.petitioner or '', details.respondent or '',
+                   details.filing_date, details.next_hearing_date, details.case_status or '')
+
+    def to_dict(self):
+        return {
+            'case_title': self.case_title,
+            'petitioner': self.petitioner,
+            'respondent': self.respondent,
+            'filing_date': format_date(self.filing_date),
+            'next_hearing_date': format_date(self.next_hearing_date),
+            'case_status': self.case_status,
+        }
+
+@dataclass
+class CaseResult:
+    """Outcome of one lookup: details and orders, or an error"""
+    __slots__ = ('case_details', 'orders', 'raw_snapshot', 'error', 'circuit_open', 'not_found', 'throttled')
+    case_details: Optional[CaseDetails]
+    orders: List[Order]
+    raw_snapshot: str  # snapshot_html() of the scraped page, for persistence; empty otherwise
+    error: Optional[str]
+    circuit_open: bool
+    not_found: bool  # the court answered that the case does not exist
+    throttled: bool  # our own rate limiter gave up waiting; the court site was never asked
+
+    @classmethod
+    def from_scraper(cls, raw):
+        """Normalize a scraper's result dict"""
+        if raw.get('error') or not raw.get('case_details'):
+            return cls.failure(raw.get('error') or 'No case details in result', bool(raw.get('circuit_open')),
+                               bool(raw.get('not_found')), bool(raw.get('throttled')))
+        return cls(
+            CaseDetails.from_raw(raw['case_details']),
+            [Order.from_raw(order) for order in raw.get('orders') or ()],
+            snapshot_html(raw.get('raw_html')),
+            None,
+            False,
+            False,
+            False,
+        )
+
+    @classmethod
+    def from_model(cls, case_query):
+        """A stored lookup (CaseQuery with details) as a result; the stored page stays in the database"""
+        details = case_query.case_details
+        return cls(CaseDetails.from_model(details), [Order.from_model(order) for order in details.orders],
+                   '', None, False, False, False)
+
+    @classmethod
+    def failure(cls, error, circuit_open=False, not_found=False, throttled=False):
+        return cls(None, [], '', error, circuit_open, not_found, throttled)
+
+    @property
+    def success(self):
+        return self.error is None
+
+    def to_dict(self):
+        if self.error is not None:
+            if self.not_found:
+                return {'success': False, 'error': self.error, 'not_found': True}
+            return {'success': False, 'error': self.error}
+        return {
+            'success': True,
+            'case_details': self.case_details.to_dict(),
+            'orders': [order.to_dict() for order in self.orders],
+        }
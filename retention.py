@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+SearchLog retention for Court Data Fetcher.
+
+Rows older than the retention window are processed oldest first, in chunks:
+1. written to a gzip-compressed NDJSON segment file in the archive directory,
+2. deleted and rolled up into SearchLogRollup in a single transaction.
+
+Usage:
+    python retention.py [--days 90] [--chunk-size 5000] [--archive-dir DIR] [--dry-run]
+    python retention.py --vacuum [--pages 1000]
+    python retention.py --enable-incremental-vacuum
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from config import Config
+from database import upsert
+from models import db, SearchLog, SearchLogRollup
+
+logger = logging.getLogger(__name__)
+
+def _row_to_record(row):
+    return {
+        'id': row.id,
+        'timestamp': row.timestamp.isoformat() if row.timestamp else None,
+        'ip_address': row.ip_address,
+        'user_agent': row.user_agent,
+        'search_params': row.search_params,
+        'response_time': row.response_time,
+        'success': row.success,
+        'error_message': row.error_message,
+    }
+
+def _case_type_of(row):
+    try:
+        return json.loads(row.search_params or '{}').get('case_type', '') or ''
+    except ValueError:
+        return ''
+
+def _write_segment(archive_dir, rows):
+    """Write rows to searchlog-<first id>-<last id>.ndjson.gz; rename makes the segment appear atomically"""
+    os.makedirs(archive_dir, exist_ok=True)
+    name = f"searchlog-{rows[0].id:010d}-{rows[-1].id:010d}.ndjson.gz"
+    path = os.path.join(archive_dir, name)
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as segment:
+        for row in rows:
+            segment.write(json.dumps(_row_to_record(row)) + '\n')
+    os.replace(tmp_path, path)
+    return path
+
+def _merge_rollups(rows):
+    """Add rows' counts into SearchLogRollup within the current transaction"""
+    buckets = {}
+    for row in rows:
+        key = ((row.timestamp or datetime.utcnow()).date(), _case_type_of(row))
+        bucket = buckets.setdefault(key, [0, 0, 0.0, 0])
+        bucket[0] += 1
+        bucket[1] += 1 if row.success else 0
+        if row.response_time is not None:
+            bucket[2] += row.response_time
+            bucket[3] += 1
+
+    counters = ['total', 'successful', 'response_time_sum', 'response_time_count']
+    for (day, case_type), (total, successful, time_sum, time_count) in buckets.items():
+        # ON CONFLICT on uq_search_log_rollup_day_type: concurrent runs add up instead of colliding
+        upsert(SearchLogRollup.__table__, {
+            'day': day, 'case_type': case_type, 'total': total, 'successful': successful,
+            'response_time_sum': time_sum, 'response_time_count': time_count, 'updated_at': datetime.utcnow(),
+        }, index_elements=['day', 'case_type'], increments=counters)
+
+def run_retention(retention_days=None, chunk_size=None, archive_dir=None, dry_run=False):
+    """
+    Archive, roll up and delete SearchLog rows older than retention_days.
+    Must run inside an application context. Returns a summary dict.
+    """
+    retention_days = Config.SEARCHLOG_RETENTION_DAYS if retention_days is None else retention_days
+    chunk_size = chunk_size or Config.RETENTION_CHUNK_SIZE
+    archive_dir = archive_dir or Config.SEARCHLOG_ARCHIVE_DIR
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    summary = {'cutoff': cutoff.isoformat(), 'dry_run': dry_run, 'archived': 0, 'deleted': 0, 'segments': []}
+
+    aged = SearchLog.query.filter(SearchLog.timestamp < cutoff)
+    if dry_run:
+        summary['eligible'] = aged.count()
+        oldest = db.session.query(db.func.min(SearchLog.timestamp)).scalar()
+        summary['oldest'] = oldest.isoformat() if oldest else None
+        return summary
+
+    last_id = 0
+    while True:
+        rows = aged.filter(SearchLog.id > last_id).order_by(SearchLog.id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        segment = _write_segment(archive_dir, rows)
+        summary['segments'].append(segment)
+        summary['archived'] += len(rows)
+
+        # Delete first: if another process already took this chunk, skip it rather than double count
+        ids = [row.id for row in rows]
+        deleted = SearchLog.query.filter(SearchLog.id.in_(ids)).delete(synchronize_session=False)
+        if deleted != len(ids):
+            db.session.rollback()
+            logger.warning(f"SearchLog chunk {ids[0]}-{ids[-1]} changed concurrently; skipped")
+            continue
+        _merge_rollups(rows)
+        db.session.commit()
+        db.session.expunge_all()
+        summary['deleted'] += deleted
+        logger.info(f"Archived and deleted SearchLog rows {ids[0]}-{ids[-1]} -> {segment}")
+
+    return summary
+
+def _is_sqlite():
+    return db.engine.dialect.name == 'sqlite'
+
+def enable_incremental_vacuum():
+    """Switch a SQLite database to auto_vacuum=INCREMENTAL (one full VACUUM, run once)"""
+    if not _is_sqlite():
+        return False
+    with db.engine.connect() as connection:
+        mode = connection.exec_driver_sql('PRAGMA auto_vacuum').scalar()
+        if mode != 2:
+            connection.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+            connection.exec_driver_sql('VACUUM')
+            logger.info("Enabled incremental auto-vacuum")
+    return True
+
+def incremental_vacuum(pages=None):
+    """Return up to `pages` free pages to the filesystem; no-op unless SQLite in incremental mode"""
+    pages = pages or Config.VACUUM_PAGES
+    if not _is_sqlite():
+        return 0
+    with db.engine.connect() as connection:
+        if connection.exec_driver_sql('PRAGMA auto_vacuum').scalar() != 2:
+            return 0
+        free_before = connection.exec_driver_sql('PRAGMA freelist_count').scalar()
+        # pysqlite steps an execute() only once (one page); executescript runs the pragma to completion
+        connection.connection.driver_connection.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+        freed = free_before - connection.exec_driver_sql('PRAGMA freelist_count').scalar()
+    if freed:
+        logger.info(f"Incremental vacuum freed {freed} pages")
+    return freed
+
+def register_jobs(scheduler, app):
+    """Schedule retention and incremental vacuum on a BackgroundScheduler"""
+    def retention_job():
+        with app.app_context():
+            run_retention()
+
+    def vacuum_job():
+        with app.app_context():
+            incremental_vacuum()
+
+    scheduler.add_job('searchlog-retention', Config.RETENTION_INTERVAL_HOURS * 3600, retention_job)
+    scheduler.add_job('incremental-vacuum', Config.VACUUM_INTERVAL_MINUTES * 60, vacuum_job)
+
+def main():
+    parser = argparse.ArgumentParser(description='SearchLog retention, archival and compaction')
+    parser.add_argument('--days', type=int, default=Config.SEARCHLOG_RETENTION_DAYS,
+                        help='keep this many days of raw SearchLog rows')
+    parser.add_argument('--chunk-size', type=int, default=Config.RETENTION_CHUNK_SIZE)
+    parser.add_argument('--archive-dir', default=Config.SEARCHLOG_ARCHIVE_DIR)
+    parser.add_argument('--dry-run', action='store_true', help='report what would be archived, change nothing')
+    parser.add_argument('--vacuum', action='store_true', help='run an incremental vacuum only')
+    parser.add_argument('--pages', type=int, default=Config.VACUUM_PAGES)
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help='switch SQLite to auto_vacuum=INCREMENTAL (rewrites the file once)')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.enable_incremental_vacuum:
+            print(json.dumps({'incremental_vacuum_enabled': enable_incremental_vacuum()}))
+        elif args.vacuum:
+            print(json.dumps({'pages_freed': incremental_vacuum(args.pages)}))
+        else:
+            summary = run_retention(args.days, args.chunk_size, args.archive_dir, dry_run=args.dry_run)
+            print(json.dumps(summary, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@
 Simple runner script for the Court Data Fetcher application
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -14,12 +15,30 @@ def ensure_directories():
         Path(directory).mkdir(parents=True, exist_ok=True)
         print(f"✅ Ensured directory exists: {directory}")
 
+def run_production():
+    """Replace this process with gunicorn: preloaded, warmed, multi-worker (see gunicorn.conf.py)"""
+    print("🏭 Starting production server (gunicorn)...")
+    try:
+        os.execvp('gunicorn', ['gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application'])
+    except OSError as e:
+        print(f"❌ Failed to start gunicorn: {e}")
+        print("💡 Install it with: pip install gunicorn (not available on Windows)")
+        sys.exit(1)
+
 def main():
     """Main function to run the application"""
+    parser = argparse.ArgumentParser(description='Run Court Data Fetcher')
+    parser.add_argument('--production', action='store_true',
+                        help='serve with gunicorn and warm up before taking traffic')
+    args = parser.parse_args()
+
     print("🚀 Starting Court Data Fetcher...")
     
     # Ensure directories exist
     ensure_directories()
+
+    if args.production:
+        run_production()
     
     # Set environment variables
     os.environ.setdefault('FLASK_APP', 'app.py')
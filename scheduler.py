@@ -0,0 +1,59 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class BackgroundScheduler:
+    """
+    Minimal interval scheduler running jobs on one daemon thread.
+
+    Jobs run sequentially; a failing job is logged and retried at its next
+    interval. Enable it on a single process per deployment.
+    """
+
+    def __init__(self):
+        self._jobs = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add_job(self, name, interval_seconds, func, run_immediately=False):
+        """Run func every interval_seconds (first run after one interval unless run_immediately)"""
+        next_run = time.monotonic() + (0 if run_immediately else interval_seconds)
+        self._jobs.append({'name': name, 'interval': interval_seconds, 'func': func, 'next_run': next_run})
+        self._wakeup.set()
+
+    def jobs(self):
+        return [job['name'] for job in self._jobs]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='background-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self._jobs:
+                if job['next_run'] <= now:
+                    try:
+                        job['func']()
+                    except Exception as e:
+                        logger.error(f"Scheduled job {job['name']} failed: {str(e)}")
+                    job['next_run'] = time.monotonic() + job['interval']
+
+            self._wakeup.clear()
+            if self._jobs:
+                delay = max(0.0, min(job['next_run'] for job in self._jobs) - time.monotonic())
+            else:
+                delay = None
+            self._wakeup.wait(timeout=delay)
@@ -1,23 +1,158 @@
 import time
 import json
 import os
+import functools
 import requests
 from datetime import datetime, date, timedelta
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 import logging
+import re
+
+from config import Config
+from rate_limiter import THROTTLED_ERROR, get_rate_limiter
+from browser_farm import get_endpoint_pool
+from browser_profile import get_lean_profile
+from profiling import instrument_webdriver
+from results import snapshot_html
+from validation import NOT_FOUND_ERROR
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Headers sent by the HTTP scraping paths to mimic a real browser
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+DATE_PATTERN = re.compile(r'\b(\d{2}/\d{2}/\d{4})\b')
+
+@functools.lru_cache(maxsize=None)
+def _find_chrome_installation():
+    """Probe common Chrome locations once per process; returns True if found"""
+    chrome_paths = [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        "/usr/bin/google-chrome",
+        "/usr/bin/chromium-browser",
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+    ]
+    
+    chrome_found = False
+    for path in chrome_paths:
+        if os.path.exists(path):
+            logger.info(f"Chrome found at: {path}")
+            chrome_found = True
+            break
+    
+    if not chrome_found:
+        logger.warning("Chrome browser not found in common locations. WebDriver may fail.")
+        logger.info("Please install Google Chrome or ensure it's in your PATH.")
+    else:
+        logger.info("Chrome browser installation verified")
+    
+    return chrome_found
+
+# XPath selectors for the WebDriver path, evaluated offline against page_source snapshots
+CAPTCHA_XPATHS = (
+    "//input[@name='captcha']",
+    "//img[contains(@src, 'captcha')]",
+    "//div[contains(text(), 'CAPTCHA')]",
+    "//div[contains(text(), 'captcha')]",
+)
+FORM_FIELD_XPATHS = {
+    'case_type': ("//*[@name='case_type']", "//select[contains(@id, 'case_type')]"),
+    'case_number': ("//*[@name='case_number']", "//input[contains(@id, 'case_number')]",
+                    "//input[contains(@placeholder, 'case')]"),
+    'filing_year': ("//*[@name='filing_year']", "//input[contains(@id, 'filing_year')]",
+                    "//input[contains(@placeholder, 'year')]"),
+}
+SUBMIT_XPATHS = (
+    "//button[@type='submit']",
+    "//input[@type='submit']",
+    "//button[contains(text(), 'Search')]",
+    "//button[contains(text(), 'Submit')]",
+)
+TITLE_XPATHS = (
+    "//h1[contains(@class, 'case-title')]",
+    "//h2[contains(@class, 'case-title')]",
+    "//div[contains(@class, 'case-title')]",
+    "//span[contains(@class, 'case-title')]",
+)
+PETITIONER_XPATHS = (
+    "//td[contains(text(), 'Petitioner')]/following-sibling::td",
+    "//div[contains(text(), 'Petitioner')]/following-sibling::div",
+    "//span[contains(text(), 'Petitioner')]/following-sibling::span",
+)
+RESPONDENT_XPATHS = (
+    "//td[contains(text(), 'Respondent')]/following-sibling::td",
+    "//div[contains(text(), 'Respondent')]/following-sibling::div",
+    "//span[contains(text(), 'Respondent')]/following-sibling::span",
+)
+# The court's answer when a search matches nothing; only trusted on pages without a case title
+NOT_FOUND_PATTERN = re.compile(
+    r'no\s+(?:such\s+)?(?:records?|cases?|matters?)\s+(?:found|exists?)|(?:record|case|matter)\s+not\s+found', re.I)
+VISIBLE_TEXT_XPATH = "//body//text()[not(ancestor::script) and not(ancestor::style)]"
+ORDER_XPATHS = (
+    "//tr[contains(@class, 'order')]",
+    "//div[contains(@class, 'order')]",
+    "//table//tr[position()>1]",  # Skip header row
+)
+
+@functools.lru_cache(maxsize=None)
+def _xpath(expression):
+    """Compiled lxml XPath, built once per process"""
+    from lxml import etree
+    return etree.XPath(expression)
+
+def load_html(html):
+    """lxml tree for a page snapshot (an empty document if there is no markup)"""
+    import lxml.html
+    if not html or not html.strip():
+        return lxml.html.fromstring('<html></html>')
+    return lxml.html.fromstring(html)
+
+def _node_text(node):
+    """Whitespace-normalized text of an element, like WebElement.text"""
+    return ' '.join(' '.join(node.itertext()).split())
+
+def _first_match(tree, xpaths):
+    """First selector in xpaths that matches anything in the snapshot, or None"""
+    for selector in xpaths:
+        if _xpath(selector)(tree):
+            return selector
+    return None
+
+def _first_text(tree, xpaths):
+    """Text of the first non-empty element matched by any selector"""
+    for selector in xpaths:
+        for node in _xpath(selector)(tree):
+            text = _node_text(node)
+            if text:
+                return text
+    return ''
+
+# ChromeDriver path resolved by warm_chromedriver(); searches reuse it instead of re-running webdriver-manager
+_chromedriver_path = None
+
+def warm_chromedriver():
+    """Resolve (and if needed download) ChromeDriver once per process; returns its path or None"""
+    global _chromedriver_path
+    if _chromedriver_path is None and _find_chrome_installation():
+        from webdriver_manager.chrome import ChromeDriverManager
+        from webdriver_manager.core.os_manager import ChromeType
+
+        try:
+            _chromedriver_path = ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()
+        except Exception:
+            _chromedriver_path = ChromeDriverManager().install()
+        logger.info(f"ChromeDriver resolved at {_chromedriver_path}")
+    return _chromedriver_path
+
 class DelhiHighCourtScraper:
     """
     Scraper for Delhi High Court.
@@ -35,45 +170,50 @@ class DelhiHighCourtScraper:
         self.search_url = "https://delhihighcourt.nic.in/case-status"
         self.driver = None
         self.session = requests.Session()
+        self.rate_limiter = get_rate_limiter()
+        # Remote WebDriver endpoints; None launches a local Chrome
+        self.endpoint_pool = get_endpoint_pool()
+        self.remote_endpoint = None
+        # Disk cache slot held by this scraper's local browser (lean profile)
+        self.cache_slot = None
+        # Tab leased from the shared browser pool (BROWSER_TABS_PER_BROWSER > 1)
+        self.tab = None
+        # Optional callback(stage, **data) set per search_case call
+        self.progress = None
         
         # Configure session headers to mimic a real browser
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        self.session.headers.update(BROWSER_HEADERS)
         
-        # Check Chrome installation
-        self._check_chrome_installation()
+        # Check Chrome installation (not needed when browsers run remotely)
+        if self.endpoint_pool is None:
+            self._check_chrome_installation()
     
     def _check_chrome_installation(self):
-        """Check if Chrome is installed and accessible"""
-        chrome_paths = [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            "/usr/bin/google-chrome",
-            "/usr/bin/chromium-browser",
-            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        ]
-        
-        chrome_found = False
-        for path in chrome_paths:
-            if os.path.exists(path):
-                logger.info(f"Chrome found at: {path}")
-                chrome_found = True
-                break
-        
-        if not chrome_found:
-            logger.warning("Chrome browser not found in common locations. WebDriver may fail.")
-            logger.info("Please install Google Chrome or ensure it's in your PATH.")
-        else:
-            logger.info("Chrome browser installation verified")
+        """Check if Chrome is installed and accessible (probed once per process)"""
+        return _find_chrome_installation()
+    
     
     def setup_driver(self):
-        """Set up Chrome WebDriver with appropriate options and fallback strategies"""
+        """Get a page for this search: a tab in a shared browser in tab mode, else a browser of its own"""
+        instrument_webdriver()
+        if Config.BROWSER_TABS_PER_BROWSER > 1:
+            from browser_pool import get_browser_pool
+            try:
+                self.tab = get_browser_pool().acquire(timeout=Config.SEARCH_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Failed to open a browser tab: {str(e)}")
+                return False
+            self.driver = self.tab
+            return True
+        return self.start_browser()
+
+    def start_browser(self, shared=False):
+        """
+        Set up Chrome WebDriver with appropriate options and fallback strategies.
+        shared: the browser serves the tab pool, whose tabs wait for page loads themselves
+        """
+        from selenium.webdriver.chrome.options import Options
+
         try:
             chrome_options = Options()
             chrome_options.add_argument("--headless")  # Run in headless mode
@@ -88,32 +228,79 @@ class DelhiHighCourtScraper:
             chrome_options.add_argument("--disable-web-security")
             chrome_options.add_argument("--allow-running-insecure-content")
             chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-            
-            # Try multiple strategies to initialize WebDriver
-            strategies = [
-                self._try_webdriver_manager,
-                self._try_system_chromedriver,
-                self._try_chrome_binary_path
-            ]
-            
-            for strategy in strategies:
-                try:
-                    if strategy(chrome_options):
-                        logger.info("Chrome WebDriver initialized successfully")
-                        return True
-                except Exception as e:
-                    logger.warning(f"Strategy failed: {str(e)}")
-                    continue
-            
-            logger.error("All WebDriver initialization strategies failed")
-            return False
+            if Config.BROWSER_TABS_PER_BROWSER > 1:
+                # Shared browsers run several searches at once; none of their tabs may be throttled as hidden
+                chrome_options.add_argument("--disable-background-timer-throttling")
+                chrome_options.add_argument("--disable-renderer-backgrounding")
+                chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+            profile = get_lean_profile()
+            self.cache_slot = profile.apply_options(chrome_options, local=self.endpoint_pool is None)
+            if shared:
+                # Navigations return at once, so no tab holds the browser while its page loads
+                chrome_options.page_load_strategy = 'none'
+            
+            if self.endpoint_pool is not None:
+                started = self._try_remote_webdriver(chrome_options)
+            else:
+                started = self._start_local_driver(chrome_options)
+
+            if started:
+                profile.apply_session(self.driver)
+            else:
+                profile.release(self.cache_slot)
+                self.cache_slot = None
+            return started
             
         except Exception as e:
             logger.error(f"Failed to initialize WebDriver: {str(e)}")
             return False
     
+    def _start_local_driver(self, chrome_options):
+        """Try multiple strategies to initialize a local WebDriver"""
+        strategies = [
+            self._try_webdriver_manager,
+            self._try_system_chromedriver,
+            self._try_chrome_binary_path
+        ]
+        
+        for strategy in strategies:
+            try:
+                if strategy(chrome_options):
+                    logger.info("Chrome WebDriver initialized successfully")
+                    return True
+            except Exception as e:
+                logger.warning(f"Strategy failed: {str(e)}")
+                continue
+        
+        logger.error("All WebDriver initialization strategies failed")
+        return False
+
+    def _try_remote_webdriver(self, chrome_options):
+        """Start a session on a remote WebDriver endpoint, failing over across the pool"""
+        from selenium import webdriver
+
+        try:
+            self.remote_endpoint, self.driver = self.endpoint_pool.connect(
+                lambda url: webdriver.Remote(command_executor=url, options=chrome_options)
+            )
+            logger.info(f"Remote WebDriver session started on {self.remote_endpoint}")
+            return True
+        except Exception as e:
+            logger.warning(f"Remote WebDriver strategy failed: {str(e)}")
+            return False
+
     def _try_webdriver_manager(self, chrome_options):
         """Try using webdriver-manager to get ChromeDriver"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        if _chromedriver_path is not None:
+            try:
+                self.driver = webdriver.Chrome(service=Service(_chromedriver_path), options=chrome_options)
+                return True
+            except Exception as e:
+                logger.warning(f"Pre-resolved ChromeDriver failed, re-resolving: {str(e)}")
+
         try:
             # Clear any existing ChromeDriver cache
             import shutil
@@ -146,6 +333,9 @@ class DelhiHighCourtScraper:
     
     def _try_system_chromedriver(self, chrome_options):
         """Try using system-installed ChromeDriver"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
         try:
             # Try common ChromeDriver paths
             chromedriver_paths = [
@@ -197,6 +387,10 @@ class DelhiHighCourtScraper:
     
     def _try_chrome_binary_path(self, chrome_options):
         """Try with explicit Chrome binary path"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         try:
             # Try common Chrome binary paths on Windows
             chrome_paths = [
@@ -220,60 +414,113 @@ class DelhiHighCourtScraper:
             return False
     
     def close_driver(self):
-        """Close the WebDriver"""
+        """Close the WebDriver, or hand a leased tab back to the shared browser pool"""
+        if self.tab is not None:
+            from browser_pool import get_browser_pool
+            tab, self.tab, self.driver = self.tab, None, None
+            get_browser_pool().release(tab)
+            return
         if self.driver:
-            self.driver.quit()
-            self.driver = None
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+                if self.remote_endpoint:
+                    self.endpoint_pool.release(self.remote_endpoint)
+                    self.remote_endpoint = None
+                if self.cache_slot:
+                    get_lean_profile().release(self.cache_slot)
+                    self.cache_slot = None
     
-    def search_case(self, case_type, case_number, filing_year):
+    def search_case(self, case_type, case_number, filing_year, progress=None):
         """
         Search for a case on Delhi High Court website
+        progress: optional callback(stage, **data) called as each stage completes
         Returns: dict with case details and orders
         """
+        self.progress = progress
         try:
             # Try WebDriver first
             if self.setup_driver():
+                self._report('driver_acquired', engine='webdriver', endpoint=self.remote_endpoint)
                 return self._search_with_webdriver(case_type, case_number, filing_year)
             else:
                 # Fallback to requests-based scraping
                 logger.info("WebDriver failed, trying requests-based scraping")
+                self._report('driver_acquired', engine='requests')
                 return self._search_with_requests(case_type, case_number, filing_year)
                 
         except Exception as e:
             logger.error(f"Error during case search: {str(e)}")
             return {"error": f"Search failed: {str(e)}"}
+        finally:
+            self.progress = None
+            if self.tab is not None:
+                self.close_driver()
+
+    def _report(self, stage, **data):
+        """Pass a completed stage to the caller's progress callback; never fails the search"""
+        if self.progress is None:
+            return
+        try:
+            self.progress(stage, **data)
+        except Exception as e:
+            logger.warning(f"Progress callback failed at {stage}: {str(e)}")
     
+    def _throttle(self):
+        """Wait for the shared rate limiter before each request to the court site"""
+        return self.rate_limiter.acquire(timeout=Config.SEARCH_TIMEOUT)
+
     def _search_with_webdriver(self, case_type, case_number, filing_year):
         """Search using WebDriver"""
         try:
             # Navigate to search page
+            if not self._throttle():
+                return {"error": THROTTLED_ERROR, "throttled": True}
             self.driver.get(self.search_url)
             time.sleep(3)  # Wait for page to load
+            self._report('page_loaded')
+            form_page = self._snapshot()
             
             # Check for CAPTCHA
-            if self._detect_captcha():
+            if self._detect_captcha(form_page):
+                self.rate_limiter.record_captcha()
                 return {"error": "CAPTCHA detected. Please try again later or use manual mode."}
             
-            # Fill search form
-            search_result = self._fill_search_form(case_type, case_number, filing_year)
+            # Fill search form (the submit is a second request to the site)
+            if not self._throttle():
+                return {"error": THROTTLED_ERROR, "throttled": True}
+            search_result = self._fill_search_form(form_page, case_type, case_number, filing_year)
             if not search_result:
                 return {"error": "Failed to fill search form"}
+            self._report('form_submitted')
             
-            # Extract case details
-            case_details = self._extract_case_details()
-            
-            # Extract orders
-            orders = self._extract_orders()
+            # One snapshot of the results; extraction never goes back to the browser
+            raw_html = self.driver.page_source
+            parsed = parse_snapshot(raw_html)
+            if parsed['captcha']:
+                self.rate_limiter.record_captcha()
+                return {"error": "CAPTCHA detected in response"}
+            if parsed.get('not_found'):
+                self.rate_limiter.record_success()
+                return {"error": NOT_FOUND_ERROR, "not_found": True}
+
+            case_details = parsed['case_details']
+            self._report('details_extracted', case_details=case_details)
+            orders = parsed['orders']
+            self._report('orders_extracted', orders=orders)
             
+            self.rate_limiter.record_success()
             return {
                 "success": True,
                 "case_details": case_details,
                 "orders": orders,
-                "raw_html": self.driver.page_source
+                "raw_html": snapshot_html(raw_html)
             }
             
         except Exception as e:
             logger.error(f"WebDriver search failed: {str(e)}")
+            self.rate_limiter.record_error()
             return {"error": f"WebDriver search failed: {str(e)}"}
         
         finally:
@@ -283,20 +530,18 @@ class DelhiHighCourtScraper:
         """Fallback search using requests library"""
         try:
             # Get the search page first
+            if not self._throttle():
+                return {"error": THROTTLED_ERROR, "throttled": True}
             response = self.session.get(self.search_url, timeout=10)
             response.raise_for_status()
+            self._report('page_loaded')
             
             # Parse the page to get any required tokens
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+            parser = get_parsing_service()
+            form_page = parser.parse(response.text, kind='form')
+
             # Look for CSRF tokens or other required form data
-            csrf_token = ""
-            try:
-                csrf_input = soup.find('input', {'name': 'csrf_token'})
-                if csrf_input:
-                    csrf_token = csrf_input.get('value', '')
-            except:
-                pass
+            csrf_token = form_page.get('csrf_token', '')
             
             # Prepare form data
             form_data = {
@@ -307,6 +552,8 @@ class DelhiHighCourtScraper:
             }
             
             # Submit the search form
+            if not self._throttle():
+                return {"error": THROTTLED_ERROR, "throttled": True}
             search_response = self.session.post(
                 self.search_url,
                 data=form_data,
@@ -314,303 +561,286 @@ class DelhiHighCourtScraper:
                 allow_redirects=True
             )
             search_response.raise_for_status()
+            self._report('form_submitted')
             
-            # Parse the results
-            result_soup = BeautifulSoup(search_response.text, 'html.parser')
+            # Parse the results off the request thread
+            parsed = parser.parse(search_response.text, kind='results')
+            if parsed.get('error'):
+                return {"error": parsed['error']}
             
             # Check for CAPTCHA in response
-            if self._detect_captcha_in_html(search_response.text):
+            if parsed['captcha']:
+                self.rate_limiter.record_captcha()
                 return {"error": "CAPTCHA detected in response"}
+            if parsed.get('not_found'):
+                self.rate_limiter.record_success()
+                return {"error": NOT_FOUND_ERROR, "not_found": True}
             
             # Extract case details from HTML
-            case_details = self._extract_case_details_from_html(result_soup)
-            orders = self._extract_orders_from_html(result_soup)
+            case_details = parsed['case_details']
+            self._report('details_extracted', case_details=case_details)
+            orders = parsed['orders']
+            self._report('orders_extracted', orders=orders)
             
+            self.rate_limiter.record_success()
             return {
                 "success": True,
                 "case_details": case_details,
                 "orders": orders,
-                "raw_html": search_response.text
+                "raw_html": snapshot_html(search_response.text)
             }
             
         except Exception as e:
             logger.error(f"Requests-based search failed: {str(e)}")
+            self.rate_limiter.record_error()
             return {"error": f"Requests-based search failed: {str(e)}"}
     
-    def _detect_captcha(self):
-        """Detect if CAPTCHA is present on the page"""
+    def _snapshot(self):
+        """Parse the current page_source: one WebDriver round-trip, then everything else is offline"""
+        return load_html(self.driver.page_source)
+
+    @staticmethod
+    def _detect_captcha(tree):
+        """Detect if CAPTCHA is present in a page snapshot"""
+        if _first_match(tree, CAPTCHA_XPATHS):
+            logger.warning("CAPTCHA detected on page")
+            return True
+        return False
+
+    @staticmethod
+    def _detect_not_found(html, tree=None):
+        """True if the court answered with its no-such-case message instead of a case"""
+        if not html or not NOT_FOUND_PATTERN.search(html):
+            return False  # cheap check on the raw markup first
+        tree = load_html(html) if tree is None else tree
+        if _first_text(tree, TITLE_XPATHS):
+            return False  # a case whose orders list is empty can say "no records found" too
+        return NOT_FOUND_PATTERN.search(' '.join(_xpath(VISIBLE_TEXT_XPATH)(tree))) is not None
+
+    def _fill_search_form(self, form_page, case_type, case_number, filing_year):
+        """
+        Fill and submit the search form. Selectors are resolved against the
+        form_page snapshot, so the browser only sees one lookup per field.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         try:
-            captcha_indicators = [
-                "//input[@name='captcha']",
-                "//img[contains(@src, 'captcha')]",
-                "//div[contains(text(), 'CAPTCHA')]",
-                "//div[contains(text(), 'captcha')]"
-            ]
-            
-            for indicator in captcha_indicators:
-                try:
-                    element = self.driver.find_element(By.XPATH, indicator)
-                    if element:
-                        logger.warning("CAPTCHA detected on page")
-                        return True
-                except NoSuchElementException:
+            if _first_match(form_page, SUBMIT_XPATHS) is None:
+                # Form not rendered yet: wait for it once, then take a fresh snapshot
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, ' | '.join(SUBMIT_XPATHS))))
+                form_page = self._snapshot()
+
+            for field, value in (('case_type', case_type), ('case_number', case_number),
+                                 ('filing_year', str(filing_year))):
+                selector = _first_match(form_page, FORM_FIELD_XPATHS[field])
+                if selector is None:
+                    logger.warning(f"Search form field {field} not found")
                     continue
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error detecting CAPTCHA: {str(e)}")
-            return False
-    
-    def _fill_search_form(self, case_type, case_number, filing_year):
-        """Fill the search form with case details"""
-        try:
-            # Wait for form elements to load
-            wait = WebDriverWait(self.driver, 10)
-            
-            # Find and fill case type dropdown
-            try:
-                case_type_select = wait.until(EC.presence_of_element_located((By.NAME, "case_type")))
-                case_type_select.send_keys(case_type)
-            except:
-                logger.warning("Case type dropdown not found, trying alternative selectors")
-                # Try alternative selectors
-                selectors = [
-                    "//select[@name='case_type']",
-                    "//select[contains(@id, 'case_type')]",
-                    "//input[@name='case_type']"
-                ]
-                for selector in selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        element.send_keys(case_type)
-                        break
-                    except NoSuchElementException:
-                        continue
-            
-            # Find and fill case number
-            try:
-                case_number_input = wait.until(EC.presence_of_element_located((By.NAME, "case_number")))
-                case_number_input.clear()
-                case_number_input.send_keys(case_number)
-            except:
-                logger.warning("Case number input not found, trying alternative selectors")
-                # Try alternative selectors
-                selectors = [
-                    "//input[@name='case_number']",
-                    "//input[contains(@id, 'case_number')]",
-                    "//input[contains(@placeholder, 'case')]"
-                ]
-                for selector in selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        element.clear()
-                        element.send_keys(case_number)
-                        break
-                    except NoSuchElementException:
-                        continue
-            
-            # Find and fill filing year
-            try:
-                filing_year_input = wait.until(EC.presence_of_element_located((By.NAME, "filing_year")))
-                filing_year_input.clear()
-                filing_year_input.send_keys(str(filing_year))
-            except:
-                logger.warning("Filing year input not found, trying alternative selectors")
-                # Try alternative selectors
-                selectors = [
-                    "//input[@name='filing_year']",
-                    "//input[contains(@id, 'filing_year')]",
-                    "//input[contains(@placeholder, 'year')]"
-                ]
-                for selector in selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        element.clear()
-                        element.send_keys(str(filing_year))
-                        break
-                    except NoSuchElementException:
-                        continue
-            
-            # Submit the form
-            try:
-                submit_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']")))
-                submit_button.click()
-                time.sleep(3)  # Wait for results
-                return True
-            except:
-                logger.warning("Submit button not found, trying alternative selectors")
-                # Try alternative selectors
-                selectors = [
-                    "//input[@type='submit']",
-                    "//button[contains(text(), 'Search')]",
-                    "//button[contains(text(), 'Submit')]"
-                ]
-                for selector in selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        element.click()
-                        time.sleep(3)
-                        return True
-                    except NoSuchElementException:
-                        continue
-            
-            return False
-            
+                element = self.driver.find_element(By.XPATH, selector)
+                if field != 'case_type':  # a select has nothing to clear
+                    element.clear()
+                element.send_keys(value)
+
+            submit = _first_match(form_page, SUBMIT_XPATHS)
+            if submit is None:
+                logger.warning("Submit button not found")
+                return False
+            button = self.driver.find_element(By.XPATH, submit)
+            if self.tab is not None:
+                # Shared browser: wait for the results page without holding the browser
+                if not self.tab.navigate(button.click):
+                    logger.warning("Results page did not finish loading")
+            else:
+                button.click()
+            time.sleep(3)  # Wait for results
+            return True
+
         except Exception as e:
             logger.error(f"Error filling search form: {str(e)}")
             return False
-    
-    def _extract_case_details(self):
-        """Extract case details from the search results page"""
-        try:
-            case_details = {
-                "case_title": f"Sample Case - {datetime.now().strftime('%Y')}",
-                "petitioner": "Sample Petitioner",
-                "respondent": "Sample Respondent",
-                "filing_date": "15/01/2023",
-                "next_hearing": "20/02/2024",
-                "case_status": "Pending"
-            }
-            
-            # Try to extract real data from the page
-            try:
-                # Look for case title
-                title_selectors = [
-                    "//h1[contains(@class, 'case-title')]",
-                    "//h2[contains(@class, 'case-title')]",
-                    "//div[contains(@class, 'case-title')]",
-                    "//span[contains(@class, 'case-title')]"
-                ]
-                
-                for selector in title_selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        if element.text.strip():
-                            case_details["case_title"] = element.text.strip()
-                            break
-                    except NoSuchElementException:
-                        continue
-                
-                # Look for petitioner/respondent
-                petitioner_selectors = [
-                    "//td[contains(text(), 'Petitioner')]/following-sibling::td",
-                    "//div[contains(text(), 'Petitioner')]/following-sibling::div",
-                    "//span[contains(text(), 'Petitioner')]/following-sibling::span"
-                ]
-                
-                for selector in petitioner_selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        if element.text.strip():
-                            case_details["petitioner"] = element.text.strip()
-                            break
-                    except NoSuchElementException:
-                        continue
-                
-                # Look for respondent
-                respondent_selectors = [
-                    "//td[contains(text(), 'Respondent')]/following-sibling::td",
-                    "//div[contains(text(), 'Respondent')]/following-sibling::div",
-                    "//span[contains(text(), 'Respondent')]/following-sibling::span"
-                ]
-                
-                for selector in respondent_selectors:
-                    try:
-                        element = self.driver.find_element(By.XPATH, selector)
-                        if element.text.strip():
-                            case_details["respondent"] = element.text.strip()
-                            break
-                    except NoSuchElementException:
-                        continue
-                
-            except Exception as e:
-                logger.warning(f"Error extracting case details: {e}")
-            
-            return case_details
-            
-        except Exception as e:
-            logger.error(f"Error extracting case details: {str(e)}")
-            return {
-                "case_title": f"Sample Case - {datetime.now().strftime('%Y')}",
-                "petitioner": "Sample Petitioner",
-                "respondent": "Sample Respondent",
-                "filing_date": "15/01/2023",
-                "next_hearing": "20/02/2024",
-                "case_status": "Pending"
-            }
-    
-    def _extract_orders(self):
-        """Extract orders from the search results page"""
-        try:
-            orders = []
-            
-            # Try to extract real orders from the page
-            try:
-                # Look for order elements
-                order_selectors = [
-                    "//tr[contains(@class, 'order')]",
-                    "//div[contains(@class, 'order')]",
-                    "//table//tr[position()>1]"  # Skip header row
-                ]
-                
-                for selector in order_selectors:
-                    try:
-                        elements = self.driver.find_elements(By.XPATH, selector)
-                        for i, element in enumerate(elements[:5]):  # Limit to 5 orders
-                            try:
-                                # Extract order details
-                                order = {
-                                    "order_date": f"{(datetime.now() - timedelta(days=i*30)).strftime('%d/%m/%Y')}",
-                                    "order_type": "Order" if i % 2 == 0 else "Judgment",
-                                    "order_title": f"Order {i+1}",
-                                    "order_description": element.text.strip()[:100] + "..." if len(element.text.strip()) > 100 else element.text.strip(),
-                                    "pdf_url": f"https://example.com/order_{i+1}.pdf"
-                                }
-                                orders.append(order)
-                            except Exception as e:
-                                logger.warning(f"Error extracting individual order: {e}")
-                                continue
-                        break  # If we found orders with this selector, stop trying others
-                    except NoSuchElementException:
-                        continue
-                
-            except Exception as e:
-                logger.warning(f"Error extracting orders from page: {e}")
-            
-            # If no orders found, return mock data
-            if not orders:
-                orders = [
-                    {
-                        "order_date": "15/01/2023",
-                        "order_type": "Order",
-                        "order_title": "Initial Order",
-                        "order_description": "Case admitted for hearing",
-                        "pdf_url": "https://example.com/order1.pdf"
-                    },
-                    {
-                        "order_date": "20/02/2024",
-                        "order_type": "Judgment",
-                        "order_title": "Final Judgment",
-                        "order_description": "Case disposed of",
-                        "pdf_url": "https://example.com/judgment1.pdf"
-                    }
-                ]
-            
-            return orders
-            
-        except Exception as e:
-            logger.error(f"Error extracting orders: {str(e)}")
-            return [
+
+    @staticmethod
+    def _extract_case_details(tree):
+        """Extract case details from a results page snapshot"""
+        case_details = {
+            "case_title": f"Sample Case - {datetime.now().strftime('%Y')}",
+            "petitioner": "Sample Petitioner",
+            "respondent": "Sample Respondent",
+            "filing_date": "15/01/2023",
+            "next_hearing": "20/02/2024",
+            "case_status": "Pending"
+        }
+
+        for key, xpaths in (('case_title', TITLE_XPATHS), ('petitioner', PETITIONER_XPATHS),
+                            ('respondent', RESPONDENT_XPATHS)):
+            text = _first_text(tree, xpaths)
+            if text:
+                case_details[key] = text
+
+        return case_details
+
+    @staticmethod
+    def _extract_orders(tree):
+        """Extract orders from a results page snapshot"""
+        rows = []
+        for selector in ORDER_XPATHS:
+            rows = _xpath(selector)(tree)
+            if rows:
+                break
+
+        orders = []
+        for i, row in enumerate(rows[:5]):  # Limit to 5 orders
+            text = _node_text(row)
+            date_match = DATE_PATTERN.search(text)
+            links = _xpath('.//a/@href')(row)
+            orders.append({
+                "order_date": date_match.group(1) if date_match else (datetime.now() - timedelta(days=i*30)).strftime('%d/%m/%Y'),
+                "order_type": "Judgment" if 'judgment' in text.lower() else "Order",
+                "order_title": f"Order {i+1}",
+                "order_description": text[:100] + "..." if len(text) > 100 else text,
+                "pdf_url": links[0] if links else ""
+            })
+
+        # If no orders found, return mock data
+        if not orders:
+            orders = [
                 {
                     "order_date": "15/01/2023",
                     "order_type": "Order",
                     "order_title": "Initial Order",
                     "order_description": "Case admitted for hearing",
                     "pdf_url": "https://example.com/order1.pdf"
+                },
+                {
+                    "order_date": "20/02/2024",
+                    "order_type": "Judgment",
+                    "order_title": "Final Judgment",
+                    "order_description": "Case disposed of",
+                    "pdf_url": "https://example.com/judgment1.pdf"
                 }
             ]
 
+        return orders
+
+    @staticmethod
+    def _extract_csrf_token(soup):
+        """Return the CSRF token embedded in the search form, if any"""
+        try:
+            csrf_input = soup.find('input', {'name': 'csrf_token'})
+            if csrf_input:
+                return csrf_input.get('value', '')
+        except Exception:
+            pass
+        return ""
+
+    @staticmethod
+    def _detect_captcha_in_html(html):
+        """Detect CAPTCHA markers in raw HTML (requests/async paths)"""
+        lowered = (html or '').lower()
+        return (
+            'name="captcha"' in lowered
+            or "name='captcha'" in lowered
+            or re.search(r'<img[^>]+src="[^"]*captcha', lowered) is not None
+        )
+
+    @staticmethod
+    def _extract_case_details_from_html(soup):
+        """Extract case details from parsed HTML, mirroring _extract_case_details"""
+        case_details = {
+            "case_title": f"Sample Case - {datetime.now().strftime('%Y')}",
+            "petitioner": "Sample Petitioner",
+            "respondent": "Sample Respondent",
+            "filing_date": "15/01/2023",
+            "next_hearing": "20/02/2024",
+            "case_status": "Pending"
+        }
+
+        try:
+            title = soup.find(['h1', 'h2', 'div', 'span'], class_=lambda c: c and 'case-title' in c)
+            if title and title.get_text(strip=True):
+                case_details["case_title"] = title.get_text(strip=True)
+
+            for label, key in (('Petitioner', 'petitioner'), ('Respondent', 'respondent')):
+                for tag in ('td', 'div', 'span'):
+                    cell = soup.find(tag, string=lambda s: s and label in s)
+                    sibling = cell.find_next_sibling(tag) if cell else None
+                    if sibling and sibling.get_text(strip=True):
+                        case_details[key] = sibling.get_text(strip=True)
+                        break
+        except Exception as e:
+            logger.warning(f"Error extracting case details from HTML: {e}")
+
+        return case_details
+
+    @staticmethod
+    def _extract_orders_from_html(soup):
+        """Extract orders from parsed HTML, mirroring _extract_orders"""
+        orders = []
+        try:
+            rows = soup.find_all('tr', class_=lambda c: c and 'order' in c)
+            if not rows:
+                rows = soup.find_all('div', class_=lambda c: c and 'order' in c)
+            if not rows:
+                rows = [row for table in soup.find_all('table') for row in table.find_all('tr')[1:]]
+
+            for i, row in enumerate(rows[:5]):  # Limit to 5 orders
+                text = row.get_text(' ', strip=True)
+                date_match = DATE_PATTERN.search(text)
+                link = row.find('a', href=True)
+                orders.append({
+                    "order_date": date_match.group(1) if date_match else (datetime.now() - timedelta(days=i*30)).strftime('%d/%m/%Y'),
+                    "order_type": "Judgment" if 'judgment' in text.lower() else "Order",
+                    "order_title": f"Order {i+1}",
+                    "order_description": text[:100] + "..." if len(text) > 100 else text,
+                    "pdf_url": link['href'] if link else ""
+                })
+        except Exception as e:
+            logger.warning(f"Error extracting orders from HTML: {e}")
+
+        return orders
+
+def parse_form_page(html):
+    """Parse the search form page into a plain dict (safe to run in a worker process)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return {"csrf_token": DelhiHighCourtScraper._extract_csrf_token(soup)}
+
+def parse_search_results(html):
+    """Parse a search results page into a plain dict (safe to run in a worker process)"""
+    from bs4 import BeautifulSoup
+    if DelhiHighCourtScraper._detect_captcha_in_html(html):
+        return {"captcha": True}
+    if DelhiHighCourtScraper._detect_not_found(html):
+        return {"captcha": False, "not_found": True}
+
+    soup = BeautifulSoup(html, 'html.parser')
+    return {
+        "captcha": False,
+        "case_details": DelhiHighCourtScraper._extract_case_details_from_html(soup),
+        "orders": DelhiHighCourtScraper._extract_orders_from_html(soup)
+    }
+
+def parse_snapshot(html):
+    """Parse a WebDriver results snapshot with lxml into a plain dict"""
+    tree = load_html(html)
+    if DelhiHighCourtScraper._detect_captcha(tree):
+        return {"captcha": True}
+    if DelhiHighCourtScraper._detect_not_found(html, tree):
+        return {"captcha": False, "not_found": True}
+    return {
+        "captcha": False,
+        "case_details": DelhiHighCourtScraper._extract_case_details(tree),
+        "orders": DelhiHighCourtScraper._extract_orders(tree)
+    }
+
+def get_parsing_service():
+    """Return the shared HTML parsing service (imported lazily to avoid a cycle)"""
+    from parse_pool import get_parsing_service as _get_parsing_service
+    return _get_parsing_service()
+
 def get_mock_case_data(case_type, case_number, filing_year):
     """Return mock case data for development and testing"""
     return {
@@ -0,0 +1,22 @@
+// Auto-hide flash messages after 5 seconds; page alerts (notices, live search errors) stay
+setTimeout(function() {
+    const alerts = document.querySelectorAll('.alert[data-autodismiss]');
+    alerts.forEach(function(alert) {
+        const bsAlert = new bootstrap.Alert(alert);
+        bsAlert.close();
+    });
+}, 5000);
+
+// Show loading spinner on form submission
+document.addEventListener('DOMContentLoaded', function() {
+    const forms = document.querySelectorAll('form');
+    forms.forEach(function(form) {
+        form.addEventListener('submit', function() {
+            const submitBtn = form.querySelector('button[type="submit"]');
+            if (submitBtn) {
+                submitBtn.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>Searching...';
+                submitBtn.disabled = true;
+            }
+        });
+    });
+});
@@ -1,9 +1,17 @@
+import asyncio
+import tempfile
 import unittest
 import os
-from datetime import date
+import json
+from datetime import date, datetime, timedelta
+
+# Fresh outbound rate-limit bucket per run; the default state file is shared with local dev runs
+os.environ.setdefault('RATE_LIMIT_STATE_PATH', os.path.join(tempfile.mkdtemp(), 'rate_limit.db'))
+
 from app import create_app
-from models import db, CaseQuery, CaseDetail, CourtOrder
+from models import db, CaseQuery, CaseDetail, CourtOrder, SearchLog, SearchLogRollup
 from scraper import get_mock_case_data
+from results import CaseResult
 
 class CourtDataFetcherTestCase(unittest.TestCase):
     """Test cases for Court Data Fetcher application"""
@@ -151,5 +159,2619 @@ class CourtDataFetcherTestCase(unittest.TestCase):
         self.assertGreater(len(Config.CASE_TYPES), 0)
         self.assertIn('W.P.(C)', Config.CASE_TYPES)
 
+class ConditionalGetTestCase(unittest.TestCase):
+    """Test ETag/Last-Modified handling and the rendered-response cache"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _add_case(self, number):
+        with self.app.app_context():
+            case_query = CaseQuery(case_type='W.P.(C)', case_number=number, filing_year=2023, status='success')
+            db.session.add(case_query)
+            db.session.commit()
+            db.session.add(CaseDetail(query_id=case_query.id, case_title=f'Case {number}'))
+            db.session.commit()
+            return case_query.id
+
+    def test_api_cases_not_modified(self):
+        self._add_case('1')
+        first = self.client.get('/api/cases')
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+
+        repeat = self.client.get('/api/cases', headers={'If-None-Match': etag})
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.data, b'')
+
+        self._add_case('2')
+        changed = self.client.get('/api/cases', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertEqual(len(changed.get_json()['cases']), 2)
+
+    def test_stats_etag_changes_when_a_search_finishes(self):
+        with self.app.app_context():
+            search_log = SearchLog(ip_address='127.0.0.1', search_params='{}')
+            db.session.add(search_log)
+            db.session.commit()
+            log_id = search_log.id
+        etag = self.client.get('/stats').headers['ETag']
+        self.assertEqual(self.client.get('/stats', headers={'If-None-Match': etag}).status_code, 304)
+
+        # Searches are logged first and marked successful (with their timing) once they finish
+        with self.app.app_context():
+            search_log = db.session.get(SearchLog, log_id)
+            search_log.success = True
+            search_log.response_time = 1.5
+            db.session.commit()
+        changed = self.client.get('/stats', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+
+    def test_stats_revalidation_runs_no_queries(self):
+        from sqlalchemy import event
+        etag = self.client.get('/stats').headers['ETag']
+        statements = []
+        with self.app.app_context():
+            engine = db.engine
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get('/stats', headers={'If-None-Match': etag})
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(statements, [])
+
+    def test_stats_validators_follow_breaker_state(self):
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60, half_open_max_calls=1)
+        with mock.patch('circuit_breaker._breaker', breaker):
+            etag = self.client.get('/stats').headers['ETag']
+            breaker.record_failure('timeout')
+            counted = self.client.get('/stats', headers={'If-None-Match': etag})
+            self.assertEqual(counted.status_code, 200)
+            breaker.record_failure('timeout')
+            opened = self.client.get('/stats', headers={'If-None-Match': counted.headers['ETag']})
+            self.assertEqual(opened.status_code, 200)
+            self.assertIn(b'retrying after', opened.data)
+            # The open-circuit page is stable until the breaker moves again
+            self.assertEqual(self.client.get('/stats', headers={'If-None-Match': opened.headers['ETag']}).status_code, 304)
+
+    def test_bulk_writes_bump_the_data_version(self):
+        from http_cache import data_version
+        self._add_case('9')
+        before, _ = data_version.current()
+        with self.app.app_context():
+            CaseQuery.query.filter_by(case_number='9').delete(synchronize_session=False)
+            db.session.commit()
+        self.assertNotEqual(data_version.current()[0], before)
+
+    def test_case_results_page_and_cache_invalidation(self):
+        from http_cache import response_cache
+        query_id = self._add_case('7')
+        response = self.client.get(f'/cases/{query_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Case 7', response.data)
+        self.assertIn('Last-Modified', response.headers)
+        self.assertGreater(len(response_cache), 0)
+
+        self._add_case('8')
+        self.assertEqual(len(response_cache), 0)
+        self.assertEqual(self.client.get('/cases/9999').status_code, 404)
+
+class OrderPaginationTestCase(unittest.TestCase):
+    """Test the keyset-paginated orders sub-resource"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            case_query = CaseQuery(case_type='W.P.(C)', case_number='42', filing_year=2023, status='success')
+            db.session.add(case_query)
+            db.session.commit()
+            details = CaseDetail(query_id=case_query.id, case_title='Paged Case')
+            db.session.add(details)
+            db.session.commit()
+            # 45 orders over 15 days, three per day, so pages split inside a day
+            db.session.add_all([
+                CourtOrder(case_detail_id=details.id, order_date=date(2023, 1, 1) + timedelta(days=n // 3),
+                           order_type='Judgment' if n % 5 == 0 else 'Order', order_title=f'Order {n}',
+                           pdf_url=f'https://example.test/{n}.pdf' if n % 2 else None)
+                for n in range(45)
+            ])
+            db.session.commit()
+            self.query_id = case_query.id
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _walk(self, **params):
+        titles, url = [], f'/api/cases/{self.query_id}/orders'
+        response = self.client.get(url, query_string=params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            titles += [order['order_title'] for order in data['orders']]
+            if not data['next_url']:
+                return titles
+            response = self.client.get(data['next_url'])
+
+    def test_pages_cover_every_order_once_newest_first(self):
+        first = self.client.get(f'/api/cases/{self.query_id}/orders?limit=10').get_json()
+        self.assertEqual(len(first['orders']), 10)
+        self.assertEqual(first['orders'][0]['order_title'], 'Order 44')
+        self.assertEqual(first['orders'][0]['order_date'], '15/01/2023')
+        self.assertIsNotNone(first['next_cursor'])
+        pdf_orders = [order for order in first['orders'] if order['pdf_url']]
+        self.assertTrue(all(order['download_url'] == f"/download_pdf/{order['id']}" for order in pdf_orders))
+
+        titles = self._walk(limit=10)
+        self.assertEqual(titles, [f'Order {n}' for n in reversed(range(45))])
+        self.assertEqual(self._walk(limit=7, direction='asc'), [f'Order {n}' for n in range(45)])
+
+    def test_filters(self):
+        judgments = self._walk(limit=4, order_type='Judgment')
+        self.assertEqual(judgments, [f'Order {n}' for n in reversed(range(0, 45, 5))])
+        # 05/01 to 06/01 holds orders 12-17
+        ranged = self._walk(limit=4, **{'from': '2023-01-05', 'to': '2023-01-06'})
+        self.assertEqual(ranged, [f'Order {n}' for n in reversed(range(12, 18))])
+
+    def test_invalid_parameters(self):
+        url = f'/api/cases/{self.query_id}/orders'
+        self.assertEqual(self.client.get(url + '?cursor=not-a-cursor').status_code, 400)
+        self.assertEqual(self.client.get(url + '?from=05/01/2023').status_code, 400)
+        self.assertEqual(self.client.get(url + '?direction=sideways').status_code, 400)
+        self.assertEqual(self.client.get('/api/cases/9999/orders').status_code, 404)
+        self.assertEqual(len(self.client.get(url + '?limit=100000').get_json()['orders']), 45)
+
+    def test_not_modified(self):
+        url = f'/api/cases/{self.query_id}/orders'
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_keyset_query_uses_composite_index(self):
+        from orders import build_orders_query
+        with self.app.app_context():
+            details_id = db.session.get(CaseQuery, self.query_id).case_details.id
+            for descending in (True, False):
+                stmt = build_orders_query(details_id, after=(date(2023, 1, 8), 20), descending=descending).limit(11)
+                compiled = stmt.compile(db.engine, compile_kwargs={'literal_binds': True})
+                plan = ' '.join(str(row[-1]) for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}')))
+                self.assertIn('ix_court_order_case_date_id', plan)
+                self.assertNotIn('TEMP B-TREE', plan)  # rows come out of the index in page order
+
+    def test_results_page_renders_first_page(self):
+        from config import Config
+        response = self.client.get(f'/cases/{self.query_id}')
+        self.assertEqual(response.status_code, 200)
+        html = response.get_data(as_text=True)
+        self.assertIn('id="orderCount">45<', html)
+        self.assertEqual(html.count('<strong>Order '), Config.ORDERS_PAGE_SIZE)
+        self.assertIn(f'data-next-url="/api/cases/{self.query_id}/orders?cursor=', html)
+
+class ChangeFeedTestCase(unittest.TestCase):
+    """Test the /api/changes feed and the change log behind it"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _store(self, number, orders=2):
+        from persistence import save_case_details
+        with self.app.app_context():
+            case_query = CaseQuery(case_type='W.P.(C)', case_number=number, filing_year=2023, status='success')
+            db.session.add(case_query)
+            db.session.flush()
+            save_case_details(case_query, self._result(number, orders))
+            db.session.commit()
+            return case_query.id
+
+    def _result(self, number, orders):
+        return CaseResult.from_scraper({
+            'case_details': {'case_title': f'Case {number}', 'filing_date': '15/01/2023'},
+            'orders': [{'order_title': f'Order {n}', 'order_date': '01/02/2023'} for n in range(orders)],
+        })
+
+    def _sync(self, cursor=None, **params):
+        if cursor:
+            params['since'] = cursor
+        response = self.client.get('/api/changes', query_string=params)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_initial_sync_and_incremental_updates(self):
+        from persistence import refresh_case_details
+        query_id = self._store('1')
+        first = self._sync()
+        self.assertFalse(first['has_more'])
+        self.assertEqual(sorted(change['entity'] for change in first['changes']),
+                         ['case_detail', 'case_query', 'court_order', 'court_order'])
+        detail = next(change for change in first['changes'] if change['entity'] == 'case_detail')
+        self.assertEqual(detail['record']['case_title'], 'Case 1')
+        self.assertEqual(detail['record']['filing_date'], '2023-01-15')
+        self.assertNotIn('raw_response', detail['record'])
+
+        # Nothing new: empty page, same resume point
+        idle = self._sync(first['next_cursor'])
+        self.assertEqual(idle['changes'], [])
+        self.assertEqual(idle['next_cursor'], first['next_cursor'])
+
+        with self.app.app_context():
+            old_orders = [order.id for order in CourtOrder.query.all()]
+            case_query = db.session.get(CaseQuery, query_id)
+            refresh_case_details(case_query, self._result('1b', 1))
+            db.session.commit()
+            new_orders = [order.id for order in CourtOrder.query.all()]
+        self._store('2', orders=0)
+
+        delta = self._sync(first['next_cursor'])
+        operations = {(change['entity'], change['id']): change['operation'] for change in delta['changes']}
+        # SQLite may hand a deleted order's id to a new order; the feed then reports the new record
+        for order_id in set(old_orders) - set(new_orders):
+            self.assertEqual(operations[('court_order', order_id)], 'delete')
+        for order_id in new_orders:
+            self.assertEqual(operations[('court_order', order_id)], 'upsert')
+        self.assertEqual(operations[('case_detail', 1)], 'upsert')
+        self.assertIn(('case_query', 2), operations)
+        sequences = [change['seq'] for change in delta['changes']]
+        self.assertEqual(sequences, sorted(sequences))
+
+    def test_paging_and_deletes(self):
+        for number in range(5):
+            self._store(str(number), orders=0)
+        with self.app.app_context():
+            db.session.delete(db.session.get(CaseDetail, 1))
+            db.session.commit()
+
+        seen, cursor, pages = {}, None, 0
+        while True:
+            page = self._sync(cursor, limit=3)
+            pages += 1
+            for change in page['changes']:
+                seen[(change['entity'], change['id'])] = change['operation']
+            cursor = page['next_cursor']
+            if not page['has_more']:
+                break
+        self.assertEqual(pages, 4)  # 10 inserts + 1 delete
+        self.assertEqual(seen[('case_detail', 1)], 'delete')
+        self.assertEqual(len(seen), 10)
+
+    def test_rolled_back_writes_leave_no_entries(self):
+        from models import ChangeLog
+        with self.app.app_context():
+            db.session.add(CaseQuery(case_type='W.P.(C)', case_number='9', filing_year=2023))
+            db.session.flush()
+            self.assertEqual(ChangeLog.query.count(), 1)
+            db.session.rollback()
+            self.assertEqual(ChangeLog.query.count(), 0)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/changes?since=bogus').status_code, 400)
+
+class ExportTestCase(unittest.TestCase):
+    """Test the streaming bulk export endpoint"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            for number, case_type in (('1', 'W.P.(C)'), ('2', 'LPA')):
+                case_query = CaseQuery(case_type=case_type, case_number=number, filing_year=2023)
+                db.session.add(case_query)
+                db.session.flush()
+                detail = CaseDetail(query_id=case_query.id, case_title=f'Case {number}', filing_date=date(2023, 1, 15))
+                db.session.add(detail)
+                db.session.flush()
+                for day in (1, 2):
+                    db.session.add(CourtOrder(case_detail_id=detail.id, order_date=date(2023, 6, day), order_type='Order'))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_csv_and_ndjson_exports(self):
+        import csv
+        import io
+        import json
+        response = self.client.get('/api/export?format=csv')
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['order_date'], '2023-06-01')
+
+        response = self.client.get('/api/export?format=ndjson&case_type=LPA&year=2023')
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual({record['case_type'] for record in records}, {'LPA'})
+        self.assertEqual(len(records), 2)
+
+        self.assertEqual(self.client.get('/api/export?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/api/export?from=yesterday').status_code, 400)
+
+    def test_malformed_year_is_rejected(self):
+        # Used to be dropped silently, streaming every year instead
+        response = self.client.get('/api/export?format=ndjson&year=20x4')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()['success'])
+
+    def test_parquet_export(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest('pyarrow not installed')
+        import io
+        response = self.client.get('/api/export?format=parquet')
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(response.data))
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(table.column('case_title').to_pylist()[0], 'Case 1')
+
+class RetentionTestCase(unittest.TestCase):
+    """Test SearchLog retention, archival and compaction"""
+
+    def setUp(self):
+        import tempfile
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.archive_dir = tempfile.mkdtemp()
+        with self.app.app_context():
+            db.create_all()
+            old = datetime.utcnow() - timedelta(days=200)
+            for i in range(5):
+                db.session.add(SearchLog(timestamp=old + timedelta(minutes=i), success=i != 0, response_time=1.0,
+                                         user_agent='Mozilla/5.0', search_params=json.dumps({'case_type': 'LPA'})))
+            db.session.add(SearchLog(timestamp=datetime.utcnow(), success=True))
+            db.session.commit()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_dry_run_changes_nothing(self):
+        from retention import run_retention
+        with self.app.app_context():
+            summary = run_retention(retention_days=90, archive_dir=self.archive_dir, dry_run=True)
+            self.assertEqual(summary['eligible'], 5)
+            self.assertEqual(SearchLog.query.count(), 6)
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+    def test_archive_rollup_and_delete(self):
+        import gzip
+        from retention import run_retention
+        with self.app.app_context():
+            summary = run_retention(retention_days=90, chunk_size=2, archive_dir=self.archive_dir)
+            self.assertEqual(summary['deleted'], 5)
+            self.assertEqual(len(summary['segments']), 3)
+            self.assertEqual(SearchLog.query.count(), 1)
+
+            rollup = SearchLogRollup.query.one()
+            self.assertEqual((rollup.case_type, rollup.total, rollup.successful), ('LPA', 5, 4))
+
+        archived = []
+        for name in sorted(os.listdir(self.archive_dir)):
+            with gzip.open(os.path.join(self.archive_dir, name), 'rt') as segment:
+                archived.extend(json.loads(line) for line in segment)
+        self.assertEqual([record['id'] for record in archived], [1, 2, 3, 4, 5])
+
+        # Rolled-up history still counts on the statistics page
+        response = self.app.test_client().get('/stats')
+        self.assertEqual(response.status_code, 200)
+
+    def test_incremental_vacuum(self):
+        from retention import enable_incremental_vacuum, incremental_vacuum
+        with self.app.app_context():
+            self.assertEqual(incremental_vacuum(), 0)
+            self.assertTrue(enable_incremental_vacuum())
+            db.session.execute(db.insert(SearchLog), [{'user_agent': 'x' * 400} for _ in range(2000)])
+            db.session.commit()
+            SearchLog.query.delete()
+            db.session.commit()
+            self.assertGreater(incremental_vacuum(), 0)
+
+    def test_scheduler_runs_jobs(self):
+        import threading
+        from scheduler import BackgroundScheduler
+        ran = threading.Event()
+        scheduler = BackgroundScheduler()
+        scheduler.add_job('probe', 60, ran.set, run_immediately=True)
+        scheduler.start()
+        try:
+            self.assertTrue(ran.wait(timeout=2))
+        finally:
+            scheduler.shutdown()
+
+class ReadOnlyModeTestCase(unittest.TestCase):
+    """Test the API-only startup mode"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        os.environ['APP_MODE'] = 'api'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        os.environ.pop('APP_MODE', None)
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_read_endpoints_served_and_search_refused(self):
+        self.assertEqual(self.client.get('/api/cases').status_code, 200)
+        self.assertEqual(self.client.get('/stats').status_code, 200)
+        response = self.client.post('/api/search', json={
+            'case_type': 'W.P.(C)', 'case_number': '1234', 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 503)
+
+    def test_browser_dependencies_not_imported_at_startup(self):
+        import subprocess
+        import sys
+        probe = ("import sys; from app import create_app; create_app(); "
+                 "print([m for m in ('selenium', 'webdriver_manager', 'bs4') if m in sys.modules])")
+        env = dict(os.environ, DATABASE_URL='sqlite:///:memory:')
+        output = subprocess.run([sys.executable, '-c', probe], env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip().splitlines()[-1], '[]')
+
+class AsyncScraperTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test the asyncio scraping engine against a local fixture server"""
+
+    RESULT_HTML = """
+        <html><body>
+        <h2 class="case-title">W.P.(C) 1234/2023 - A vs B</h2>
+        <table>
+            <tr><td>Petitioner</td><td>Alpha Ltd</td></tr>
+            <tr><td>Respondent</td><td>Union of India</td></tr>
+        </table>
+        <table>
+            <tr><th>Date</th><th>Order</th></tr>
+            <tr class="order-row"><td>10/06/2023</td><td><a href="/o1.pdf">Interim order</a></td></tr>
+        </table>
+        </body></html>
+    """
+
+    async def asyncSetUp(self):
+        from aiohttp import web
+        from aiohttp.test_utils import TestServer
+        self.post_count = 0
+
+        async def case_status_get(request):
+            await asyncio.sleep(float(request.query.get('delay', 0)))
+            return web.Response(text='<form><input name="csrf_token" value="tok123"></form>',
+                                content_type='text/html')
+
+        async def case_status_post(request):
+            form = await request.post()
+            self.post_count += 1
+            self.assertEqual(form['csrf_token'], 'tok123')
+            return web.Response(text=self.RESULT_HTML, content_type='text/html')
+
+        import tempfile
+        from rate_limiter import AdaptiveRateLimiter
+        self.limiter = AdaptiveRateLimiter(path=os.path.join(tempfile.mkdtemp(), 'rate.db'),
+                                           initial_rate=1000, max_rate=1000, burst=100)
+
+        web_app = web.Application()
+        web_app.router.add_get('/case-status', case_status_get)
+        web_app.router.add_post('/case-status', case_status_post)
+        self.server = TestServer(web_app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def test_search_case_parses_results(self):
+        from async_scraper import AsyncDelhiHighCourtScraper
+        async with AsyncDelhiHighCourtScraper(max_per_host=2) as scraper:
+            scraper.search_url = str(self.server.make_url('/case-status'))
+            scraper.rate_limiter = self.limiter
+            results = await scraper.search_many([('W.P.(C)', str(n), 2023) for n in range(5)])
+
+        self.assertEqual(self.post_count, 5)
+        for result in results:
+            self.assertTrue(result['success'])
+            self.assertEqual(result['case_details']['petitioner'], 'Alpha Ltd')
+            self.assertEqual(result['orders'][0]['order_date'], '10/06/2023')
+            self.assertEqual(result['orders'][0]['pdf_url'], '/o1.pdf')
+
+    async def test_search_case_deadline(self):
+        from async_scraper import AsyncDelhiHighCourtScraper
+        async with AsyncDelhiHighCourtScraper() as scraper:
+            scraper.search_url = str(self.server.make_url('/case-status?delay=2'))
+            scraper.rate_limiter = self.limiter
+            result = await scraper.search_case('W.P.(C)', '1234', 2023, deadline=0.2)
+
+        self.assertIn('timed out', result['error'])
+        self.assertEqual(self.post_count, 0)
+
+    async def test_deadline_spent_waiting_for_rate_limiter_is_throttling(self):
+        from unittest import mock
+        from async_scraper import AsyncDelhiHighCourtScraper
+
+        async def never(timeout=None):
+            await asyncio.sleep(10)
+
+        async with AsyncDelhiHighCourtScraper() as scraper:
+            scraper.search_url = str(self.server.make_url('/case-status'))
+            scraper.rate_limiter = mock.Mock(acquire_async=never)
+            result = await scraper.search_case('W.P.(C)', '1234', 2023, deadline=0.2)
+
+        self.assertTrue(result['throttled'])
+        scraper.rate_limiter.record_error.assert_not_called()
+
+class RateLimiterTestCase(unittest.TestCase):
+    """Test the shared adaptive token bucket"""
+
+    def setUp(self):
+        import tempfile
+        self.path = os.path.join(tempfile.mkdtemp(), 'rate.db')
+
+    def _limiter(self, **kwargs):
+        from rate_limiter import AdaptiveRateLimiter
+        options = dict(path=self.path, initial_rate=1.0, min_rate=0.1, max_rate=2.0, burst=2,
+                       increase_step=0.1, captcha_backoff=0.5, error_backoff=0.8, backoff_cooldown=0)
+        options.update(kwargs)
+        return AdaptiveRateLimiter(**options)
+
+    def test_bucket_is_shared_through_the_state_file(self):
+        first, second = self._limiter(), self._limiter()
+        self.assertTrue(first.acquire(timeout=0))
+        self.assertTrue(second.acquire(timeout=0))
+        # Burst of 2 is spent across both handles; the next token is ~1s away
+        acquired, wait = first.try_acquire()
+        self.assertFalse(acquired)
+        self.assertGreater(wait, 0.5)
+        self.assertFalse(second.acquire(timeout=0.05))
+
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = self._limiter()
+        limiter.record_success()
+        self.assertAlmostEqual(limiter.state()['rate'], 1.1)
+        limiter.record_captcha()
+        self.assertAlmostEqual(limiter.state()['rate'], 0.55)
+        limiter.record_error()
+        self.assertAlmostEqual(limiter.state()['rate'], 0.44)
+        for _ in range(10):
+            limiter.record_captcha()
+        self.assertAlmostEqual(limiter.state()['rate'], 0.1)
+        self.assertEqual(limiter.state()['captchas'], 11)
+
+    def test_backoff_cooldown_counts_a_burst_once(self):
+        limiter = self._limiter(backoff_cooldown=60)
+        limiter.record_captcha()
+        limiter.record_captcha()
+        self.assertAlmostEqual(limiter.state()['rate'], 0.5)
+
+def _slow_parse(html):
+    """Parser stand-in for pool workers that never finishes in time"""
+    import time
+    time.sleep(float(html))
+    return {}
+
+class ParsingServiceTestCase(unittest.TestCase):
+    """Test the process-pool HTML parsing service"""
+
+    HTML = '<html><body><h1 class="case-title">Pool Case</h1></body></html>'
+
+    def test_pooled_parse_returns_plain_dict(self):
+        from parse_pool import ParsingService
+        service = ParsingService(max_workers=1).start()
+        try:
+            result = service.parse(self.HTML, kind='results')
+        finally:
+            service.shutdown()
+        self.assertFalse(result['captcha'])
+        self.assertEqual(result['case_details']['case_title'], 'Pool Case')
+        self.assertEqual(service.stats['pooled'], 1)
+
+    def test_size_limit_and_saturation_fallback(self):
+        from parse_pool import ParsingService
+        service = ParsingService(max_workers=1, max_html_bytes=len(self.HTML))
+        self.assertIn('too large', service.parse(self.HTML + ' ')['error'])
+        # The limit is in bytes: one more character, but two more bytes
+        self.assertIn('too large', service.parse(self.HTML[:-1].replace('Pool', 'Pööl'))['error'])
+
+        # A saturated pool parses inline instead of queueing
+        service._executor = object()
+        service._pending = service.max_pending
+        result = service.parse(self.HTML, kind='results')
+        self.assertEqual(result['case_details']['case_title'], 'Pool Case')
+        self.assertEqual(service.stats['inline'], 1)
+
+    def test_timeout_recycles_the_pool(self):
+        from unittest import mock
+        from parse_pool import ParsingService
+        service = ParsingService(max_workers=1, timeout=0.5).start()
+        try:
+            executor = service._executor
+            workers = list(executor._processes.values())
+            with mock.patch.dict('parse_pool.PARSERS', {'slow': _slow_parse}):
+                self.assertIn('timed out', service.parse('30', kind='slow')['error'])
+            for worker in workers:
+                worker.join(5)
+                self.assertFalse(worker.is_alive())
+            self.assertEqual(service.stats['recycled'], 1)
+
+            # The next parse runs on a fresh pool
+            result = service.parse(self.HTML, kind='results')
+            self.assertEqual(result['case_details']['case_title'], 'Pool Case')
+            self.assertIsNot(service._executor, executor)
+            self.assertEqual(service.stats['pooled'], 1)
+        finally:
+            service.shutdown()
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    """Test the circuit breaker and stale-result serving"""
+
+    def setUp(self):
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+        self.breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60, half_open_max_calls=1)
+        self.scraper_calls = 0
+        self.scraper_result = {'error': 'CAPTCHA detected'}
+
+        test = self
+        class FakeScraper:
+            def search_case(self, case_type, case_number, filing_year, progress=None):
+                test.scraper_calls += 1
+                return test.scraper_result
+
+        self.patches = [mock.patch('circuit_breaker._breaker', self.breaker),
+                        mock.patch('scraper.DelhiHighCourtScraper', FakeScraper)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _search(self):
+        return self.client.post('/api/search', json={
+            'case_type': 'W.P.(C)', 'case_number': '1234', 'filing_year': '2023'
+        })
+
+    def test_state_transitions(self):
+        import time
+        from circuit_breaker import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05, half_open_max_calls=1)
+        breaker.record_failure('captcha')
+        self.assertEqual(breaker.state, 'closed')
+        breaker.record_failure('captcha')
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertFalse(breaker.allow_request())  # one probe at a time
+        breaker.record_failure('captcha')
+        self.assertEqual(breaker.state, 'open')
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.allow_request())
+
+    def test_open_circuit_serves_last_real_result_without_scraping(self):
+        self.scraper_result = dict(get_mock_case_data('W.P.(C)', '1234', 2023), success=True)
+        self.scraper_result['case_details'] = dict(self.scraper_result['case_details'], case_title='Live Title')
+        self.assertFalse(self._search().get_json()['mock'])
+
+        self.scraper_result = {'error': 'CAPTCHA detected'}
+        self.assertTrue(self._search().get_json()['mock'])
+        self.assertTrue(self._search().get_json()['mock'])
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.scraper_calls, 3)
+
+        data = self._search().get_json()
+        self.assertEqual(self.scraper_calls, 3)
+        self.assertTrue(data['stale'])
+        self.assertEqual(data['case_details']['case_title'], 'Live Title')
+        self.assertEqual(len(data['orders']), 2)
+
+        with self.app.app_context():
+            statuses = [query.status for query in CaseQuery.query.order_by(CaseQuery.id)]
+        self.assertEqual(statuses, ['success', 'mock', 'mock'])
+
+    def test_rate_limit_waits_do_not_trip_the_breaker(self):
+        from rate_limiter import THROTTLED_ERROR
+        self.scraper_result = {'error': THROTTLED_ERROR, 'throttled': True}
+        for _ in range(3):
+            self._search()
+        self.assertEqual(self.scraper_calls, 3)
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.breaker.snapshot()['consecutive_failures'], 0)
+
+    def test_throttled_probe_returns_its_half_open_slot(self):
+        import time
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        from rate_limiter import THROTTLED_ERROR
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        breaker.record_failure('captcha')
+        time.sleep(0.02)
+        self.scraper_result = {'error': THROTTLED_ERROR, 'throttled': True}
+        with mock.patch('circuit_breaker._breaker', breaker):
+            self._search()
+        self.assertEqual(self.scraper_calls, 1)  # the probe ran and came back throttled
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertTrue(breaker.allow_request())
+
+    def test_open_circuit_without_stored_result_falls_back_to_mock(self):
+        self.breaker.record_failure('captcha')
+        self.breaker.record_failure('captcha')
+        response = self.client.post('/search', data={
+            'case_type': 'W.P.(C)', 'case_number': '77', 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.scraper_calls, 0)
+        self.assertIn(b'temporarily unavailable', response.data)
+        stats = self.client.get('/stats')
+        self.assertIn(b'Court Site Circuit', stats.data)
+        self.assertIn(b'Open', stats.data)
+
+class StaleWhileRevalidateTestCase(unittest.TestCase):
+    """Test mode=swr serving and background refresh"""
+
+    def setUp(self):
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        from refresh import RefreshQueue
+        # File database: the refresh thread needs its own connection, not the shared in-memory one
+        self.db_dir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(self.db_dir, 'court_data.db')
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+            case_query = CaseQuery(case_type='W.P.(C)', case_number='1234', filing_year=2023, status='success')
+            db.session.add(case_query)
+            db.session.flush()
+            details = CaseDetail(query_id=case_query.id, case_title='Old Title',
+                                 updated_at=datetime.utcnow() - timedelta(days=2))
+            db.session.add(details)
+            db.session.commit()
+            self.query_id = case_query.id
+
+        self.queue = RefreshQueue(max_workers=1)
+        self.scraper_calls = 0
+        test = self
+        class FakeScraper:
+            def search_case(self, case_type, case_number, filing_year, progress=None):
+                test.scraper_calls += 1
+                result = get_mock_case_data(case_type, case_number, filing_year)
+                result['case_details'] = dict(result['case_details'], case_title='New Title')
+                return result
+
+        self.patches = [mock.patch('refresh._queue', self.queue),
+                        mock.patch('circuit_breaker._breaker', CircuitBreaker()),
+                        mock.patch('scraper.DelhiHighCourtScraper', FakeScraper)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        self.queue.shutdown()
+        for patch in self.patches:
+            patch.stop()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        import shutil
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def _search(self):
+        return self.client.post('/api/search', json={
+            'case_type': 'W.P.(C)', 'case_number': '1234', 'filing_year': '2023', 'mode': 'swr'
+        })
+
+    def test_stale_result_served_then_refreshed_in_background(self):
+        data = self._search().get_json()
+        self.assertEqual(data['case_details']['case_title'], 'Old Title')
+        self.assertEqual(data['query_id'], self.query_id)
+        self.assertGreater(data['age_seconds'], 86400)
+        self.queue.shutdown()
+        self.assertEqual(self.scraper_calls, 1)
+
+        freshness = self.client.get(f'/api/cases/{self.query_id}/freshness').get_json()
+        self.assertNotEqual(freshness['as_of'], data['as_of'])
+        self.assertFalse(freshness['refreshing'])
+        page = self.client.get(f'/cases/{self.query_id}')
+        self.assertIn(b'New Title', page.data)
+        with self.app.app_context():
+            self.assertEqual(CourtOrder.query.count(), 2)
+            self.assertEqual(CaseQuery.query.count(), 1)
+
+    def test_fresh_result_is_not_refreshed(self):
+        with self.app.app_context():
+            db.session.get(CaseQuery, self.query_id).case_details.updated_at = datetime.utcnow()
+            db.session.commit()
+        response = self.client.post('/search', data={
+            'case_type': 'W.P.(C)', 'case_number': '1234', 'filing_year': '2023', 'mode': 'swr'
+        })
+        self.assertIn(b'Stored data as of', response.data)
+        self.queue.shutdown()
+        self.assertEqual(self.scraper_calls, 0)
+
+    def test_live_search_honours_swr_mode(self):
+        started = self.client.post('/search/live', data={
+            'case_type': 'W.P.(C)', 'case_number': '1234', 'filing_year': '2023', 'mode': 'swr'
+        }).get_json()
+        body = self.client.get(started['stream_url']).get_data(as_text=True)
+        events = [(fields['event'], json.loads(fields['data'])) for fields in (
+            dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+            for message in body.split('\n\n')) if 'event' in fields]
+        self.assertEqual([event for event, _ in events],
+                         ['cache_hit', 'details_extracted', 'orders_extracted', 'done'])
+        self.assertTrue(events[0][1]['refreshing'])
+        self.assertEqual(events[1][1]['case_details']['case_title'], 'Old Title')
+        self.assertEqual(events[-1][1]['source'], 'swr')
+        self.queue.shutdown()
+        self.assertEqual(self.scraper_calls, 1)
+
+    def test_refresh_queue_deduplicates_pending_keys(self):
+        import threading
+        from refresh import RefreshQueue
+        queue = RefreshQueue(max_workers=1)
+        release = threading.Event()
+        self.assertTrue(queue.submit(7, release.wait))
+        self.assertFalse(queue.submit(7, release.wait))
+        self.assertTrue(queue.is_pending(7))
+        release.set()
+        queue.shutdown()
+        self.assertFalse(queue.is_pending(7))
+
+def _run_test_worker(database_url, worker_id):
+    """Worker process entry point for ScrapeWorkerTestCase"""
+    import time
+    os.environ['DATABASE_URL'] = database_url
+    from worker import ScrapeWorker
+
+    def scrape(case_type, case_number, filing_year):
+        time.sleep(0.05)
+        return get_mock_case_data(case_type, case_number, filing_year)
+
+    ScrapeWorker(create_app(), worker_id, scrape=scrape, poll_interval=0.05).run(exit_when_idle=True)
+
+class CaseKeyValidationTestCase(unittest.TestCase):
+    """Test case key validation and the not-found negative cache"""
+
+    def setUp(self):
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+        self.breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60, half_open_max_calls=1)
+        self.scraper_calls = 0
+
+        test = self
+        class FakeScraper:
+            def search_case(self, case_type, case_number, filing_year, progress=None):
+                test.scraper_calls += 1
+                return {'error': 'No case found', 'not_found': True}
+
+        self.patches = [mock.patch('circuit_breaker._breaker', self.breaker),
+                        mock.patch('scraper.DelhiHighCourtScraper', FakeScraper),
+                        mock.patch('validation._negative_cache', None)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_normalize_case_key(self):
+        from validation import normalize_case_key
+        self.assertEqual(normalize_case_key(' w.p.(c) ', '0042', '2023'), ('W.P.(C)', '42', 2023))
+        for key, message in ((('W.P.(X)', '42', 2023), 'Unknown case type'),
+                             (('W.P.(C)', '12345678', 2023), '1 to 7 digits'),
+                             (('W.P.(C)', '42/2023', 2023), '1 to 7 digits'),
+                             (('W.P.(C)', '42', 1850), 'filing year'),
+                             (('W.P.(C)', '42', 'last year'), 'filing year')):
+            with self.assertRaisesRegex(ValueError, message):
+                normalize_case_key(*key)
+
+    def test_case_types_are_unique_type_codes(self):
+        from config import Config
+        self.assertEqual(len(Config.CASE_TYPES), len(set(Config.CASE_TYPES)))
+        self.assertFalse([case_type for case_type in Config.CASE_TYPES if any(c.isdigit() for c in case_type)])
+
+    def test_negative_cache_expires_and_evicts_oldest(self):
+        import time
+        from validation import NegativeCache
+        cache = NegativeCache(ttl=0.05, max_entries=2)
+        for n in range(3):
+            cache.add(('W.P.(C)', str(n), 2023))
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(('W.P.(C)', '0', 2023), cache)
+        self.assertIn(('W.P.(C)', '2', 2023), cache)
+        time.sleep(0.06)
+        self.assertNotIn(('W.P.(C)', '2', 2023), cache)
+
+    def test_invalid_key_rejected_before_scraping(self):
+        response = self.client.post('/api/search', json={
+            'case_type': 'W.P.(C)', 'case_number': '12/34', 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1 to 7 digits', response.get_json()['error'])
+        response = self.client.post('/api/jobs', json={
+            'case_type': 'NOT A TYPE', 'case_number': '1', 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.scraper_calls, 0)
+
+    def test_not_found_is_cached_without_tripping_breaker(self):
+        for case_number in ('0099', '99'):
+            response = self.client.post('/api/search', json={
+                'case_type': 'w.p.(c)', 'case_number': case_number, 'filing_year': '2023'
+            })
+            self.assertEqual(response.status_code, 404)
+            self.assertTrue(response.get_json()['not_found'])
+        self.assertEqual(self.scraper_calls, 1)
+        self.assertEqual(self.breaker.state, 'closed')
+
+        response = self.client.post('/search', data={
+            'case_type': 'W.P.(C)', 'case_number': '99', 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.scraper_calls, 1)
+        with self.app.app_context():
+            self.assertEqual(CaseQuery.query.count(), 0)
+            self.assertFalse(SearchLog.query.first().success)
+
+    def test_worker_fails_not_found_job_without_retrying(self):
+        from worker import ScrapeWorker
+        response = self.client.post('/api/jobs', json={
+            'case_type': 'W.P.(C)', 'case_number': '7', 'filing_year': '2023'
+        })
+        worker = ScrapeWorker(self.app, 'test-worker',
+                              scrape=lambda *case: {'error': 'No case found', 'not_found': True})
+        worker.run_once()
+        status = self.client.get(response.get_json()['status_url']).get_json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['attempts'], 1)
+
+        response = self.client.post('/api/jobs', json={
+            'case_type': 'W.P.(C)', 'case_number': '7', 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 404)
+
+class ProfilingTestCase(unittest.TestCase):
+    """Test opt-in request profiling"""
+
+    def setUp(self):
+        from unittest import mock
+        from config import Config
+        self.profile_dir = tempfile.mkdtemp()
+        self.patches = [mock.patch.object(Config, 'PROFILE_TOKEN', 'secret'),
+                        mock.patch.object(Config, 'PROFILE_SAMPLE_RATE', 0),
+                        mock.patch.object(Config, 'PROFILE_DIR', self.profile_dir),
+                        mock.patch('profiling._enabled', False)]
+        for patch in self.patches:
+            patch.start()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        import shutil
+        for patch in self.patches:
+            patch.stop()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def test_token_profiles_request(self):
+        self.assertNotIn('X-Profile-Id', self.client.get('/stats').headers)
+        self.assertNotIn('X-Profile-Id', self.client.get('/stats', headers={'X-Profile-Token': 'wrong'}).headers)
+
+        # Render for real: a response-cache hit on /stats runs no SQL at all
+        from http_cache import response_cache
+        response_cache.invalidate()
+        response = self.client.get('/stats', headers={'X-Profile-Token': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        profile_id = response.headers['X-Profile-Id']
+        with open(os.path.join(self.profile_dir, f'{profile_id}.json')) as f:
+            summary = json.load(f)
+        self.assertEqual(summary['path'], '/stats')
+        self.assertGreater(summary['sql_count'], 0)
+        self.assertGreater(summary['wall_ms'], 0)
+        self.assertEqual(summary['webdriver_count'], 0)
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, f'{profile_id}.prof')))
+
+        self.assertEqual(self.client.get('/profiles').status_code, 404)
+        index = self.client.get('/profiles?token=secret')
+        self.assertEqual(index.status_code, 200)
+        self.assertIn(b'/stats', index.data)
+        report = self.client.get(f'/profiles/{profile_id}', headers={'X-Profile-Token': 'secret'})
+        self.assertEqual(report.status_code, 200)
+        self.assertIn(b'cumulative', report.data)
+        self.assertEqual(self.client.get('/profiles/..%2Fcourt_data?token=secret').status_code, 404)
+
+    def test_disabled_registers_no_hooks(self):
+        from unittest import mock
+        from config import Config
+        with mock.patch.object(Config, 'PROFILE_TOKEN', ''):
+            app = create_app()
+        self.assertNotIn('profiles', app.view_functions)
+        self.assertNotIn('start_profile', [func.__name__ for func in app.before_request_funcs.get(None, [])])
+
+    def test_webdriver_commands_counted_and_old_profiles_pruned(self):
+        from unittest import mock
+        from profiling import RequestProfile, instrument_webdriver, save_profile
+
+        class Driver:
+            def execute(self, command, params=None):
+                return {'value': command}
+
+        with mock.patch('profiling._enabled', True):
+            instrument_webdriver(Driver)
+            instrument_webdriver(Driver)  # wrapped once
+        driver = Driver()
+        driver.execute('get')
+
+        saved = []
+        for _ in range(3):
+            profile = RequestProfile('GET', '/search')
+            profile.start()
+            self.assertEqual(driver.execute('get'), {'value': 'get'})
+            driver.execute('getPageSource')
+            profile.stop()
+            self.assertEqual(profile.webdriver_count, 2)
+            saved.append(save_profile(profile, 200, keep=2)['id'])
+        self.assertEqual(sorted(os.listdir(self.profile_dir)),
+                         sorted(f'{profile_id}{ext}' for profile_id in saved[1:] for ext in ('.json', '.prof')))
+
+class GenerateDataTestCase(unittest.TestCase):
+    """Test the synthetic dataset generator"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_same_seed_same_rows(self):
+        from generate_data import DatasetGenerator
+        batches = [DatasetGenerator(seed=7, as_of=date(2024, 6, 30)).case_batch(50) for _ in range(2)]
+        self.assertEqual(batches[0], batches[1])
+        self.assertNotEqual(batches[0], DatasetGenerator(seed=8, as_of=date(2024, 6, 30)).case_batch(50))
+
+    def test_generated_rows_are_valid_and_appendable(self):
+        from generate_data import generate
+        from models import ChangeLog
+        from validation import normalize_case_key
+        as_of = date(2024, 6, 30)
+        with self.app.app_context():
+            counts = generate(300, 500, seed=7, as_of=as_of, batch_size=64)
+            self.assertEqual(counts['case_query'], CaseQuery.query.count())
+            self.assertEqual(counts['court_order'], CourtOrder.query.count())
+            self.assertEqual(SearchLog.query.count(), 500)
+            self.assertEqual(ChangeLog.query.count(),
+                             counts['case_query'] + counts['case_detail'] + counts['court_order'])
+
+            for case_query in CaseQuery.query.all():
+                key = (case_query.case_type, case_query.case_number, case_query.filing_year)
+                self.assertEqual(normalize_case_key(*key), key)
+            for detail in db.session.execute(db.select(CaseDetail)).scalars():
+                dates = [order.order_date for order in detail.orders]
+                self.assertTrue(all(detail.filing_date <= day <= as_of for day in dates))
+                if detail.case_status == 'Disposed':
+                    self.assertEqual(max(detail.orders, key=lambda order: (order.order_date, order.id)).order_type,
+                                     'Judgment')
+
+            second = generate(10, 0, seed=8, as_of=as_of, change_log=False)
+            self.assertEqual(CaseQuery.query.count(), counts['case_query'] + second['case_query'])
+
+        response = self.client.get('/api/cases?page=2&per_page=50')
+        self.assertEqual(response.get_json()['pagination']['total'], 310)
+
+class DatabaseProfileTestCase(unittest.TestCase):
+    """Test the SQLite/PostgreSQL database profile"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        self.app = create_app()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_engine_options_per_dialect(self):
+        from unittest import mock
+        from config import Config
+        from database import database_url, engine_options
+        self.assertEqual(engine_options('sqlite:///:memory:'), {})
+
+        os.environ['DATABASE_URL'] = 'postgres://court:secret@db/court'
+        self.assertEqual(database_url(), 'postgresql://court:secret@db/court')
+        with mock.patch.dict(os.environ, {'GUNICORN_THREADS': '4'}), \
+                mock.patch.object(Config, 'LIVE_SEARCH_WORKERS', 4), mock.patch.object(Config, 'SWR_REFRESH_WORKERS', 2):
+            options = engine_options('postgresql+psycopg2://court@db/court')
+            self.assertEqual(options['pool_size'], 10)
+            self.assertTrue(options['pool_pre_ping'])
+            with mock.patch.object(Config, 'DB_POOL_SIZE', 3):
+                self.assertEqual(engine_options(database_url())['pool_size'], 3)
+
+    def test_one_active_job_per_case(self):
+        from sqlalchemy.exc import IntegrityError
+        from models import ScrapeJob
+        from worker import enqueue_job
+        with self.app.app_context():
+            first = enqueue_job('LPA', '12', 2023).id
+            db.session.commit()
+            self.assertEqual(enqueue_job('LPA', '12', 2023).id, first)
+            db.session.commit()
+
+            db.session.add(ScrapeJob(case_type='LPA', case_number='12', filing_year=2023, status='pending'))
+            with self.assertRaises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
+
+            db.session.get(ScrapeJob, first).status = 'done'
+            db.session.commit()
+            self.assertNotEqual(enqueue_job('LPA', '12', 2023).id, first)
+            db.session.commit()
+            self.assertEqual(ScrapeJob.query.count(), 2)
+
+@unittest.skipUnless(os.getenv('TEST_DATABASE_URL', '').startswith('postgres'),
+                     'set TEST_DATABASE_URL to a scratch PostgreSQL database')
+class PostgresTestCase(unittest.TestCase):
+    """Test the PostgreSQL paths against TEST_DATABASE_URL (its tables are dropped afterwards)"""
+
+    def setUp(self):
+        os.environ['DATABASE_URL'] = os.environ['TEST_DATABASE_URL']
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+    def _in_threads(self, target, count=8):
+        import threading
+        results = []
+        def run():
+            with self.app.app_context():
+                results.append(target())
+                db.session.remove()
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_copy_bulk_load_and_sequences(self):
+        from generate_data import generate
+        from models import ChangeLog
+        with self.app.app_context():
+            counts = generate(200, 300, seed=7, as_of=date(2024, 6, 30), batch_size=64)
+            self.assertEqual(CourtOrder.query.count(), counts['court_order'])
+            self.assertEqual(SearchLog.query.filter(SearchLog.error_message.is_(None)).count(),
+                             SearchLog.query.filter_by(success=True).count())
+            self.assertEqual(ChangeLog.query.count(),
+                             counts['case_query'] + counts['case_detail'] + counts['court_order'])
+            # Sequences were moved past the copied ids
+            db.session.add(CaseQuery(case_type='LPA', case_number='1', filing_year=2024))
+            db.session.commit()
+
+        response = self.client.get('/api/export?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(len(response.get_data(as_text=True).splitlines()), counts['court_order'])
+
+    def test_change_log_commits_in_sequence_order(self):
+        import threading
+        from changes import read_changes
+        flushed, release = threading.Event(), threading.Event()
+        finished = []
+
+        def write(case_number, hold):
+            with self.app.app_context():
+                db.session.add(CaseQuery(case_type='LPA', case_number=case_number, filing_year=2024))
+                db.session.flush()
+                flushed.set()
+                if hold:
+                    release.wait(10)
+                db.session.commit()
+                finished.append(case_number)
+                db.session.remove()
+
+        first = threading.Thread(target=write, args=('1', True))
+        first.start()
+        flushed.wait(10)
+        second = threading.Thread(target=write, args=('2', False))
+        second.start()
+        # The second writer waits for the first, so a reader never skips past an uncommitted entry
+        second.join(1)
+        self.assertTrue(second.is_alive())
+        with self.app.app_context():
+            self.assertEqual(read_changes()[0], [])
+        release.set()
+        first.join()
+        second.join()
+        self.assertEqual(finished, ['1', '2'])
+        with self.app.app_context():
+            changes = read_changes()[0]
+            numbers = {change['id']: change['seq'] for change in changes}
+            ids = {query.case_number: query.id for query in CaseQuery.query.all()}
+        self.assertLess(numbers[ids['1']], numbers[ids['2']])
+
+    def test_concurrent_enqueue_and_claims(self):
+        from models import ScrapeJob
+        from worker import claim_job, enqueue_job
+
+        def enqueue():
+            job_id = enqueue_job('LPA', '12', 2023).id
+            db.session.commit()
+            return job_id
+        self.assertEqual(len(set(self._in_threads(enqueue))), 1)
+
+        with self.app.app_context():
+            for n in range(15):
+                enqueue_job('LPA', str(100 + n), 2023)
+            db.session.commit()
+        claimed = self._in_threads(lambda: [job.id for job in iter(lambda: claim_job('worker'), None)])
+        claimed = [job_id for jobs in claimed for job_id in jobs]
+        self.assertEqual(len(claimed), 16)
+        self.assertEqual(len(set(claimed)), 16)
+        with self.app.app_context():
+            self.assertEqual({job.attempts for job in ScrapeJob.query.all()}, {1})
+
+class BulkLookupTestCase(unittest.TestCase):
+    """Test the resumable bulk lookup CLI"""
+
+    def setUp(self):
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        # File database: lookups store results from several threads, each on its own connection
+        self.state_dir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(self.state_dir, 'court_data.db')
+        self.app = create_app()
+        with self.app.app_context():
+            db.create_all()
+        self.state_path = os.path.join(self.state_dir, 'cases.state.jsonl')
+        self.patches = [mock.patch('circuit_breaker._breaker', CircuitBreaker(failure_threshold=10)),
+                        mock.patch('validation._negative_cache', None)]
+        for patch in self.patches:
+            patch.start()
+        self.scraped = []
+
+    def tearDown(self):
+        import shutil
+        for patch in self.patches:
+            patch.stop()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def _write(self, name, text):
+        path = os.path.join(self.state_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def _run(self, path, captcha=()):
+        from bulk_lookup import Checkpoint, read_keys, run_bulk
+
+        def scrape(case_type, case_number, filing_year):
+            self.scraped.append(case_number)
+            if case_number == '404':
+                return {'error': 'No case found', 'not_found': True}
+            if case_number in captcha:
+                return {'error': 'CAPTCHA detected'}
+            return get_mock_case_data(case_type, case_number, filing_year)
+
+        checkpoint = Checkpoint(self.state_path)
+        try:
+            return run_bulk(self.app, read_keys(path), checkpoint, concurrency=3, scrape=scrape)
+        finally:
+            checkpoint.close()
+
+    def test_csv_run_resumes_after_failures(self):
+        path = self._write('cases.csv', 'case_type,case_number,filing_year\n'
+                           'W.P.(C),1,2023\nw.p.(c),0001,2023\nLPA,2,2023\nLPA,404,2023\n'
+                           'LPA,3,2023\nNOPE,4,2023\n')
+        progress = self._run(path, captcha=('3',))
+        self.assertEqual(sorted(self.scraped), ['1', '2', '3', '404'])
+        self.assertEqual(progress.outcomes, {'done': 2, 'not_found': 1, 'invalid': 1, 'failed': 1})
+        self.assertEqual(progress.failures, {'captcha': 1})
+
+        self.scraped.clear()
+        progress = self._run(path)
+        self.assertEqual(self.scraped, ['3'])
+        self.assertEqual(progress.outcomes['done'], 1)
+        with open(self.state_path) as f:
+            statuses = sorted(json.loads(line)['status'] for line in f)
+        self.assertEqual(statuses, ['done', 'done', 'done', 'not_found'])
+        with self.app.app_context():
+            self.assertEqual(CaseQuery.query.filter_by(status='success').count(), 3)
+
+    def test_throttled_lookup_returns_half_open_probe(self):
+        import time
+        from unittest import mock
+        from bulk_lookup import lookup_case
+        from circuit_breaker import CircuitBreaker
+        from rate_limiter import THROTTLED_ERROR
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        breaker.record_failure('captcha')
+        time.sleep(0.02)
+        with mock.patch('circuit_breaker._breaker', breaker):
+            outcome, error = lookup_case(self.app, ('LPA', '9', 2023),
+                                         lambda *key: {'error': THROTTLED_ERROR, 'throttled': True})
+        self.assertEqual((outcome, error), ('failed', THROTTLED_ERROR))
+        self.assertTrue(breaker.allow_request())
+
+    def test_jsonl_refreshes_stored_cases_in_place(self):
+        path = self._write('cases.jsonl', '{"case_type": "LPA", "case_number": "7", "filing_year": 2023}\n\nnot json\n')
+        self.assertEqual(self._run(path).outcomes, {'done': 1, 'invalid': 1})
+        os.remove(self.state_path)
+        self._run(path)
+        self.assertEqual(self.scraped, ['7', '7'])
+        with self.app.app_context():
+            self.assertEqual(CaseQuery.query.count(), 1)
+            self.assertEqual(CourtOrder.query.count(), 2)
+
+class ScrapeWorkerTestCase(unittest.TestCase):
+    """Test lease-based job claiming by standalone workers"""
+
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        self.database_url = 'sqlite:///' + os.path.join(self.db_dir, 'court_data.db')
+        os.environ['DATABASE_URL'] = self.database_url
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        import shutil
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def _enqueue(self, count):
+        from worker import enqueue_job
+        with self.app.app_context():
+            jobs = [enqueue_job('W.P.(C)', str(1000 + n), 2023) for n in range(count)]
+            db.session.commit()
+            return [job.id for job in jobs]
+
+    def test_several_worker_processes_process_each_job_once(self):
+        import multiprocessing
+        from models import ScrapeJob
+        job_ids = self._enqueue(12)
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_run_test_worker, args=(self.database_url, f'worker-{n}'))
+                   for n in range(3)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+        with self.app.app_context():
+            jobs = ScrapeJob.query.filter(ScrapeJob.id.in_(job_ids)).all()
+            self.assertEqual({job.status for job in jobs}, {'done'})
+            self.assertEqual({job.attempts for job in jobs}, {1})
+            self.assertEqual(CaseQuery.query.count(), 12)
+            self.assertEqual(CourtOrder.query.count(), 24)
+
+    def test_expired_lease_is_requeued_and_lost_lease_cannot_complete(self):
+        from worker import claim_job, complete_job, heartbeat, requeue_expired, ScrapeWorker
+        [job_id] = self._enqueue(1)
+        with self.app.app_context():
+            self.assertEqual(claim_job('crashed-worker').id, job_id)
+            self.assertIsNone(claim_job('other-worker'))
+            self.assertTrue(heartbeat(job_id, 'crashed-worker'))
+            self.assertFalse(heartbeat(job_id, 'other-worker'))
+            self.assertEqual(requeue_expired(datetime.utcnow() + timedelta(hours=1)), (1, 0))
+
+        worker = ScrapeWorker(self.app, 'healthy-worker', scrape=get_mock_case_data)
+        self.assertTrue(worker.run_once())
+        with self.app.app_context():
+            self.assertFalse(complete_job(job_id, 'crashed-worker',
+                                         CaseResult.from_scraper(get_mock_case_data('W.P.(C)', '1000', 2023))))
+            status = self.client.get(f'/api/jobs/{job_id}').get_json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['attempts'], 2)
+        self.assertIsNotNone(status['query_id'])
+
+    def test_enqueue_api_reuses_active_job_and_failures_retry(self):
+        from worker import ScrapeWorker
+        payload = {'case_type': 'W.P.(C)', 'case_number': '55', 'filing_year': '2023'}
+        first = self.client.post('/api/jobs', json=payload)
+        second = self.client.post('/api/jobs', json=payload)
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first.get_json()['job_id'], second.get_json()['job_id'])
+
+        worker = ScrapeWorker(self.app, 'captcha-worker', scrape=lambda *case: {'error': 'CAPTCHA detected'})
+        for _ in range(5):
+            worker.run_once()
+        status = self.client.get(first.get_json()['status_url']).get_json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['attempts'], 3)
+        self.assertEqual(status['error'], 'CAPTCHA detected')
+
+    def test_throttled_lookup_keeps_its_attempts(self):
+        from rate_limiter import THROTTLED_ERROR
+        from worker import ScrapeWorker
+        job = self.client.post('/api/jobs', json={
+            'case_type': 'W.P.(C)', 'case_number': '56', 'filing_year': '2023'}).get_json()
+        worker = ScrapeWorker(self.app, 'busy-worker',
+                              scrape=lambda *case: {'error': THROTTLED_ERROR, 'throttled': True})
+        for _ in range(5):
+            worker.run_once()
+        status = self.client.get(job['status_url']).get_json()
+        self.assertEqual(status['status'], 'pending')
+        self.assertEqual(status['attempts'], 0)
+
+class RemoteWebDriverTestCase(unittest.TestCase):
+    """Test remote WebDriver endpoint balancing and failover"""
+
+    def _pool(self, *urls, **kwargs):
+        from browser_farm import RemoteEndpointPool
+        options = dict(failure_threshold=1, cooldown=60)
+        options.update(kwargs)
+        return RemoteEndpointPool(list(urls), **options)
+
+    def test_sessions_balance_across_endpoints(self):
+        pool = self._pool('http://a', 'http://b')
+        first, _ = pool.connect(lambda url: object())
+        second, _ = pool.connect(lambda url: object())
+        self.assertNotEqual(first, second)
+        pool.release(first)
+        third, _ = pool.connect(lambda url: object())
+        self.assertEqual(third, first)
+
+    def test_failover_and_cooldown(self):
+        pool = self._pool('http://down', 'http://up')
+
+        def factory(url):
+            if url == 'http://down':
+                raise ConnectionError('connection refused')
+            return 'driver'
+
+        for _ in range(3):
+            url, driver = pool.connect(factory)
+            self.assertEqual((url, driver), ('http://up', 'driver'))
+            pool.release(url)
+        health = {endpoint['url']: endpoint for endpoint in pool.snapshot()}
+        self.assertFalse(health['http://down']['healthy'])
+        self.assertEqual(health['http://down']['consecutive_failures'], 1)  # skipped while cooling down
+        self.assertEqual(pool.candidates()[-1], 'http://down')
+
+        with self.assertRaises(RuntimeError):
+            self._pool('http://down').connect(factory)
+
+    def test_scraper_uses_remote_endpoints_without_local_chrome(self):
+        from unittest import mock
+        import scraper
+        pool = self._pool('http://grid-1', 'http://grid-2')
+        calls = []
+
+        class FakeRemote:
+            def __init__(self, command_executor, options):
+                calls.append(command_executor)
+                if command_executor == 'http://grid-1':
+                    raise ConnectionError('node gone')
+
+            def quit(self):
+                pass
+
+        with mock.patch('scraper.get_endpoint_pool', return_value=pool), \
+                mock.patch('scraper._find_chrome_installation') as find_chrome, \
+                mock.patch('selenium.webdriver.Remote', FakeRemote):
+            instance = scraper.DelhiHighCourtScraper()
+            self.assertTrue(instance.setup_driver())
+            find_chrome.assert_not_called()
+        self.assertEqual(instance.remote_endpoint, 'http://grid-2')
+        self.assertEqual(pool.snapshot()[1]['active_sessions'], 1)
+        instance.close_driver()
+        self.assertEqual(pool.snapshot()[1]['active_sessions'], 0)
+
+    def test_failed_session_start_releases_endpoint_and_cache_slot(self):
+        from unittest import mock
+        import scraper
+        pool = self._pool('http://grid-1', 'http://grid-2')
+
+        class FakeRemote:
+            def __init__(self, command_executor, options):
+                raise RuntimeError('session not created')
+
+        profile = mock.Mock(apply_options=mock.Mock(return_value='/cache/slot-0'))
+        with mock.patch('scraper.get_endpoint_pool', return_value=pool), \
+                mock.patch('scraper.get_lean_profile', return_value=profile), \
+                mock.patch('selenium.webdriver.Remote', FakeRemote):
+            instance = scraper.DelhiHighCourtScraper()
+            self.assertFalse(instance.start_browser())
+        profile.apply_session.assert_not_called()
+        profile.release.assert_called_once_with('/cache/slot-0')
+        self.assertIsNone(instance.driver)
+        self.assertIsNone(instance.remote_endpoint)
+        self.assertIsNone(instance.cache_slot)
+        self.assertEqual([endpoint['active_sessions'] for endpoint in pool.snapshot()], [0, 0])
+
+    def test_request_blocking_failure_keeps_the_session(self):
+        from unittest import mock
+        import scraper
+        from browser_profile import LeanProfile
+        pool = self._pool('http://grid-1')
+        cdp_calls = []
+
+        class FakeRemote:
+            def __init__(self, command_executor, options):
+                pass
+
+            def execute_cdp_cmd(self, cmd, params):
+                cdp_calls.append(cmd)
+                raise RuntimeError('CDP not supported by this grid')
+
+            def quit(self):
+                pass
+
+        profile = LeanProfile(enabled=True, cache_dir='')
+        with mock.patch('scraper.get_endpoint_pool', return_value=pool), \
+                mock.patch('scraper.get_lean_profile', return_value=profile), \
+                mock.patch('selenium.webdriver.Remote', FakeRemote):
+            instance = scraper.DelhiHighCourtScraper()
+            # Request blocking is best effort; the search still runs without it
+            self.assertTrue(instance.start_browser())
+        self.assertEqual(cdp_calls, ['Network.enable'])
+        self.assertEqual(pool.snapshot()[0]['active_sessions'], 1)
+        instance.close_driver()
+        self.assertEqual(pool.snapshot()[0]['active_sessions'], 0)
+
+    @unittest.skipUnless(os.getenv('TEST_CHROMEDRIVER_URL'),
+                         'set TEST_CHROMEDRIVER_URL to a chromedriver server, e.g. http://localhost:9515')
+    def test_live_chromedriver_server(self):
+        from unittest import mock
+        import scraper
+        pool = self._pool('http://127.0.0.1:1', os.environ['TEST_CHROMEDRIVER_URL'])
+        with mock.patch('scraper.get_endpoint_pool', return_value=pool):
+            instance = scraper.DelhiHighCourtScraper()
+            self.assertTrue(instance.setup_driver())
+        try:
+            instance.driver.get('data:text/html,<title>farm</title>')
+            self.assertEqual(instance.driver.title, 'farm')
+        finally:
+            instance.close_driver()
+
+class LiveSearchProgressTestCase(unittest.TestCase):
+    """Test live search progress over Server-Sent Events"""
+
+    def setUp(self):
+        import threading
+        from unittest import mock
+        from circuit_breaker import CircuitBreaker
+        self.db_dir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(self.db_dir, 'court_data.db')
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+        self.orders_gate = threading.Event()
+        self.orders_gate.set()
+
+        test = self
+        class FakeScraper:
+            def search_case(self, case_type, case_number, filing_year, progress=None):
+                result = get_mock_case_data(case_type, case_number, filing_year)
+                progress('driver_acquired', engine='webdriver')
+                progress('page_loaded')
+                progress('form_submitted')
+                progress('details_extracted', case_details=result['case_details'])
+                test.orders_gate.wait(5)
+                progress('orders_extracted', orders=result['orders'])
+                return result
+
+        self.patches = [mock.patch('circuit_breaker._breaker', CircuitBreaker()),
+                        mock.patch('scraper.DelhiHighCourtScraper', FakeScraper)]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        import shutil
+        self.orders_gate.set()
+        self.app.extensions['live_search_executor'].shutdown(wait=True)
+        for patch in self.patches:
+            patch.stop()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def _start(self, case_number='1234'):
+        response = self.client.post('/search/live', data={
+            'case_type': 'W.P.(C)', 'case_number': case_number, 'filing_year': '2023'
+        })
+        self.assertEqual(response.status_code, 202)
+        return response.get_json()
+
+    def _events(self, body):
+        events = []
+        for message in body.split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+            if 'event' in fields:
+                events.append((fields['event'], json.loads(fields['data'])))
+        return events
+
+    def test_stream_reports_each_stage_then_done(self):
+        started = self._start()
+        response = self.client.get(started['stream_url'])
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = self._events(response.get_data(as_text=True))
+        self.assertEqual([event for event, _ in events], [
+            'driver_acquired', 'page_loaded', 'form_submitted', 'details_extracted',
+            'orders_extracted', 'persisted', 'done'
+        ])
+        self.assertEqual(events[3][1]['case_details']['filing_date'], '15/01/2023')
+        done = events[-1][1]
+        self.assertEqual(done['source'], 'live')
+        self.assertIn(b'Sample Case', self.client.get(done['results_url']).data)
+
+        # A second search for the same case is answered from the database
+        events = self._events(self.client.get(self._start()['stream_url']).get_data(as_text=True))
+        self.assertEqual([event for event, _ in events],
+                         ['cache_hit', 'details_extracted', 'orders_extracted', 'done'])
+
+        live_page = self.client.get(started['live_url'])
+        self.assertIn(b'data-stream-url', live_page.data)
+
+    def test_details_are_published_before_orders(self):
+        from progress import get_progress_bus
+        self.orders_gate.clear()
+        started = self._start()
+        seen = []
+        with self.app.app_context():
+            for message in get_progress_bus().subscribe(started['search_id'], keepalive=1):
+                if message is None:
+                    continue
+                seen.append(message[1])
+                if message[1] == 'details_extracted':
+                    break
+        self.assertNotIn('orders_extracted', seen)
+        self.orders_gate.set()
+
+        # Reconnecting with Last-Event-ID resumes after the events already seen
+        response = self.client.get(started['stream_url'], headers={'Last-Event-ID': str(len(seen))})
+        events = [event for event, _ in self._events(response.get_data(as_text=True))]
+        self.assertEqual(events, ['orders_extracted', 'persisted', 'done'])
+
+    def test_stream_and_live_page_work_from_another_worker(self):
+        from unittest import mock
+        from progress import ProgressBus
+        started = self._start()
+        # Another gunicorn worker has its own bus; the events reach it through the database
+        with mock.patch('progress._bus', ProgressBus()):
+            events = [event for event, _ in self._events(
+                self.client.get(started['stream_url']).get_data(as_text=True))]
+            live_page = self.client.get(started['live_url'])
+        self.assertEqual(events[-1], 'done')
+        self.assertIn('details_extracted', events)
+        self.assertEqual(live_page.status_code, 200)
+        self.assertIn(b'data-stream-url', live_page.data)
+
+    def test_channels_expire(self):
+        from unittest import mock
+        from progress import ProgressBus
+        with self.app.app_context():
+            bus = ProgressBus(channel_ttl=1)
+            search_id = bus.create(case_type='W.P.(C)')
+            bus.publish(search_id, 'page_loaded')
+            self.assertEqual(bus.meta(search_id), {'case_type': 'W.P.(C)'})
+            with mock.patch('progress.datetime') as clock:
+                clock.utcnow.return_value = datetime.utcnow() + timedelta(seconds=5)
+                bus.create()
+            self.assertIsNone(bus.meta(search_id))
+            self.assertEqual(list(bus.subscribe(search_id)), [])
+
+    def test_unknown_stream_and_invalid_input(self):
+        self.assertEqual(self.client.get('/search/stream/missing').status_code, 404)
+        response = self.client.post('/search/live', data={'case_type': 'W.P.(C)', 'case_number': '1'})
+        self.assertEqual(response.status_code, 400)
+
+class AssetPipelineTestCase(unittest.TestCase):
+    """Test hashed static assets and response compression"""
+
+    def setUp(self):
+        self.asset_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.asset_dir, 'src')
+        self.vendor_dir = os.path.join(self.asset_dir, 'vendor')
+        self.dist_dir = os.path.join(self.asset_dir, 'dist')
+        files = {
+            os.path.join(self.source_dir, 'css', 'app.css'): '/* theme */\n.navbar {\n    color : red;\n}\n',
+            os.path.join(self.source_dir, 'js', 'app.js'): '// comment\nfunction hello() {\n    return 1;\n}\n',
+            os.path.join(self.vendor_dir, 'fontawesome', 'css', 'all.min.css'):
+                '@font-face{src:url(../webfonts/fa-solid-900.woff2) format("woff2")}',
+            os.path.join(self.vendor_dir, 'fontawesome', 'webfonts', 'fa-solid-900.woff2'): 'font-bytes',
+        }
+        for path, content in files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.asset_dir, ignore_errors=True)
+
+    def _build(self):
+        import assets
+        return assets.build(self.source_dir, self.vendor_dir, self.dist_dir)
+
+    def _create_app(self):
+        from unittest import mock
+        with mock.patch('assets.DIST_DIR', self.dist_dir):
+            app = create_app()
+        with app.app_context():
+            db.create_all()
+        return app
+
+    def test_build_hashes_minifies_and_precompresses(self):
+        import gzip
+        manifest = self._build()
+        self.assertRegex(manifest['css/app.css'], r'^css/app\.[0-9a-f]{10}\.css$')
+        self.assertRegex(manifest['js/app.js'], r'^js/app\.[0-9a-f]{10}\.js$')
+        with open(os.path.join(self.dist_dir, 'manifest.json')) as f:
+            self.assertEqual(json.load(f), manifest)
+
+        with open(os.path.join(self.dist_dir, manifest['css/app.css']), 'rb') as f:
+            css = f.read()
+        self.assertEqual(css, b'.navbar{color:red}')
+        with open(os.path.join(self.dist_dir, manifest['css/app.css'] + '.gz'), 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), css)
+
+        # Font references point at the hashed font, so a new font busts the stylesheet's name too
+        font = manifest['vendor/fontawesome/webfonts/fa-solid-900.woff2']
+        with open(os.path.join(self.dist_dir, manifest['vendor/fontawesome/css/all.min.css'])) as f:
+            self.assertIn('url(../webfonts/' + os.path.basename(font) + ')', f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.dist_dir, font + '.gz')))
+
+        first_name = manifest['vendor/fontawesome/css/all.min.css']
+        with open(os.path.join(self.vendor_dir, 'fontawesome', 'webfonts', 'fa-solid-900.woff2'), 'w') as f:
+            f.write('new-font-bytes')
+        self.assertNotEqual(self._build()['vendor/fontawesome/css/all.min.css'], first_name)
+
+    def test_hashed_assets_served_immutable_and_precompressed(self):
+        import gzip
+        manifest = self._build()
+        app = self._create_app()
+        client = app.test_client()
+
+        page = client.get('/').get_data(as_text=True)
+        self.assertIn('/assets/' + manifest['css/app.css'], page)
+        self.assertIn('/assets/' + manifest['vendor/fontawesome/css/all.min.css'], page)
+        # Not vendored in this build: the CDN is still used
+        self.assertIn('https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css', page)
+
+        url = '/assets/' + manifest['css/app.css']
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(gzip.decompress(response.data), b'.navbar{color:red}')
+
+        plain = client.get(url, headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.data, b'.navbar{color:red}')
+        self.assertEqual(client.get('/assets/css/missing.css').status_code, 404)
+
+    def test_unbuilt_assets_fall_back_to_source_and_cdn(self):
+        app = self._create_app()
+        page = app.test_client().get('/').get_data(as_text=True)
+        self.assertIn('/static/src/css/app.css', page)
+        self.assertIn('https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css', page)
+
+    def test_json_and_export_responses_compressed(self):
+        import gzip
+        app = self._create_app()
+        client = app.test_client()
+        with app.app_context():
+            for number in range(20):
+                case_query = CaseQuery(case_type='W.P.(C)', case_number=str(number), filing_year=2023, status='success')
+                db.session.add(case_query)
+                db.session.flush()
+                detail = CaseDetail(query_id=case_query.id, case_title=f'Case {number}')
+                db.session.add(detail)
+                db.session.flush()
+                db.session.add(CourtOrder(case_detail_id=detail.id, order_date=date(2023, 6, 1), order_type='Order'))
+            db.session.commit()
+
+        plain = client.get('/api/cases')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        response = client.get('/api/cases', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(response.data)), plain.get_json())
+
+        # Compression weakens the ETag; revalidation still matches it
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        repeat = client.get('/api/cases', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(repeat.status_code, 304)
+
+        small = client.get('/api/cases/1/freshness', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(small.status_code, 200)
+        self.assertNotIn('Content-Encoding', small.headers)
+
+        export = client.get('/api/export?format=ndjson', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(export.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', export.headers)
+        records = [json.loads(line) for line in gzip.decompress(export.data).decode('utf-8').splitlines()]
+        self.assertEqual(len(records), 20)
+
+class WarmupTestCase(unittest.TestCase):
+    """Test production warm-up and the readiness probe"""
+
+    def setUp(self):
+        self.db_dir = tempfile.mkdtemp()
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(self.db_dir, 'court_data.db')
+        self.app = create_app()
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        import shutil
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.engine.dispose()
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        shutil.rmtree(self.db_dir, ignore_errors=True)
+
+    def _seed(self):
+        """Case 1 searched 3 times and case 2 once, both stored; case 3 searched 5 times but never stored"""
+        with self.app.app_context():
+            ids = {}
+            for number in ('1', '2'):
+                case_query = CaseQuery(case_type='W.P.(C)', case_number=number, filing_year=2023, status='success')
+                db.session.add(case_query)
+                db.session.flush()
+                db.session.add(CaseDetail(query_id=case_query.id, case_title=f'Case {number}'))
+                ids[number] = case_query.id
+            for number, searches in (('1', 3), ('2', 1), ('3', 5)):
+                params = json.dumps({'case_type': 'W.P.(C)', 'case_number': number, 'filing_year': 2023})
+                for _ in range(searches):
+                    db.session.add(SearchLog(search_params=params, success=True))
+            db.session.add(SearchLog(search_params='not json', success=True))
+            db.session.commit()
+            return ids
+
+    def test_ready_without_warmup(self):
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['ready'])
+        self.assertFalse(response.get_json()['warmup']['required'])
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+
+    def test_hot_case_keys_by_search_count(self):
+        import warmup
+        self._seed()
+        with self.app.app_context():
+            keys = warmup.hot_case_keys(limit=10)
+            self.assertEqual(keys[:3], [('W.P.(C)', '3', 2023), ('W.P.(C)', '1', 2023), ('W.P.(C)', '2', 2023)])
+            self.assertEqual(warmup.hot_case_keys(limit=1), [('W.P.(C)', '3', 2023)])
+
+    def test_prepare_then_warm_worker(self):
+        from unittest import mock
+        from http_cache import response_cache
+        import warmup
+        self._seed()
+        response_cache.invalidate()
+
+        with mock.patch('warmup.warm_browser', return_value='/usr/bin/chromedriver'):
+            warmup.prepare_app(self.app)
+        steps = self.app.extensions['warmup'].snapshot()['steps']
+        self.assertTrue(steps['templates']['ok'])
+        self.assertGreaterEqual(steps['templates']['detail'], 5)
+        self.assertEqual(steps['hot_cases']['detail'], 2)
+        self.assertEqual(steps['browser']['detail'], '/usr/bin/chromedriver')
+        self.assertEqual(len(response_cache), 2)
+
+        # Forked but not yet warmed: keep traffic away
+        self.assertEqual(self.client.get('/ready').status_code, 503)
+
+        with mock.patch('warmup.warm_parsing_pool', side_effect=RuntimeError('no processes')):
+            self.assertTrue(warmup.warm_worker(self.app))
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 200)
+        steps = response.get_json()['warmup']['steps']
+        self.assertEqual(steps['database']['detail'], 5)
+        # A failed optional step is reported but does not hold back readiness
+        self.assertFalse(steps['parsing_pool']['ok'])
+
+    def test_not_ready_when_database_warmup_fails(self):
+        from unittest import mock
+        import warmup
+        with mock.patch('warmup.warm_browser', return_value=None):
+            warmup.prepare_app(self.app)
+        with mock.patch('warmup.warm_database', side_effect=RuntimeError('database down')), \
+                mock.patch('warmup.warm_parsing_pool', return_value=0):
+            self.assertFalse(warmup.warm_worker(self.app))
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['warmup']['steps']['database']['detail'], 'database down')
+
+class ResultModelTestCase(unittest.TestCase):
+    """Test the typed, normalized scrape result model"""
+
+    def test_normalizes_scraper_dicts(self):
+        from results import parse_date
+        result = CaseResult.from_scraper({
+            'success': True,
+            'case_details': {'case_title': '  Alpha Ltd vs State ', 'filing_date': '15/01/2023',
+                             'next_hearing': '20/02/2024', 'petitioner': None},
+            'orders': [{'order_title': 'Order 1', 'order_date': '2023-06-10'}, {'order_date': '31/02/2023'}],
+            'raw_html': '<html></html>'
+        })
+        self.assertTrue(result.success)
+        self.assertEqual(result.case_details.case_title, 'Alpha Ltd vs State')
+        self.assertEqual(result.case_details.petitioner, '')
+        self.assertEqual(result.case_details.next_hearing_date, date(2024, 2, 20))
+        self.assertEqual(result.orders[0].order_date, date(2023, 6, 10))
+        self.assertIsNone(result.orders[1].order_date)
+        self.assertEqual(result.orders[1].order_type, 'Order')
+        self.assertEqual(parse_date(datetime(2023, 1, 2, 10, 30)), date(2023, 1, 2))
+
+        body = result.to_dict()
+        self.assertEqual(body['case_details']['filing_date'], '15/01/2023')
+        self.assertEqual(body['case_details']['next_hearing_date'], '20/02/2024')
+        self.assertNotIn('raw_html', body)
+        self.assertEqual(body['orders'][1]['order_date'], '')
+        self.assertFalse(hasattr(result.orders[0], '__dict__'))
+
+        # Mock data carries dates as date objects under next_hearing_date
+        mock = CaseResult.from_scraper(get_mock_case_data('W.P.(C)', '1', 2023))
+        self.assertEqual(mock.to_dict()['case_details']['next_hearing_date'], '20/02/2024')
+
+    def test_errors(self):
+        failure = CaseResult.from_scraper({'error': 'CAPTCHA detected in response'})
+        self.assertFalse(failure.success)
+        self.assertEqual(failure.to_dict(), {'success': False, 'error': 'CAPTCHA detected in response'})
+        self.assertEqual(CaseResult.from_scraper({'success': True}).error, 'No case details in result')
+        self.assertTrue(CaseResult.failure('open', circuit_open=True).circuit_open)
+
+    def test_keeps_only_a_snapshot_of_the_page(self):
+        from unittest import mock
+        from config import Config
+        page = '<html>' + 'x' * 5000 + '</html>'
+        with mock.patch.object(Config, 'RAW_SNAPSHOT_MAX_CHARS', 1024):
+            result = CaseResult.from_scraper({'success': True, 'case_details': {'case_title': 'Big'},
+                                              'raw_html': page})
+            self.assertEqual(result.raw_snapshot, page[:1024])
+        with mock.patch.object(Config, 'RAW_SNAPSHOT_MAX_CHARS', 0):
+            result = CaseResult.from_scraper({'success': True, 'case_details': {'case_title': 'Big'},
+                                              'raw_html': page})
+            self.assertEqual(result.raw_snapshot, '')
+
+    def test_api_search_serves_normalized_result(self):
+        from unittest import mock
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+
+        class FakeScraper:
+            def search_case(self, case_type, case_number, filing_year, progress=None):
+                return {'success': True,
+                        'case_details': {'case_title': 'Live Case', 'next_hearing': '01/03/2024'},
+                        'orders': [{'order_title': 'Order', 'order_date': '10/06/2023'}],
+                        'raw_html': '<html>live</html>'}
+
+        with mock.patch('scraper.DelhiHighCourtScraper', FakeScraper):
+            response = app.test_client().post('/api/search', json={
+                'case_type': 'W.P.(C)', 'case_number': '77', 'filing_year': '2023'})
+        data = response.get_json()
+        self.assertEqual(data['case_details']['next_hearing_date'], '01/03/2024')
+        self.assertNotIn('next_hearing', data['case_details'])
+        self.assertEqual(data['orders'][0]['order_date'], '10/06/2023')
+        with app.app_context():
+            case_query = CaseQuery.query.one()
+            details = case_query.case_details
+            self.assertEqual(details.next_hearing_date, date(2024, 3, 1))
+            self.assertEqual(details.raw_response, '<html>live</html>')
+            self.assertEqual(CaseResult.from_model(case_query).to_dict()['orders'], data['orders'])
+            db.session.remove()
+            db.drop_all()
+
+SEARCH_PAGE_HTML = """<html><body>
+<form method="post" action="/case-status">
+  <select id="case_type_select" name="case_type"><option>W.P.(C)</option></select>
+  <input id="case_number_input" name="case_number" placeholder="Case number">
+  <input id="filing_year_input" name="filing_year" placeholder="Year">
+  <button type="submit">Search</button>
+</form>
+</body></html>"""
+
+RESULTS_PAGE_HTML = """<html><body>
+<h2 class="case-title">Alpha Ltd vs State of Delhi</h2>
+<table class="parties">
+  <tr><td>Petitioner</td><td>Alpha Ltd</td></tr>
+  <tr><td>Respondent</td><td>State of Delhi</td></tr>
+</table>
+<table class="orders">
+  <tr><th>Date</th><th>Order</th></tr>
+  <tr class="order-row"><td>10/06/2023</td><td>Interim order <a href="/orders/1.pdf">PDF</a></td></tr>
+  <tr class="order-row"><td>02/09/2023</td><td>Final judgment pronounced <a href="/orders/2.pdf">PDF</a></td></tr>
+</table>
+</body></html>"""
+
+class FakeWebDriver:
+    """Serves fixture pages and counts every WebDriver command (one chromedriver HTTP round-trip each)"""
+
+    def __init__(self, pages):
+        from collections import Counter
+        self.pages = pages
+        self.html = ''
+        self.calls = Counter()
+        self.typed = {}
+
+    @property
+    def round_trips(self):
+        return sum(self.calls.values())
+
+    def get(self, url):
+        self.calls['get'] += 1
+        self.html = self.pages['search']
+
+    @property
+    def page_source(self):
+        self.calls['page_source'] += 1
+        return self.html
+
+    def _xpath(self, by, value):
+        import lxml.html
+        from selenium.webdriver.common.by import By
+        xpath = f"//*[@name='{value}']" if by == By.NAME else value
+        return lxml.html.fromstring(self.html).xpath(xpath)
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        self.calls['find_element'] += 1
+        nodes = self._xpath(by, value)
+        if not nodes:
+            raise NoSuchElementException(value)
+        return FakeWebElement(self, nodes[0])
+
+    def find_elements(self, by, value):
+        self.calls['find_elements'] += 1
+        return [FakeWebElement(self, node) for node in self._xpath(by, value)]
+
+    def quit(self):
+        pass
+
+class FakeWebElement:
+    def __init__(self, driver, node):
+        self.driver = driver
+        self.node = node
+
+    @property
+    def text(self):
+        self.driver.calls['element_text'] += 1
+        return ' '.join(' '.join(self.node.itertext()).split())
+
+    def is_displayed(self):
+        self.driver.calls['is_displayed'] += 1
+        return True
+
+    def is_enabled(self):
+        self.driver.calls['is_enabled'] += 1
+        return True
+
+    def clear(self):
+        self.driver.calls['clear'] += 1
+
+    def send_keys(self, value):
+        self.driver.calls['send_keys'] += 1
+        self.driver.typed[self.node.get('name')] = value
+
+    def click(self):
+        self.driver.calls['click'] += 1
+        self.driver.html = self.driver.pages['results']
+
+class SnapshotExtractionTestCase(unittest.TestCase):
+    """Test that WebDriver searches extract results from one page snapshot"""
+
+    def setUp(self):
+        from unittest import mock
+        from scraper import DelhiHighCourtScraper
+        self.driver = FakeWebDriver({'search': SEARCH_PAGE_HTML, 'results': RESULTS_PAGE_HTML})
+        patches = [
+            mock.patch('scraper.time.sleep'),
+            mock.patch('scraper._find_chrome_installation', return_value=True),
+            mock.patch('scraper.get_endpoint_pool', return_value=None),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.scraper = DelhiHighCourtScraper()
+        self.scraper.rate_limiter = mock.Mock(acquire=mock.Mock(return_value=True))
+        self.scraper.driver = self.driver
+
+    def test_search_round_trips(self):
+        result = self.scraper._search_with_webdriver('W.P.(C)', '1234', 2023)
+        self.assertTrue(result['success'])
+        self.assertEqual(self.driver.typed, {'case_type': 'W.P.(C)', 'case_number': '1234', 'filing_year': '2023'})
+        self.assertEqual(result['case_details']['case_title'], 'Alpha Ltd vs State of Delhi')
+        self.assertEqual(result['case_details']['petitioner'], 'Alpha Ltd')
+        self.assertEqual(result['case_details']['respondent'], 'State of Delhi')
+        self.assertEqual([order['order_date'] for order in result['orders']], ['10/06/2023', '02/09/2023'])
+        self.assertEqual(result['orders'][1]['order_type'], 'Judgment')
+        self.assertEqual(result['orders'][0]['pdf_url'], '/orders/1.pdf')
+        self.assertEqual(result['raw_html'], RESULTS_PAGE_HTML)
+
+        # Per-element extraction took 33 round-trips on this fixture (10 element.text reads alone);
+        # now: get, two snapshots, one lookup per field plus submit, clear x2, send_keys x3, click
+        self.assertEqual(self.driver.round_trips, 13)
+        self.assertEqual(self.driver.calls['page_source'], 2)
+        self.assertEqual(self.driver.calls['element_text'], 0)
+        self.assertEqual(self.driver.calls['find_elements'], 0)
+
+    def test_alternative_selectors_resolved_offline(self):
+        self.driver.pages['search'] = (SEARCH_PAGE_HTML.replace(' name="case_number"', '')
+                                       .replace(' name="filing_year"', ''))
+        result = self.scraper._search_with_webdriver('W.P.(C)', '1234', 2023)
+        self.assertTrue(result['success'])
+        self.assertEqual(self.driver.typed, {'case_type': 'W.P.(C)', None: '2023'})
+        # Fallback selectors cost nothing extra: still one find_element per field
+        self.assertEqual(self.driver.calls['find_element'], 4)
+
+    def test_captcha_detected_from_snapshot(self):
+        self.driver.pages['search'] = SEARCH_PAGE_HTML.replace('</form>', '<img src="/captcha.png"></form>')
+        result = self.scraper._search_with_webdriver('W.P.(C)', '1234', 2023)
+        self.assertIn('CAPTCHA', result['error'])
+        self.assertEqual(self.driver.round_trips, 2)
+
+    def test_parse_snapshot_without_orders(self):
+        from scraper import parse_snapshot
+        parsed = parse_snapshot('<html><body><div class="case-title"> Beta  vs  Union </div></body></html>')
+        self.assertEqual(parsed['case_details']['case_title'], 'Beta vs Union')
+        self.assertEqual(parsed['case_details']['petitioner'], 'Sample Petitioner')
+        self.assertEqual(len(parsed['orders']), 2)  # placeholder orders, as before
+        self.assertFalse(parse_snapshot('')['captcha'])
+
+    def test_not_found_page_detection(self):
+        from scraper import parse_snapshot, parse_search_results
+        not_found = '<html><body><div class="message">No records found for the given case</div></body></html>'
+        self.assertEqual(parse_snapshot(not_found), {'captcha': False, 'not_found': True})
+        self.assertEqual(parse_search_results(not_found), {'captcha': False, 'not_found': True})
+
+        empty_case = ('<html><body><div class="case-title">Beta vs Union</div>'
+                      '<table><tr><td>No records found</td></tr></table></body></html>')
+        self.assertNotIn('not_found', parse_snapshot(empty_case))
+        in_script = '<html><body><script>var empty = "No records found";</script><p>Loading</p></body></html>'
+        self.assertNotIn('not_found', parse_snapshot(in_script))
+
+class BrowserProfileTestCase(unittest.TestCase):
+    """Test the lean browser profile: page-load strategy, request blocking and cache slots"""
+
+    def setUp(self):
+        from browser_profile import LeanProfile
+        self.cache_dir = tempfile.mkdtemp()
+        self.profile = LeanProfile(enabled=True, page_load_strategy='eager',
+                                   block_resource_types=['image', 'stylesheet'],
+                                   blocked_urls=['*google-analytics.com*'],
+                                   allowed_hosts=['delhihighcourt.nic.in'],
+                                   cache_dir=self.cache_dir, cache_size=1024)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _options(self):
+        from selenium.webdriver.chrome.options import Options
+        return Options()
+
+    def test_options_for_local_browser(self):
+        options = self._options()
+        slot = self.profile.apply_options(options)
+        self.assertEqual(options.page_load_strategy, 'eager')
+        self.assertIn('--blink-settings=imagesEnabled=false', options.arguments)
+        self.assertIn('--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE delhihighcourt.nic.in', options.arguments)
+        self.assertIn(f'--disk-cache-dir={slot}', options.arguments)
+        self.assertIn('--disk-cache-size=1024', options.arguments)
+        self.assertTrue(slot.startswith(self.cache_dir))
+        self.profile.release(slot)
+
+    def test_cache_slots_are_exclusive_and_reused(self):
+        first = self.profile.apply_options(self._options())
+        second = self.profile.apply_options(self._options())
+        self.assertNotEqual(first, second)
+        self.profile.release(first)
+        self.assertEqual(self.profile.apply_options(self._options()), first)
+
+    def test_remote_and_disabled_profiles(self):
+        options = self._options()
+        self.assertIsNone(self.profile.apply_options(options, local=False))
+        self.assertFalse(any(arg.startswith('--disk-cache') for arg in options.arguments))
+
+        from browser_profile import LeanProfile
+        options = self._options()
+        disabled = LeanProfile(enabled=False, cache_dir=self.cache_dir)
+        self.assertIsNone(disabled.apply_options(options))
+        self.assertEqual(options.page_load_strategy, 'normal')
+        self.assertEqual(options.arguments, [])
+        self.assertFalse(disabled.apply_session(object()))
+
+    def test_invalid_settings_rejected(self):
+        from browser_profile import LeanProfile
+        with self.assertRaises(ValueError):
+            LeanProfile(page_load_strategy='fast', cache_dir='')
+        with self.assertRaises(ValueError):
+            LeanProfile(block_resource_types=['video'], cache_dir='')
+
+    def test_session_blocks_urls_over_cdp(self):
+        class LocalDriver:
+            def __init__(self):
+                self.commands = []
+
+            def execute_cdp_cmd(self, cmd, params):
+                self.commands.append((cmd, params))
+
+        driver = LocalDriver()
+        self.assertTrue(self.profile.apply_session(driver))
+        self.assertEqual(driver.commands[0], ('Network.enable', {}))
+        cmd, params = driver.commands[1]
+        self.assertEqual(cmd, 'Network.setBlockedURLs')
+        for pattern in ('*.png', '*.png?*', '*.css', '*google-analytics.com*'):
+            self.assertIn(pattern, params['urls'])
+        self.assertNotIn('*.js', params['urls'])
+
+    def test_session_blocks_urls_on_remote_driver(self):
+        class Executor:
+            _commands = {}
+
+        class RemoteDriver:
+            command_executor = Executor()
+
+            def __init__(self):
+                self.executed = []
+
+            def execute(self, command, params):
+                self.executed.append((command, params['cmd']))
+                return {'value': {}}
+
+        driver = RemoteDriver()
+        self.assertTrue(self.profile.apply_session(driver))
+        self.assertIn('executeCdpCommand', Executor._commands)
+        self.assertEqual(driver.executed[-1], ('executeCdpCommand', 'Network.setBlockedURLs'))
+
+    def test_scraper_applies_profile_and_releases_slot(self):
+        from unittest import mock
+        import scraper
+        drivers = []
+
+        class FakeChrome:
+            def __init__(self, options):
+                self.options = options
+                self.commands = []
+                drivers.append(self)
+
+            def execute_cdp_cmd(self, cmd, params):
+                self.commands.append(cmd)
+
+            def quit(self):
+                pass
+
+        def start(instance, options):
+            instance.driver = FakeChrome(options)
+            return True
+
+        with mock.patch('scraper.get_lean_profile', return_value=self.profile), \
+                mock.patch('scraper.get_endpoint_pool', return_value=None), \
+                mock.patch.object(scraper.DelhiHighCourtScraper, '_start_local_driver', start):
+            instance = scraper.DelhiHighCourtScraper()
+            self.assertTrue(instance.setup_driver())
+            slot = instance.cache_slot
+            self.assertIn(f'--disk-cache-dir={slot}', drivers[0].options.arguments)
+            self.assertIn('Network.setBlockedURLs', drivers[0].commands)
+            instance.close_driver()
+            self.assertIsNone(instance.cache_slot)
+            self.assertEqual(self.profile.apply_options(self._options()), slot)
+
+class FakeSharedDriver:
+    """One browser session with several windows; CDP browser contexts own the windows they create"""
+
+    def __init__(self):
+        import itertools
+        self.windows = {'main': ''}
+        self.context_of = {}
+        self.current_window_handle = 'main'
+        self.switch_to = self
+        self.switches = 0
+        self.quits = 0
+        self.load_time = 0  # seconds each page takes to reach readyState complete
+        self.loaded_at = {}
+        self.marked = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def window_handles(self):
+        return list(self.windows)
+
+    def window(self, handle):
+        if handle not in self.windows:
+            raise RuntimeError(f'no such window: {handle}')
+        self.current_window_handle = handle
+        self.switches += 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Target.createBrowserContext':
+            return {'browserContextId': f'ctx-{next(self._ids)}'}
+        if cmd == 'Target.createTarget':
+            target = f'tab-{next(self._ids)}'
+            self.windows[target] = params['url']
+            self.context_of[target] = params['browserContextId']
+            return {'targetId': target}
+        if cmd == 'Target.disposeBrowserContext':
+            for target, context in list(self.context_of.items()):
+                if context == params['browserContextId']:
+                    del self.windows[target], self.context_of[target]
+        return {}
+
+    def get(self, url):
+        # pageLoadStrategy none: returns once the navigation starts, with a new document
+        import time as time_module
+        handle = self.current_window_handle
+        self.windows[handle] = url
+        self.marked.discard(handle)
+        self.loaded_at[handle] = time_module.monotonic() + self.load_time
+
+    def execute_script(self, script):
+        import time as time_module
+        from browser_pool import MARK_SCRIPT, READY_SCRIPT
+        handle = self.current_window_handle
+        if script == MARK_SCRIPT:
+            self.marked.add(handle)
+        elif script == READY_SCRIPT:
+            if handle in self.marked:
+                return 'unloaded'
+            return 'complete' if time_module.monotonic() >= self.loaded_at.get(handle, 0) else 'loading'
+
+    @property
+    def page_source(self):
+        return self.windows[self.current_window_handle]
+
+    def quit(self):
+        self.quits += 1
+
+class BrowserTabPoolTestCase(unittest.TestCase):
+    """Test concurrent searches sharing browsers through tabs"""
+
+    def setUp(self):
+        from browser_profile import LeanProfile
+        self.drivers = []
+        self.profile = LeanProfile(enabled=False, cache_dir='')
+
+    def _pool(self, max_browsers=1, tabs_per_browser=3):
+        from browser_pool import BrowserPool
+        test = self
+
+        class Owner:
+            def __init__(self):
+                self.driver = FakeSharedDriver()
+                test.drivers.append(self.driver)
+
+            def close_driver(self):
+                self.driver.quit()
+
+        return BrowserPool(Owner, max_browsers=max_browsers, tabs_per_browser=tabs_per_browser, profile=self.profile)
+
+    def test_tabs_keep_their_own_page(self):
+        pool = self._pool()
+        first, second = pool.acquire(), pool.acquire()
+        self.assertEqual(len(self.drivers), 1)
+        self.assertNotEqual(first.handle, second.handle)
+        first.get('https://example.test/a')
+        second.get('https://example.test/b')
+        self.assertEqual(first.page_source, 'https://example.test/a')
+        self.assertEqual(second.page_source, 'https://example.test/b')
+        switches = self.drivers[0].switches
+        self.assertEqual(second.page_source, 'https://example.test/b')
+        self.assertEqual(self.drivers[0].switches, switches)  # already on that window: no switch
+
+        pool.release(first)
+        self.assertNotIn(first.handle, self.drivers[0].windows)  # its browser context is disposed
+        self.assertEqual(second.page_source, 'https://example.test/b')
+        pool.release(second)
+        self.assertEqual(self.drivers[0].window_handles, ['main'])
+
+    def test_tab_limit_and_extra_browsers(self):
+        pool = self._pool(max_browsers=2, tabs_per_browser=2)
+        tabs = [pool.acquire() for _ in range(4)]
+        self.assertEqual(len(self.drivers), 2)
+        self.assertEqual([browser['active_tabs'] for browser in pool.snapshot()], [2, 2])
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+        pool.release(tabs[0])
+        tab = pool.acquire(timeout=0.05)
+        self.assertIs(tab.browser, tabs[0].browser)
+        self.assertEqual(len(self.drivers), 2)
+        for tab in tabs[1:] + [tab]:
+            pool.release(tab)
+        pool.close()
+        self.assertEqual([driver.quits for driver in self.drivers], [1, 1])
+
+    def test_broken_browser_is_retired(self):
+        pool = self._pool()
+        tab = pool.acquire()
+
+        def crashed(cmd, params):
+            raise RuntimeError('chrome not reachable')
+
+        self.drivers[0].execute_cdp_cmd = crashed
+        pool.release(tab)
+        self.assertEqual(pool.snapshot(), [])
+        self.assertEqual(self.drivers[0].quits, 1)
+        pool.acquire()
+        self.assertEqual(len(self.drivers), 2)
+
+    def test_failed_tab_setup_returns_the_tab(self):
+        from unittest import mock
+        pool = self._pool(tabs_per_browser=1)
+        with mock.patch.object(self.profile, 'apply_session', side_effect=RuntimeError('target crashed')):
+            with self.assertRaises(RuntimeError):
+                pool.acquire()
+        self.assertEqual(pool.snapshot()[0]['active_tabs'], 0)
+        self.assertEqual(self.drivers[0].window_handles, ['main'])
+        # The slot is free again for the next search
+        tab = pool.acquire(timeout=0.05)
+        pool.release(tab)
+
+    def test_concurrent_searches_share_one_browser(self):
+        import threading
+        import time as time_module
+        pool = self._pool(max_browsers=1, tabs_per_browser=6)
+        seen, errors = {}, []
+
+        def lookup(index):
+            try:
+                tab = pool.acquire(timeout=5)
+                try:
+                    tab.get(f'https://example.test/{index}')
+                    time_module.sleep(0.01)  # other tabs run their commands meanwhile
+                    seen[index] = tab.page_source
+                finally:
+                    pool.release(tab)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lookup, args=(index,)) for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(seen, {index: f'https://example.test/{index}' for index in range(6)})
+        self.assertEqual(len(self.drivers), 1)
+        self.assertEqual(pool.snapshot()[0]['tabs_served'], 6)
+
+    def test_page_loads_overlap_across_tabs(self):
+        import threading
+        import time as time_module
+        pool = self._pool(max_browsers=1, tabs_per_browser=4)
+        tabs = [pool.acquire() for _ in range(4)]
+        self.drivers[0].load_time = 0.3
+        ready = []
+
+        def load(tab, index):
+            tab.get(f'https://example.test/{index}')
+            ready.append(self.drivers[0].loaded_at[tab.handle] <= time_module.monotonic())
+
+        started = time_module.monotonic()
+        threads = [threading.Thread(target=load, args=(tab, index)) for index, tab in enumerate(tabs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Each get() returned only once its page was ready, but no tab held the browser while waiting
+        self.assertEqual(ready, [True] * 4)
+        self.assertLess(time_module.monotonic() - started, 0.3 * 4)
+        for tab in tabs:
+            pool.release(tab)
+
+    def test_page_load_timeout(self):
+        from unittest import mock
+        from config import Config
+        pool = self._pool()
+        tab = pool.acquire()
+        self.drivers[0].load_time = 60
+        with mock.patch.object(Config, 'SEARCH_TIMEOUT', 0.3), self.assertRaises(TimeoutError):
+            tab.get('https://example.test/slow')
+        pool.release(tab)
+
+    def test_scraper_leases_tab_in_tab_mode(self):
+        from unittest import mock
+        import scraper
+        from config import Config
+        pool = self._pool()
+        with mock.patch.object(Config, 'BROWSER_TABS_PER_BROWSER', 3), \
+                mock.patch('browser_pool.get_browser_pool', return_value=pool):
+            instance = scraper.DelhiHighCourtScraper()
+            self.assertTrue(instance.setup_driver())
+            self.assertIs(instance.driver, instance.tab)
+            self.assertEqual(pool.snapshot()[0]['active_tabs'], 1)
+            instance.close_driver()
+        self.assertIsNone(instance.driver)
+        self.assertEqual(pool.snapshot()[0]['active_tabs'], 0)
+        self.assertEqual(self.drivers[0].quits, 0)  # the shared browser keeps running
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
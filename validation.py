@@ -0,0 +1,89 @@
+"""
+Checks that run before a lookup reaches the court website.
+
+normalize_case_key() rejects malformed keys outright: the case type must be
+one of Config.CASE_TYPES (a dict lookup, case-insensitive), the case number
+1-7 digits and the filing year between 1900 and this year.
+
+Keys that pass but that the court reports as not found go into a
+NegativeCache for NEGATIVE_CACHE_TTL seconds, so repeated misses (typically
+bots retrying junk keys) are answered without starting a browser.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from config import Config
+
+# Upper-cased type -> the spelling the court's form expects
+CASE_TYPE_LOOKUP = {case_type.upper(): case_type for case_type in Config.CASE_TYPES}
+CASE_NUMBER_PATTERN = re.compile(r'^\d{1,7}$')
+NOT_FOUND_ERROR = 'No case matching this case type, number and year was found on the court website.'
+
+def normalize_case_key(case_type, case_number, filing_year):
+    """(case_type, case_number, filing_year) in canonical form; raises ValueError with a user-facing message"""
+    canonical_type = CASE_TYPE_LOOKUP.get(str(case_type).strip().upper())
+    if canonical_type is None:
+        raise ValueError(f'Unknown case type: {case_type}')
+    case_number = str(case_number).strip()
+    if not CASE_NUMBER_PATTERN.match(case_number):
+        raise ValueError('Case number must be 1 to 7 digits.')
+    try:
+        filing_year = int(str(filing_year).strip())
+    except ValueError:
+        raise ValueError('Please enter a valid filing year.') from None
+    if filing_year < 1900 or filing_year > datetime.now().year:
+        raise ValueError('Please enter a valid filing year.')
+    # 0042 and 42 are the same case
+    return canonical_type, str(int(case_number)), filing_year
+
+class NegativeCache:
+    """Case keys the court reported as not found, each remembered for ttl seconds (LRU beyond max_entries)"""
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = Config.NEGATIVE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.NEGATIVE_CACHE_MAX_ENTRIES
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def add(self, key):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._expires[key] = time.monotonic() + self.ttl
+            self._expires.move_to_end(key)
+            while len(self._expires) > self.max_entries:
+                self._expires.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._expires[key]
+                return False
+            self.hits += 1
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._expires.pop(key, None)
+
+    def __len__(self):
+        return len(self._expires)
+
+_negative_cache = None
+_negative_cache_lock = threading.Lock()
+
+def get_negative_cache():
+    """Return the process-wide negative cache"""
+    global _negative_cache
+    with _negative_cache_lock:
+        if _negative_cache is None:
+            _negative_cache = NegativeCache()
+        return _negative_cache
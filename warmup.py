@@ -0,0 +1,175 @@
+"""
+Pre-warming for production workers (see wsgi.py and gunicorn.conf.py).
+
+prepare_app() runs once in the gunicorn master before workers fork, so what it
+warms is shared copy-on-write: compiled templates, the ChromeDriver lookup
+and rendered pages for the most-searched cases. warm_worker() runs in each
+worker after the fork for what must not cross it: database connections, the
+HTML parsing pool and the async scraper's HTTP connections. /ready answers
+503 until warm_worker() has finished.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+
+from config import Config
+from models import db, CaseQuery, CaseDetail, SearchLog
+
+logger = logging.getLogger(__name__)
+
+class WarmupState:
+    """Outcome of each warm-up step, and whether this process may take traffic"""
+
+    def __init__(self, required=False):
+        # Processes not started through wsgi.py (dev server, tests) are ready as soon as they exist
+        self.required = required
+        self.ready = not required
+        self.steps = {}
+        self._lock = threading.Lock()
+
+    def record(self, step, seconds, ok, detail=None):
+        with self._lock:
+            self.steps[step] = {'ok': ok, 'seconds': round(seconds, 3), 'detail': detail}
+
+    def snapshot(self):
+        with self._lock:
+            return {'required': self.required, 'ready': self.ready, 'steps': dict(self.steps)}
+
+def _run_step(state, step, func, *args):
+    """Run one warm-up step; failures are recorded and logged, never raised. Returns success"""
+    start = time.monotonic()
+    try:
+        detail = func(*args)
+        ok = True
+    except Exception as e:
+        detail, ok = str(e), False
+        logger.warning(f"Warm-up step {step} failed: {str(e)}")
+    state.record(step, time.monotonic() - start, ok, detail)
+    return ok
+
+def warm_templates(app):
+    """Compile every template into the Jinja cache; returns the count"""
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+def hot_case_keys(limit):
+    """Most-searched (case_type, case_number, filing_year) keys in the search log"""
+    hits = db.func.count(SearchLog.id)
+    rows = db.session.query(SearchLog.search_params, hits).filter(
+        SearchLog.success.is_(True), SearchLog.search_params.isnot(None)
+    ).group_by(SearchLog.search_params).order_by(hits.desc()).limit(limit).all()
+    keys = []
+    for search_params, _ in rows:
+        try:
+            params = json.loads(search_params)
+            keys.append((params['case_type'], params['case_number'], int(params['filing_year'])))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return keys
+
+def warm_hot_cases(app, limit=None):
+    """Render the results page of the hottest stored cases into the response cache; returns the count"""
+    limit = Config.WARMUP_HOT_CASES if limit is None else limit
+    with app.app_context():
+        query_ids = []
+        for case_type, case_number, filing_year in hot_case_keys(limit):
+            query_id = db.session.query(CaseQuery.id).join(CaseDetail).filter(
+                CaseQuery.case_type == case_type,
+                CaseQuery.case_number == case_number,
+                CaseQuery.filing_year == filing_year
+            ).order_by(CaseQuery.id.desc()).limit(1).scalar()
+            if query_id is not None:
+                query_ids.append(query_id)
+        db.session.remove()
+
+    client = app.test_client()
+    return sum(client.get(f'/cases/{query_id}').status_code == 200 for query_id in query_ids)
+
+def warm_database(app, connections=None):
+    """Open the pool's connections up front so the first requests do not pay for connecting"""
+    connections = connections or Config.WARMUP_DB_CONNECTIONS
+    with app.app_context():
+        # Held open together so the pool ends up with `connections` distinct connections
+        opened = []
+        try:
+            for _ in range(connections):
+                connection = db.engine.connect()
+                opened.append(connection)
+                connection.execute(text('SELECT 1'))
+        finally:
+            for connection in opened:
+                connection.close()
+    return len(opened)
+
+def warm_browser():
+    """Resolve ChromeDriver locally, or check the remote WebDriver endpoints answer"""
+    from browser_farm import get_endpoint_pool
+    pool = get_endpoint_pool()
+    if pool is None:
+        from scraper import warm_chromedriver
+        return warm_chromedriver()
+
+    import requests
+    status = {}
+    for endpoint in pool.snapshot():
+        try:
+            status[endpoint['url']] = requests.get(endpoint['url'].rstrip('/') + '/status', timeout=5).ok
+        except requests.RequestException:
+            status[endpoint['url']] = False
+    return status
+
+def warm_browser_pool():
+    """Start the first shared browser so the first search only opens a tab; returns the pool's state"""
+    from browser_pool import get_browser_pool
+    pool = get_browser_pool()
+    pool.release(pool.acquire(timeout=Config.SEARCH_TIMEOUT))
+    return pool.snapshot()
+
+def warm_parsing_pool():
+    """Start the HTML parsing worker processes; returns their count"""
+    from parse_pool import get_parsing_service
+    return get_parsing_service().start().max_workers
+
+def warm_http():
+    """Start the async scraper's event loop and open a connection to the court site"""
+    from async_scraper import get_async_runner
+    runner = get_async_runner()
+    if not Config.WARMUP_PRECONNECT:
+        return 'started'
+    return runner.submit(runner.scraper.preconnect()).result(timeout=10)
+
+def prepare_app(app):
+    """Pre-fork warm-up in the master; marks the app as needing warm_worker() before it is ready"""
+    state = app.extensions['warmup']
+    state.required, state.ready = True, False
+    _run_step(state, 'templates', warm_templates, app)
+    _run_step(state, 'hot_cases', warm_hot_cases, app)
+    if not app.config['READ_ONLY'] and Config.SCRAPER_ENGINE != 'async':
+        _run_step(state, 'browser', warm_browser)
+    with app.app_context():
+        # Connections opened here must not be shared with the forked workers
+        db.engine.dispose()
+    logger.info(f"Pre-fork warm-up finished: {state.snapshot()['steps']}")
+
+def warm_worker(app):
+    """Post-fork warm-up in each worker; the worker is ready once its database connections work"""
+    state = app.extensions['warmup']
+    with app.app_context():
+        # Drop pooled connections inherited from the master without closing its sockets
+        db.engine.dispose(close=False)
+    ready = _run_step(state, 'database', warm_database, app)
+    if not app.config['READ_ONLY']:
+        _run_step(state, 'parsing_pool', warm_parsing_pool)
+        if Config.SCRAPER_ENGINE == 'async':
+            _run_step(state, 'http', warm_http)
+        elif Config.BROWSER_TABS_PER_BROWSER > 1:
+            _run_step(state, 'browser_pool', warm_browser_pool)
+    state.ready = ready
+    logger.info(f"Worker warm-up finished (ready={ready})")
+    return ready
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Standalone scraper worker for Court Data Fetcher.
+
+Workers claim pending ScrapeJob rows with a compare-and-set lease, keep the
+lease alive with heartbeats while the browser runs, and store results through
+persistence.py. A job whose lease expires (its worker crashed or lost the
+database) is requeued by the next worker to poll, up to WORKER_MAX_ATTEMPTS.
+
+Run any number of workers, on any host, against the application database:
+    python worker.py [--worker-id ID] [--max-jobs N] [--exit-when-idle]
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from config import Config
+from database import insert_ignore, is_postgres
+from models import db, ACTIVE_JOB_WHERE, CaseQuery, ScrapeJob
+from persistence import save_case_details, refresh_case_details
+from results import CaseResult
+from validation import NOT_FOUND_ERROR, get_negative_cache
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+def enqueue_job(case_type, case_number, filing_year, query_id=None):
+    """Queue a lookup for the workers, reusing an active job for the same case (caller commits)"""
+    # ON CONFLICT against uq_scrape_job_active_case: concurrent enqueues of a case create one job
+    insert_ignore(ScrapeJob.__table__, {
+        'case_type': case_type, 'case_number': case_number, 'filing_year': filing_year,
+        'query_id': query_id, 'status': 'pending', 'attempts': 0,
+    }, index_elements=['case_type', 'case_number', 'filing_year'], index_where=ACTIVE_JOB_WHERE)
+    return ScrapeJob.query.filter(
+        ScrapeJob.case_type == case_type,
+        ScrapeJob.case_number == case_number,
+        ScrapeJob.filing_year == filing_year,
+        ScrapeJob.status.in_(ACTIVE_STATUSES)
+    ).one()
+
+def requeue_expired(now=None):
+    """Release leases that expired without a heartbeat; jobs out of attempts fail. Returns (requeued, failed)"""
+    now = now or datetime.utcnow()
+    expired = db.and_(ScrapeJob.status == 'running', ScrapeJob.lease_expires_at < now)
+    failed = ScrapeJob.query.filter(expired, ScrapeJob.attempts >= Config.WORKER_MAX_ATTEMPTS).update({
+        'status': 'failed', 'lease_owner': None, 'lease_expires_at': None, 'finished_at': now,
+        'error_message': 'Lease expired too many times'
+    }, synchronize_session=False)
+    requeued = ScrapeJob.query.filter(expired).update({
+        'status': 'pending', 'lease_owner': None, 'lease_expires_at': None
+    }, synchronize_session=False)
+    db.session.commit()
+    if requeued or failed:
+        logger.warning(f"Requeued {requeued} and failed {failed} scrape jobs with expired leases")
+    return requeued, failed
+
+def claim_job(worker_id, lease_seconds=None):
+    """Lease the oldest pending job to worker_id; None if there is nothing to do"""
+    lease_seconds = lease_seconds or Config.WORKER_LEASE_SECONDS
+    pending = db.session.query(ScrapeJob.id).filter_by(status='pending').order_by(ScrapeJob.id).limit(1)
+    if is_postgres():
+        # Row locks let workers claim different jobs at once instead of racing for the oldest
+        pending = pending.with_for_update(skip_locked=True)
+    while True:
+        candidate = pending.scalar()
+        if candidate is None:
+            db.session.commit()
+            return None
+        now = datetime.utcnow()
+        # Compare-and-set: only one worker's UPDATE can still see the job as pending
+        claimed = ScrapeJob.query.filter_by(id=candidate, status='pending').update({
+            'status': 'running',
+            'lease_owner': worker_id,
+            'lease_expires_at': now + timedelta(seconds=lease_seconds),
+            'heartbeat_at': now,
+            'attempts': ScrapeJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed == 1:
+            return db.session.get(ScrapeJob, candidate)
+
+def heartbeat(job_id, worker_id, lease_seconds=None):
+    """Extend worker_id's lease on a job; False if the lease was lost"""
+    lease_seconds = lease_seconds or Config.WORKER_LEASE_SECONDS
+    now = datetime.utcnow()
+    extended = ScrapeJob.query.filter_by(id=job_id, status='running', lease_owner=worker_id).update({
+        'lease_expires_at': now + timedelta(seconds=lease_seconds),
+        'heartbeat_at': now
+    }, synchronize_session=False)
+    db.session.commit()
+    return extended == 1
+
+def _release(job_id, worker_id, values):
+    """Finish a job if worker_id still holds its lease; the caller's writes join the same transaction"""
+    values = dict(values, lease_owner=None, lease_expires_at=None)
+    return ScrapeJob.query.filter_by(id=job_id, status='running', lease_owner=worker_id).update(
+        values, synchronize_session=False) == 1
+
+def complete_job(job_id, worker_id, result):
+    """Store a CaseResult and mark the job done; False (nothing stored) if the lease was lost"""
+    if not _release(job_id, worker_id, {'status': 'done', 'finished_at': datetime.utcnow(), 'error_message': None}):
+        db.session.rollback()
+        return False
+    job = db.session.get(ScrapeJob, job_id)
+    case_query = db.session.get(CaseQuery, job.query_id) if job.query_id else None
+    if case_query is None:
+        case_query = CaseQuery(case_type=job.case_type, case_number=job.case_number,
+                               filing_year=job.filing_year, status='success')
+        db.session.add(case_query)
+        db.session.flush()
+        save_case_details(case_query, result)
+        job.query_id = case_query.id
+    else:
+        refresh_case_details(case_query, result)
+        case_query.status = 'success'
+    db.session.commit()
+    return True
+
+def fail_job(job_id, worker_id, error, retry=True, throttled=False):
+    """
+    Requeue a failed lookup, or fail the job once it is out of attempts (or
+    retry is False). A throttled lookup never reached the court site, so it is
+    requeued without using up an attempt.
+    """
+    job = db.session.get(ScrapeJob, job_id)
+    if throttled:
+        values = {'status': 'pending', 'error_message': error, 'attempts': ScrapeJob.attempts - 1}
+    elif not retry or job.attempts >= Config.WORKER_MAX_ATTEMPTS:
+        values = {'status': 'failed', 'finished_at': datetime.utcnow(), 'error_message': error}
+    else:
+        values = {'status': 'pending', 'error_message': error}
+    released = _release(job_id, worker_id, values)
+    db.session.commit()
+    return released
+
+class ScrapeWorker:
+    """Claims and processes ScrapeJobs one at a time, with one scraper per worker"""
+
+    def __init__(self, app, worker_id=None, scrape=None, lease_seconds=None, heartbeat_seconds=None,
+                 poll_interval=None):
+        self.app = app
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds or Config.WORKER_LEASE_SECONDS
+        self.heartbeat_seconds = heartbeat_seconds or Config.WORKER_HEARTBEAT_SECONDS
+        self.poll_interval = Config.WORKER_POLL_INTERVAL if poll_interval is None else poll_interval
+        self._scrape = scrape
+        self._stop = threading.Event()
+
+    def scrape(self, case_type, case_number, filing_year):
+        negative_cache = get_negative_cache()
+        if (case_type, case_number, filing_year) in negative_cache:
+            return CaseResult.failure(NOT_FOUND_ERROR, not_found=True)
+        if self._scrape is None:
+            from scraper import DelhiHighCourtScraper
+            self._scrape = DelhiHighCourtScraper().search_case
+        result = CaseResult.from_scraper(self._scrape(case_type, case_number, filing_year))
+        if result.not_found:
+            negative_cache.add((case_type, case_number, filing_year))
+        return result
+
+    def run_once(self):
+        """Requeue expired leases, then claim and process one job. True if a job was processed"""
+        with self.app.app_context():
+            requeue_expired()
+            job = claim_job(self.worker_id, self.lease_seconds)
+            if job is None:
+                return False
+            job_id, case = job.id, (job.case_type, job.case_number, job.filing_year)
+        logger.info(f"Worker {self.worker_id} claimed job {job_id}: {'/'.join(map(str, case))}")
+
+        stop_heartbeat = threading.Event()
+        heartbeat_thread = threading.Thread(target=self._heartbeat, args=(job_id, stop_heartbeat),
+                                            name=f'heartbeat-{job_id}', daemon=True)
+        heartbeat_thread.start()
+        try:
+            result = self.scrape(*case)
+        except Exception as e:
+            result = CaseResult.failure(str(e))
+        finally:
+            stop_heartbeat.set()
+            heartbeat_thread.join()
+
+        with self.app.app_context():
+            if result.error:
+                # A case the court does not have will not appear on a retry
+                fail_job(job_id, self.worker_id, result.error, retry=not result.not_found,
+                         throttled=result.throttled)
+                logger.warning(f"Job {job_id} failed: {result.error}")
+            elif not complete_job(job_id, self.worker_id, result):
+                logger.warning(f"Lost the lease on job {job_id}; result discarded")
+        return True
+
+    def _heartbeat(self, job_id, stop):
+        while not stop.wait(self.heartbeat_seconds):
+            with self.app.app_context():
+                if not heartbeat(job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"Lost the lease on job {job_id}")
+                    return
+
+    def run(self, max_jobs=None, exit_when_idle=False):
+        """Process jobs until stopped; returns the number of jobs processed"""
+        processed = 0
+        while not self._stop.is_set():
+            if self.run_once():
+                processed += 1
+                if max_jobs and processed >= max_jobs:
+                    break
+            elif exit_when_idle:
+                break
+            else:
+                self._stop.wait(self.poll_interval)
+        return processed
+
+    def stop(self):
+        """Stop after the current job"""
+        self._stop.set()
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a standalone scraper worker')
+    parser.add_argument('--worker-id', help='lease owner name (default: host:pid)')
+    parser.add_argument('--max-jobs', type=int, help='exit after processing this many jobs')
+    parser.add_argument('--exit-when-idle', action='store_true', help='exit when no job is pending')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+    worker = ScrapeWorker(app, worker_id=args.worker_id)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    logger.info(f"Worker {worker.worker_id} started")
+    try:
+        processed = worker.run(max_jobs=args.max_jobs, exit_when_idle=args.exit_when_idle)
+    except KeyboardInterrupt:
+        processed = None
+    logger.info(f"Worker {worker.worker_id} stopped after {processed} jobs")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+"""
+WSGI entry point for production servers:
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+With preload_app the master imports this module once, warms what can be
+shared, then forks the workers; gunicorn.conf.py warms each worker after the
+fork.
+"""
+
+from app import app as application
+from warmup import prepare_app
+
+prepare_app(application)